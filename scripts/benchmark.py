@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import json
+import tempfile
+import time
+import tracemalloc
+
+from typing import Callable
+from typing import Dict
+from typing import List
+
+# Add project directory to pythonpath to enable importing of module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from switchmng.schema import *
+from switchmng.schema.port import vlans_ports_mapping
+from sqlalchemy import event
+
+from switchmng import database
+from switchmng import routes
+from switchmng.database import DatabaseConnection
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+def benchmark(func: Callable[[], None]) -> Callable[[], None]:
+    """Register given function as benchmark named like the function"""
+
+    BENCHMARKS[func.__name__[len('bench_'):]] = func
+    return func
+
+def timed(func: Callable, repeat: int = 5) -> float:
+    """Run given function multiple times and return fastest run in ms"""
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best * 1000
+
+def peak_memory(func: Callable) -> float:
+    """Run given function and return peak of allocated memory in MiB"""
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def create_database(path: str = '') -> DatabaseConnection:
+    """Create an empty database without printing the in-memory warning"""
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return DatabaseConnection('sqlite', path, False, Base)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def populate(
+        db: DatabaseConnection,
+        switches: int,
+        ports: int,
+        vlans: int = 10,
+        tagged: int = 0) -> None:
+    """
+    Fill given database with generated resources.
+
+    Every switch uses the same switch model with the given number of
+    ports. Every port carries one of the given number of common vlans.
+    Additionally the first ``tagged`` switches carry vlan 4000 on their
+    first port.
+    """
+
+    conn = db.engine.connect()
+    with conn.begin():
+        conn.execute(Vlan.__table__.insert(), [
+            { 'id': v, 'tag': v } for v in range(1, vlans + 1) ] + [
+            { 'id': 4000, 'tag': 4000 } ])
+        conn.execute(SwitchModel.__table__.insert(), [
+            { 'id': 1, 'name': 'model' } ])
+        conn.execute(PortModel.__table__.insert(), [
+            { 'id': p, 'switch_model_id': 1, 'name': str(p) }
+            for p in range(1, ports + 1) ])
+        conn.execute(Switch.__table__.insert(), [
+            { 'id': s, 'model_id': 1, 'name': 'switch{}'.format(s) }
+            for s in range(1, switches + 1) ])
+        conn.execute(Port.__table__.insert(), [
+            { 'id': s * ports + p, 'switch_id': s, 'name': str(p) }
+            for s in range(1, switches + 1)
+            for p in range(1, ports + 1) ])
+        conn.execute(vlans_ports_mapping.insert(), [
+            { 'port_id': s * ports + p, 'vlan_id': (s + p) % vlans + 1 }
+            for s in range(1, switches + 1)
+            for p in range(1, ports + 1) ])
+        if tagged > 0:
+            conn.execute(vlans_ports_mapping.insert(), [
+                { 'port_id': s * ports + 1, 'vlan_id': 4000 }
+                for s in range(1, tagged + 1) ])
+    conn.close()
+
+@benchmark
+def bench_query_switches_vlan() -> None:
+    """
+    Filter switches by vlan.
+
+    The number of matching switches stays the same while the total number
+    of switches grows. Runtime should stay roughly constant.
+    """
+
+    print('{:>10} {:>10} {:>10} {:>12}'.format(
+        'switches', 'ports', 'matching', 'time [ms]'))
+    for switches in (500, 1000, 2000, 4000):
+        db = create_database()
+        populate(db, switches, 48, tagged = 20)
+        session = db.Session()
+
+        def run():
+            session.expunge_all()
+            assert len(database.query_switches(session, vlan = 4000)) == 20
+
+        print('{:>10} {:>10} {:>10} {:>12.2f}'.format(
+            switches, switches * 48, 20, timed(run)))
+
+@benchmark
+def bench_stream_switches() -> None:
+    """
+    Serialize all switches.
+
+    Compare building the complete response in memory with streaming the
+    response of GET /switches. Peak memory of the streamed response should
+    stay flat.
+    """
+
+    print('{:>10} {:>10} {:>16} {:>16}'.format(
+        'switches', 'ports', 'list [MiB]', 'stream [MiB]'))
+    for switches in (250, 500, 1000):
+        db = create_database()
+        populate(db, switches, 48)
+        client = routes.create_app(db).test_client()
+
+        def in_memory():
+            session = db.Session()
+            json.dumps({
+                'status': 200,
+                'data': [ sw.jsonify()
+                          for sw in
+                          database.query_switches(session, profile = 'switch') ] })
+            db.Session.remove()
+
+        def streamed():
+            rv = client.get('/switches', buffered = False)
+            for _ in rv.response:
+                pass
+            rv.close()
+
+        print('{:>10} {:>10} {:>16.1f} {:>16.1f}'.format(
+            switches, switches * 48, peak_memory(in_memory), peak_memory(streamed)))
+
+@benchmark
+def bench_sync_ports() -> None:
+    """
+    Synchronize ports of switch from switch model and look up every port.
+
+    Runtime per port should stay roughly constant with growing number of
+    ports.
+    """
+
+    print('{:>10} {:>12} {:>16}'.format(
+        'ports', 'time [ms]', 'per port [us]'))
+    for ports in (48, 96, 250, 500, 1000, 2000):
+        model = SwitchModel(
+            name = 'model',
+            ports = [ PortModel(name = str(p)) for p in range(ports) ])
+
+        def run():
+            sw = Switch(name = 'switch', model = model)
+            sw.sync_ports_from_model()
+            for p in range(ports):
+                assert sw.port(str(p)) is not None
+                assert model.port(str(p)) is not None
+
+        duration = timed(run)
+        print('{:>10} {:>12.2f} {:>16.2f}'.format(
+            ports, duration, duration * 1000 / ports))
+
+@benchmark
+def bench_statements() -> None:
+    """
+    Count SQL statements executed per request of REST endpoints.
+    """
+
+    db = create_database()
+    populate(db, 10, 48)
+    client = routes.create_app(db).test_client()
+
+    statements = 0
+    def count(*args, **kwargs):    #pylint: disable = unused-argument
+        nonlocal statements
+        statements += 1
+    event.listen(db.engine, 'before_cursor_execute', count)
+
+    requests = [
+        ('GET',   '/switches/switch1', None),
+        ('GET',   '/switches/switch1/ports/1', None),
+        ('GET',   '/switches/switch1/ports', None),
+        ('GET',   '/switches', None),
+        ('GET',   '/switch_models/model', None),
+        ('GET',   '/switch_models/model/ports/1', None),
+        ('GET',   '/vlans/1', None),
+        ('PATCH', '/switches/switch1/ports/1', { 'vlans': [ 1, 2 ] }),
+        ('PUT',   '/switches/switch1/ports/2', { 'name': '2', 'vlans': [ 3 ] }),
+    ]
+
+    print('{:<6} {:<32} {:>12}'.format('method', 'path', 'statements'))
+    for method, path, body in requests:
+        headers = { 'Accept': 'application/json' }
+        if method == 'PATCH':
+            headers['Content-Type'] = 'application/merge-patch+json'
+        else:
+            headers['Content-Type'] = 'application/json'
+
+        statements = 0
+        rv = client.open(
+            path,
+            method = method,
+            headers = headers,
+            buffered = True,
+            data = None if body is None else json.dumps(body))
+        assert rv.status_code == 200, rv.data
+
+        print('{:<6} {:<32} {:>12}'.format(method, path, statements))
+
+@benchmark
+def bench_attribute_access() -> None:
+    """
+    Read and write attributes of switch and port objects.
+
+    Compare public resource attributes, private columns and attributes
+    used internally by SQLAlchemy.
+    """
+
+    db = create_database()
+    populate(db, 1, 48)
+    session = db.Session()
+    sw = database.query_switch(session, 'switch1', profile = 'switch')
+    pt = sw.port('1')
+
+    accesses = 100000
+    print('{:<36} {:>16}'.format('access', 'per second [M]'))
+    for obj, attrs in ((sw, ('name', 'location', 'ports')), (pt, ('name', 'vlans'))):
+        cls = type(obj)
+        names = list(attrs) \
+            + [ cls._Attributes[attr]['private'] for attr in attrs ] \
+            + [ '_sa_instance_state' ]
+        for name in names:
+            def run():
+                for _ in range(accesses):
+                    getattr(obj, name)
+            print('{:<36} {:>16.2f}'.format(
+                'get {}.{}'.format(cls.__name__, name),
+                accesses / timed(run) / 1000))
+
+    def write():
+        for i in range(accesses // 10):
+            sw.location = i
+    print('{:<36} {:>16.2f}'.format(
+        'set Switch.location', accesses / 10 / timed(write) / 1000))
+
+@benchmark
+def bench_validation() -> None:
+    """
+    Check attributes of ports and switches.
+    """
+
+    vlans = [ Vlan(tag = t) for t in range(1, 201) ]
+    port = { 'name': 'port', 'vlans': vlans, 'target': 'host' }
+    switch = { 'name': 'switch', 'location': 3, 'ip': '10.0.0.1' }
+
+    checks = 10000
+    print('{:<36} {:>16}'.format('check', 'per second [k]'))
+    for cls, params in ((Port, port), (Switch, switch)):
+        def run():
+            for _ in range(checks):
+                cls.check_params(**params)
+        print('{:<36} {:>16.2f}'.format(
+            '{}.check_params({})'.format(cls.__name__, ', '.join(params)),
+            checks / timed(run)))
+
+@benchmark
+def bench_jsonify() -> None:
+    """
+    Serialize loaded switches with all their ports.
+    """
+
+    db = create_database()
+    populate(db, 200, 48, vlans = 20)
+    session = db.Session()
+    switches = database.query_switches(session)
+    for sw in switches:
+        for pt in sw.ports:
+            pt.vlans = list(pt.vlans) + [ session.query(Vlan).get(4000) ]
+
+    rows = [ (sw.name, sw.model.name,
+              [ (pt.name, [ v.tag for v in pt.vlans ], pt.target) for pt in sw.ports ],
+              sw.location, sw.ip)
+             for sw in switches ]
+
+    def run():
+        for sw in switches:
+            sw.jsonify()
+
+    def run_rows():
+        for row in rows:
+            Switch.jsonify_row(row)
+
+    print('{:<36} {:>16}'.format('serialization', 'switches per second'))
+    print('{:<36} {:>16.0f}'.format(
+        'Switch.jsonify() (48 ports)', len(switches) / timed(run) * 1000))
+    print('{:<36} {:>16.0f}'.format(
+        'Switch.jsonify_row() (48 ports)', len(rows) / timed(run_rows) * 1000))
+
+@benchmark
+def bench_read_switches() -> None:
+    """
+    Read all switches as json-ready dicts.
+
+    Compare loading ORM objects and serializing them with reading rows
+    with Core statements. Both read switches in batches of 100.
+    """
+
+    print('{:>10} {:>10} {:>8} {:>12} {:>12}'.format(
+        'switches', 'ports', 'path', 'time [ms]', 'peak [MiB]'))
+    for switches in (500, 2000):
+        db = create_database()
+        populate(db, switches, 48)
+        session = db.Session()
+
+        def orm():
+            session.expunge_all()
+            for sw in database.query_switches(session, profile = 'switch', yield_per = 100):
+                sw.jsonify()
+
+        def rows():
+            for _ in database.read_switches(session, batch_size = 100):
+                pass
+
+        for name, run in (('orm', orm), ('rows', rows)):
+            print('{:>10} {:>10} {:>8} {:>12.2f} {:>12.2f}'.format(
+                switches, switches * 48, name, timed(run, 3), peak_memory(run)))
+
+@benchmark
+def bench_document_cache() -> None:
+    """
+    Poll every switch with GET /switches/<id>.
+
+    Compare polling with an empty cache to polling with a warm cache and
+    count documents invalidated by changing a single vlan.
+    """
+
+    db = create_database()
+    populate(db, 500, 48, vlans = 100)
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json' }
+
+    def poll():
+        for s in range(1, 501):
+            rv = client.get('/switches/switch{}'.format(s), headers = headers)
+            assert rv.status_code == 200
+
+    print('{:<36} {:>16}'.format('polling 500 switches', 'requests per second'))
+    def cold():
+        db.cache.clear()
+        poll()
+    print('{:<36} {:>16.0f}'.format('empty cache', 500 / timed(cold, 3) * 1000))
+    poll()
+    print('{:<36} {:>16.0f}'.format('warm cache', 500 / timed(poll, 3) * 1000))
+    print('{:<36} {:>16.2f}'.format('cache size [MiB]', db.cache.size / 1024 / 1024))
+
+    cached = len(db.cache)
+    rv = client.patch(
+        '/vlans/1',
+        headers = { 'Accept': 'application/json',
+                    'Content-Type': 'application/merge-patch+json' },
+        data = json.dumps({ 'description': 'changed' }))
+    assert rv.status_code == 200, rv.data
+    print('{:<36} {:>16}'.format('invalidated by changing vlan 1', cached - len(db.cache)))
+
+@benchmark
+def bench_conditional_get() -> None:
+    """
+    Poll every switch with GET /switches/<id> sending the entity tag of the
+    previous response (If-None-Match) with an empty document cache.
+    """
+
+    db = create_database()
+    populate(db, 500, 48, vlans = 100)
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json' }
+
+    etags = {}
+    def poll(conditional: bool):
+        received = 0
+        for s in range(1, 501):
+            url = '/switches/switch{}'.format(s)
+            db.cache.clear()
+            if conditional:
+                rv = client.get(url, headers = dict(headers, **{ 'If-None-Match': etags[url] }))
+                assert rv.status_code == 304
+            else:
+                rv = client.get(url, headers = headers)
+                assert rv.status_code == 200
+                etags[url] = rv.headers['ETag']
+            received += len(rv.data)
+        return received
+
+    print('{:<36} {:>16} {:>12}'.format('polling 500 switches', 'requests per second', 'KiB'))
+    for name, conditional in (('unconditional', False), ('if-none-match', True)):
+        received = poll(conditional)
+        duration = timed(lambda: poll(conditional), 3)
+        print('{:<36} {:>16.0f} {:>12.1f}'.format(
+            name, 500 / duration * 1000, received / 1024))
+
+@benchmark
+def bench_changes() -> None:
+    """
+    Sync a mirror of 500 switches after changing the target of one port,
+    once by fetching GET /switches and once by fetching GET /changes.
+    """
+
+    db = create_database()
+    populate(db, 500, 48, vlans = 100)
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json' }
+
+    rv = client.get('/switches', headers = headers)
+    since = rv.headers['ETag'].strip('"')
+    rv = client.patch(
+        '/switches/switch7/ports/3',
+        headers = { 'Accept': 'application/json',
+                    'Content-Type': 'application/merge-patch+json' },
+        data = json.dumps({ 'target': 'changed' }))
+    assert rv.status_code == 200, rv.data
+
+    print('{:<36} {:>12} {:>12}'.format('sync after changing 1 port', 'time [ms]', 'KiB'))
+    for name, url in (
+            ('GET /switches', '/switches'),
+            ('GET /changes?since=', '/changes?since={}'.format(since))):
+        rv = client.get(url, headers = headers)
+        assert rv.status_code == 200
+        duration = timed(lambda: client.get(url, headers = headers).data, 3)
+        print('{:<36} {:>12.1f} {:>12.1f}'.format(name, duration, len(rv.data) / 1024))
+
+@benchmark
+def bench_events() -> None:
+    """
+    Change port targets with PATCH while different numbers of subscribers
+    are registered for change notifications.
+    """
+
+    db = create_database()
+    populate(db, 50, 48)
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json',
+                'Content-Type': 'application/merge-patch+json' }
+
+    def patch():
+        for p in range(1, 201):
+            rv = client.patch(
+                '/switches/switch{}/ports/{}'.format(p % 50 + 1, p % 48 + 1),
+                headers = headers,
+                data = json.dumps({ 'target': 'target{}'.format(p) }))
+            assert rv.status_code == 200
+
+    print('{:<36} {:>16}'.format('200 x PATCH port', 'requests per second'))
+    for count in (0, 1, 100):
+        subscriptions = [ db.feed.subscribe(0) for _ in range(count) ]
+        print('{:<36} {:>16.0f}'.format(
+            '{} subscribers'.format(count), 200 / timed(patch, 3) * 1000))
+        for subscription in subscriptions:
+            subscription.close()
+
+@benchmark
+def bench_batch() -> None:
+    """
+    Change the targets of 100 ports of a file-backed database, once with
+    separate PATCH requests and once with a single POST /batch.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = create_database(os.path.join(directory, 'batch.db'))
+        populate(db, 50, 48)
+        client = routes.create_app(db).test_client()
+        headers = { 'Accept': 'application/json',
+                    'Content-Type': 'application/merge-patch+json' }
+
+        def operations(run: int):
+            return [ {
+                'method': 'PATCH',
+                'path':   '/switches/switch{}/ports/{}'.format(p % 50 + 1, p % 48 + 1),
+                'body':   { 'target': 'target{}-{}'.format(run, p) },
+            } for p in range(1, 101) ]
+
+        runs = iter(range(100))
+        def separate():
+            for op in operations(next(runs)):
+                rv = client.patch(op['path'], headers = headers, data = json.dumps(op['body']))
+                assert rv.status_code == 200
+
+        def batch():
+            rv = client.post(
+                '/batch',
+                headers = { 'Accept': 'application/json', 'Content-Type': 'application/json' },
+                data = json.dumps(operations(next(runs))))
+            assert rv.status_code == 200, rv.data
+
+        print('{:<36} {:>12}'.format('change 100 ports', 'time [ms]'))
+        for name, func in (('100 x PATCH', separate), ('POST /batch', batch)):
+            print('{:<36} {:>12.1f}'.format(name, timed(func, 3)))
+        db.engine.dispose()
+
+@benchmark
+def bench_unit_of_work() -> None:
+    """
+    Add 500 vlans and change their descriptions with the database functions
+    on a file-backed database, once committing every call and once in a
+    single unit of work.
+    """
+
+    def run(db: DatabaseConnection, start: int):
+        session = db.Session()
+        for tag in range(start, start + 500):
+            database.add_vlan(session, tag = tag)
+            database.modify_vlan(session, tag, description = 'vlan{}'.format(tag))
+
+    print('{:<36} {:>12}'.format('add and modify 500 vlans', 'time [ms]'))
+    for name, unit_of_work in (('commit per call', False), ('db.transaction()', True)):
+        with tempfile.TemporaryDirectory() as directory:
+            db = create_database(os.path.join(directory, 'unit_of_work.db'))
+            starts = iter(range(1, 4000, 500))
+            def changes():
+                if unit_of_work:
+                    with db.transaction():
+                        run(db, next(starts))
+                else:
+                    run(db, next(starts))
+            print('{:<36} {:>12.1f}'.format(name, timed(changes, 3)))
+            db.Session.remove()
+            db.engine.dispose()
+
+@benchmark
+def bench_put_switch_model() -> None:
+    """
+    Change the connector of one port model with PUT /switch_models/<id>
+    while 200 switches with 48 ports each use the switch model.
+    """
+
+    headers = { 'Accept': 'application/json', 'Content-Type': 'application/json' }
+    model = { 'name': 'model', 'ports': [
+        { 'name': str(p), 'connector': 'rj45' if p == 1 else None }
+        for p in range(1, 49) ] }
+
+    best = None
+    for _ in range(3):
+        db = create_database()
+        populate(db, 200, 48)
+        client = routes.create_app(db).test_client()
+        rv = client.post('/connectors', headers = headers, data = json.dumps({ 'name': 'rj45' }))
+        assert rv.status_code == 201
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        duration = timed(lambda: client.put(
+            '/switch_models/model', headers = headers, data = json.dumps(model)), 1)
+        ports = db.engine.execute('SELECT count(*) FROM ports').scalar()
+        if best is None or duration < best[0]:
+            best = (duration, len(statements), ports)
+
+    print('{:<36} {:>12} {:>12} {:>12}'.format(
+        'PUT switch model', 'time [ms]', 'statements', 'ports left'))
+    print('{:<36} {:>12.1f} {:>12} {:>12}'.format('200 switches x 48 ports', *best))
+
+@benchmark
+def bench_put_switches() -> None:
+    """
+    PUT every one of 100 switches with 48 ports like a configuration
+    management run, once with the stored state and once changing one vlan
+    of one port per switch.
+    """
+
+    db = create_database()
+    populate(db, 100, 48)
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json', 'Content-Type': 'application/json' }
+
+    switches = [ client.get('/switches/switch{}'.format(s), headers = headers).get_json()['data']
+                 for s in range(1, 101) ]
+
+    writes = []
+    def record(conn, cursor, statement, *args):    #pylint: disable = unused-argument
+        if statement.split(None, 1)[0] in ('INSERT', 'UPDATE', 'DELETE'):
+            writes.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+
+    def put():
+        for switch in switches:
+            rv = client.put('/switches/{}'.format(switch['name']),
+                            headers = headers, data = json.dumps(switch))
+            assert rv.status_code == 200, rv.data
+
+    print('{:<36} {:>12} {:>12}'.format('PUT 100 switches', 'time [ms]', 'writes'))
+    for name, change in (('unchanged', False), ('one vlan changed', True)):
+        if change:
+            for switch in switches:
+                vlans = switch['ports'][0]['vlans']
+                switch['ports'][0]['vlans'] = [ 1 if vlans != [ 1 ] else 2 ]
+        else:
+            put()
+        writes.clear()
+        duration = timed(put, 1)
+        print('{:<36} {:>12.1f} {:>12}'.format(name, duration, len(writes)))
+
+@benchmark
+def bench_assign_vlan() -> None:
+    """
+    Add a vlan to all 960 ports of 20 switches, once with one PATCH per
+    port and once with a single POST /vlans/<tag>/assign.
+    """
+
+    print('{:<36} {:>12}'.format('add vlan to 960 ports', 'time [ms]'))
+    for name in ('960 x PATCH port', 'POST /vlans/<tag>/assign'):
+        db = create_database()
+        populate(db, 20, 48)
+        client = routes.create_app(db).test_client()
+
+        def patch():
+            headers = { 'Accept': 'application/json',
+                        'Content-Type': 'application/merge-patch+json' }
+            for s in range(1, 21):
+                for p in range(1, 49):
+                    rv = client.patch(
+                        '/switches/switch{}/ports/{}'.format(s, p),
+                        headers = headers,
+                        data = json.dumps({ 'vlans': [ (s + p) % 10 + 1, 4000 ] }))
+                    assert rv.status_code == 200, rv.data
+
+        def assign():
+            headers = { 'Accept': 'application/json', 'Content-Type': 'application/json' }
+            rv = client.post(
+                '/vlans/4000/assign',
+                headers = headers,
+                data = json.dumps({ 'switch_model': 'model', 'port_range': [ '1', '48' ] }))
+            assert rv.get_json()['data']['affected_ports'] == 960, rv.data
+
+        print('{:<36} {:>12.1f}'.format(name, timed(patch if name.endswith('port') else assign, 1)))
+
+@benchmark
+def bench_vlan_ports() -> None:
+    """
+    Find all ports carrying vlan 4000 (on 50 of 500 switches with 48 ports
+    each), once by downloading all switches and once with the reverse
+    lookup endpoints.
+    """
+
+    db = create_database()
+    populate(db, 500, 48, vlans = 100, tagged = 50)
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json' }
+
+    def switches():
+        data = client.get('/switches', headers = headers).get_json()['data']
+        return [ (sw['name'], pt['name']) for sw in data for pt in sw['ports']
+                 if 4000 in pt['vlans'] ]
+
+    def ports():
+        data = client.get('/vlans/4000/ports', headers = headers).get_json()['data']
+        return [ (pt['switch'], pt['port']) for pt in data ]
+
+    def usage():
+        return client.get('/vlans/4000/usage', headers = headers).get_json()['data']['ports']
+
+    assert sorted(switches()) == sorted(ports())
+    assert usage() == 50
+
+    print('{:<36} {:>12} {:>12}'.format('find ports carrying vlan', 'time [ms]', 'KiB'))
+    for name, url, func in (
+            ('GET /switches', '/switches', switches),
+            ('GET /vlans/<tag>/ports', '/vlans/4000/ports', ports),
+            ('GET /vlans/<tag>/usage', '/vlans/4000/usage', usage)):
+        size = len(client.get(url, headers = headers).data)
+        print('{:<36} {:>12.1f} {:>12.1f}'.format(name, timed(func, 3), size / 1024))
+
+@benchmark
+def bench_targets() -> None:
+    """
+    Find ports connected to a host (on 4000 switches with 50 ports each),
+    once with the indexes on the target of ports and once after dropping
+    them.
+    """
+
+    db = create_database()
+    populate(db, 4000, 50)
+    db.engine.execute("UPDATE ports SET target = 'host' || id")
+    client = routes.create_app(db).test_client()
+    headers = { 'Accept': 'application/json' }
+
+    def lookup(url: str, expected: int) -> Callable:
+        def func():
+            data = client.get(url, headers = headers).get_json()['data']
+            assert len(data) == expected
+        return func
+
+    lookups = (
+        ('GET /targets/<name>',            lookup('/targets/host123456', 1)),
+        ('GET /targets/<name> prefix',     lookup('/targets/host12345?match=prefix', 11)),
+        ('GET /targets/<name> ignore case', lookup('/targets/HOST123456?ignore_case=true', 1)),
+        ('GET /targets/<name> both',       lookup('/targets/HOST12345?match=prefix&ignore_case=true', 11)),
+    )
+
+    print('{:<36} {:>12} {:>12}'.format('find ports by target', 'index [ms]', 'scan [ms]'))
+    indexed = [ timed(func, 5) for _, func in lookups ]
+    db.engine.execute('DROP INDEX ix_ports_target')
+    db.engine.execute('DROP INDEX ix_ports_target_nocase')
+    scanned = [ timed(func, 3) for _, func in lookups ]
+    for (name, _), index, scan in zip(lookups, indexed, scanned):
+        print('{:<36} {:>12.1f} {:>12.1f}'.format(name, index, scan))
+
+def main(names: List[str]) -> int:
+    if len(names) == 0:
+        names = list(BENCHMARKS)
+
+    for name in names:
+        if name not in BENCHMARKS:
+            print("Unknown benchmark '{}'. Possible benchmarks: {}".format(
+                name, ', '.join(BENCHMARKS)), file = sys.stderr)
+            return 1
+
+    for name in names:
+        print('### {}'.format(name))
+        BENCHMARKS[name]()
+        print()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
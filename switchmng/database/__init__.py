@@ -1,16 +1,42 @@
+from typing import Iterator
+from typing import Optional
+
+from contextlib import contextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import scoped_session
 from sqlalchemy.pool import StaticPool
 
 from .query  import *
+from .rows   import *
+from .changes import *
 from .delete import *
 from .modify import *
 from .set    import *
 from .add    import *
+from .assign import *
+from .helper import transaction
+from .cache  import CachedDocument
+from .cache  import DocumentCache
+from .cache  import DEFAULT_CACHE_SIZE
+from .events import ChangeFeed
+from .events import Subscription
+from .events import DEFAULT_QUEUE_SIZE
+from . import tracking
 
 class DatabaseConnection():
-    def __init__(self, db_type: str, db_str: str, db_verbose: bool, base):
+    def __init__(
+            self,
+            db_type: str,
+            db_str: str,
+            db_verbose: bool,
+            base,
+            cache_size: int = DEFAULT_CACHE_SIZE):
         # Initialize db engine
         if db_type == 'sqlite':
             if db_str == '':
@@ -37,7 +63,107 @@ class DatabaseConnection():
         self.base = base
         self.base.metadata.create_all(self.engine)
         self.base.metadata.bin = self.engine
+        self.create_columns()
+        self.create_indexes()
+        self.create_revision_counter()
 
         # Initialize scoped sessions to support multi thread access to database
         self.sessionm = sessionmaker(bind = self.engine)
         self.Session = scoped_session(self.sessionm)
+
+        # Cache serialized documents until the rows they were built
+        # from are changed
+        self.cache = DocumentCache(cache_size)
+
+        # Notify subscribers about committed changes
+        self.feed = ChangeFeed()
+        tracking.track(self.sessionm, self.committed)
+
+    @contextmanager
+    def transaction(self) -> Iterator:
+        """
+        Change multiple resources in a single unit of work.
+
+        Yields the session of the current thread. Functions of this module
+        called with it only flush their changes. All changes are committed
+        at once when the context is left or rolled back if an exception
+        is raised (See :func:`helper.transaction`).
+
+        Example::
+
+            with db.transaction() as session:
+                for tag in range(1, 100):
+                    add_vlan(session, tag = tag)
+        """
+
+        with transaction(self.Session()) as session:
+            yield session
+
+    def committed(self, tags, revision: Optional[int]) -> None:
+        """
+        Handle committed changes to resources.
+
+        :param tags: Tags of all rows touched by the committed transaction
+            (See :mod:`tracking`)
+
+        :param revision: Revision of the committed transaction
+        """
+
+        self.cache.invalidate(tags)
+
+        # The session of the transaction cannot be used anymore,
+        # so read changes with a separate connection.
+        if revision is not None and len(self.feed) > 0:
+            with self.engine.connect() as connection:
+                self.feed.publish(read_journal(connection, revision))
+
+    def create_columns(self) -> None:
+        """
+        Create columns declared in schema that are missing in database.
+
+        Creating tables does not change tables that exist already. This adds
+        columns that were added to the schema after the database was
+        created. Added columns need a server side default value.
+        """
+
+        inspector = inspect(self.engine)
+        for table in self.base.metadata.sorted_tables:
+            existing = { column['name'] for column in inspector.get_columns(table.name) }
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                self.engine.execute('ALTER TABLE {} ADD COLUMN {}'.format(
+                    table.name,
+                    CreateColumn(column).compile(self.engine)))
+
+    def create_revision_counter(self) -> None:
+        """Initialize revision counter (See :mod:`tracking`) if necessary"""
+
+        counter = self.base.metadata.tables['revision_counter']
+        if self.engine.execute(select([ counter.c.id ])).first() is None:
+            self.engine.execute(counter.insert().values(id = 1, revision = 0))
+
+    def create_indexes(self) -> None:
+        """
+        Create indexes declared in schema that are missing in database.
+
+        Creating tables only creates indexes of tables that do not exist yet.
+        This adds indexes that were added to the schema after the database
+        was created.
+
+        :raises ValueError: When a unique index cannot be created because
+            the database contains duplicates
+        """
+
+        inspector = inspect(self.engine)
+        for table in self.base.metadata.sorted_tables:
+            existing = { index['name'] for index in inspector.get_indexes(table.name) }
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                try:
+                    index.create(self.engine)
+                except IntegrityError:
+                    raise ValueError(
+                        "Cannot create unique index '{}' - table '{}' contains duplicates"
+                        .format(index.name, table.name))
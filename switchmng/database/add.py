@@ -29,7 +29,7 @@ def add_switch_model(session, **kwargs) -> SwitchModel:
     # Create switch model
     sm = SwitchModel(**kwargs)
     session.add(sm)
-    session.commit()
+    commit(session)
     return sm
 
 def add_port_model(session, switch_model_resource_id: str, **kwargs) -> PortModel:
@@ -68,7 +68,7 @@ def add_port_model(session, switch_model_resource_id: str, **kwargs) -> PortMode
     ports.append(pm)
     sm.ports = ports
 
-    session.commit()
+    commit(session)
 
     return pm
 
@@ -102,7 +102,7 @@ def add_switch(session, **kwargs) -> Switch:
     # Create switch
     sw = Switch(**kwargs)
     session.add(sw)
-    session.commit()
+    commit(session)
     return sw
 
 def add_network_protocol(session, **kwargs) -> NetworkProtocol:
@@ -127,7 +127,7 @@ def add_network_protocol(session, **kwargs) -> NetworkProtocol:
     # Add network protocol
     np = NetworkProtocol(**kwargs)
     session.add(np)
-    session.commit()
+    commit(session)
     return np
 
 def add_connector(session, **kwargs) -> Connector:
@@ -152,7 +152,7 @@ def add_connector(session, **kwargs) -> Connector:
     # Add connector
     cn = Connector(**kwargs)
     session.add(cn)
-    session.commit()
+    commit(session)
     return cn
 
 def add_vlan(session, **kwargs) -> Vlan:
@@ -177,5 +177,5 @@ def add_vlan(session, **kwargs) -> Vlan:
     # Add vlan
     vl = Vlan(**kwargs)
     session.add(vl)
-    session.commit()
+    commit(session)
     return vl
@@ -0,0 +1,232 @@
+import re
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Set
+
+from sqlalchemy import and_
+from sqlalchemy import exists
+from sqlalchemy import false
+from sqlalchemy import literal
+from sqlalchemy import or_
+from sqlalchemy import select
+
+from switchmng.schema import *
+from switchmng.schema.port import vlans_ports_mapping
+
+from . import tracking
+from .helper import *
+
+MAX_PORT_RANGE = 1000
+"""Maximum number of ports selected by a single port range"""
+
+_NUMBERED_PORT = re.compile(r'^(.*?)(\d+)$')
+
+def assign_vlan(session, tag: int, **selector) -> int:
+    """
+    Add a :class:`Vlan` to all ports matching a given selector at once.
+
+    Ports are selected by exactly one of the following:
+
+    * ``ports``: List of dicts with the keys ``switch`` and ``port``
+      containing resource identifiers of a switch and one of its ports
+    * ``switch``: Resource identifier of a switch. Selects all ports of
+      this switch.
+    * ``switch_model``: Resource identifier of a switch model. Selects all
+      ports of all switches of this switch model.
+
+    Ports selected by ``switch`` or ``switch_model`` can be restricted to
+    a range of port names with ``port_range`` (See :func:`_port_range`).
+
+    Instead of changing every port on its own the vlan is added to all
+    selected ports not already carrying it with a single
+    ``INSERT ... SELECT`` statement.
+
+    :param tag: Resource identifier of vlan to add
+        (See :class:`Vlan` for what attribute is the resource identifier)
+
+    :param selector: Selection of ports to add vlan to
+
+    :return: Number of ports the vlan was added to
+    """
+
+    return _assign(session, tag, selector, True)
+
+def unassign_vlan(session, tag: int, **selector) -> int:
+    """
+    Remove a :class:`Vlan` from all ports matching a given selector at once.
+
+    Ports are selected like with :func:`assign_vlan`. Instead of changing
+    every port on its own the vlan is removed from all selected ports with
+    a single ``DELETE`` statement.
+
+    :param tag: Resource identifier of vlan to remove
+        (See :class:`Vlan` for what attribute is the resource identifier)
+
+    :param selector: Selection of ports to remove vlan from
+
+    :return: Number of ports the vlan was removed from
+    """
+
+    return _assign(session, tag, selector, False)
+
+def _assign(session, tag: int, selector: Dict[str, Any], assign: bool) -> int:
+    """Add vlan to or remove vlan from all ports matching given selector"""
+
+    if not isinstance(tag, int):
+        raise TypeError('Given vlan tag is not of type int')
+
+    # Write pending changes of session before using plain SQL statements
+    session.flush()
+
+    vlan_id = session.execute(select([ Vlan._vlan_id ]).where(Vlan._tag == tag)).scalar()
+    if vlan_id is None:
+        raise ValueError("Given vlan '{}' does not exist".format(tag))
+
+    ports = _select_ports(session, selector)
+
+    # Only ports not carrying the vlan (or carrying the vlan when
+    # removing it) are changed
+    mapping = vlans_ports_mapping.c
+    carrying = exists().where(and_(
+        mapping.port_id == Port._port_id,
+        mapping.vlan_id == vlan_id))
+    changed = ports.where(~carrying if assign else carrying)
+    ids = [ key for key, in session.execute(changed) ]
+    if len(ids) == 0:
+        return 0
+
+    if assign:
+        statement = vlans_ports_mapping.insert().from_select(
+            [ mapping.port_id, mapping.vlan_id ],
+            changed.with_only_columns([ Port._port_id, literal(vlan_id) ]))
+    else:
+        statement = vlans_ports_mapping.delete().where(and_(
+            mapping.vlan_id == vlan_id,
+            mapping.port_id.in_(ports)))
+    count = session.execute(statement).rowcount
+
+    tracking.mark_changed(session, Port, ids)
+    commit(session)
+    return count
+
+def _select_ports(session, selector: Dict[str, Any]):
+    """
+    Return statement selecting ids of all ports matching given selector.
+
+    See :func:`assign_vlan` for possible selectors.
+
+    :raises TypeError: When selector is malformed
+    :raises ValueError: When selected resources do not exist
+    """
+
+    if not isinstance(selector, dict):
+        raise TypeError('Given port selector is not of type dict')
+    for key in selector:
+        if key not in ('ports', 'switch', 'switch_model', 'port_range'):
+            raise ValueError("Unknown key '{}' in port selector".format(key))
+
+    kinds = [ key for key in ('ports', 'switch', 'switch_model') if key in selector ]
+    if len(kinds) != 1:
+        raise ValueError("Port selector needs exactly one of 'ports', 'switch' or 'switch_model'")
+
+    if 'ports' in selector:
+        if 'port_range' in selector:
+            raise ValueError("Port range cannot be combined with list of ports")
+        return _select_port_list(session, selector['ports'])
+
+    statement = select([ Port._port_id ])
+    if 'switch' in selector:
+        if not isinstance(selector['switch'], str):
+            raise TypeError('Given switch of port selector is not of type str')
+        switch_id = session.execute(select([ Switch._switch_id ])
+            .where(Switch._name == selector['switch'])).scalar()
+        if switch_id is None:
+            raise ValueError("Given switch '{}' does not exist".format(selector['switch']))
+        statement = statement.where(Port._switch_id == switch_id)
+    else:
+        if not isinstance(selector['switch_model'], str):
+            raise TypeError('Given switch model of port selector is not of type str')
+        model_id = session.execute(select([ SwitchModel._switch_model_id ])
+            .where(SwitchModel._name == selector['switch_model'])).scalar()
+        if model_id is None:
+            raise ValueError("Given switch model '{}' does not exist".format(
+                selector['switch_model']))
+        statement = statement.where(Port._switch_id.in_(
+            select([ Switch._switch_id ]).where(Switch._model_id == model_id)))
+
+    if 'port_range' in selector:
+        statement = statement.where(Port._name.in_(_port_range(selector['port_range'])))
+    return statement
+
+def _select_port_list(session, ports: List[Dict[str, str]]):
+    """
+    Return statement selecting ids of given ports.
+
+    :param ports: List of dicts with the keys ``switch`` and ``port``
+
+    :raises ValueError: When given ports do not exist. All missing ports
+        are reported at once.
+    """
+
+    if not isinstance(ports, list):
+        raise TypeError('Given list of ports of port selector is not of type list')
+
+    by_switch: Dict[str, Set[str]] = {}
+    for port in ports:
+        if not isinstance(port, dict) or set(port) != { 'switch', 'port' }:
+            raise TypeError("Given port of port selector is not a dict of 'switch' and 'port'")
+        if not isinstance(port['switch'], str) or not isinstance(port['port'], str):
+            raise TypeError('Given switch or port of port selector is not of type str')
+        by_switch.setdefault(port['switch'], set()).add(port['port'])
+
+    table = Port.__table__.join(Switch.__table__, Port._switch_id == Switch._switch_id)
+    if len(by_switch) == 0:
+        return select([ Port._port_id ]).where(false())
+    condition = or_(*(
+        and_(Switch._name == switch, Port._name.in_(sorted(names)))
+        for switch, names in by_switch.items()))
+
+    # Check that all given ports exist with a single query
+    found = set(tuple(row) for row in session.execute(
+        select([ Switch._name, Port._name ]).select_from(table).where(condition)))
+    missing = sorted(
+        (switch, name)
+        for switch, names in by_switch.items()
+        for name in names
+        if (switch, name) not in found)
+    if len(missing) > 0:
+        raise ValueError('Given ports do not exist: {}'.format(
+            ', '.join('{}/{}'.format(switch, name) for switch, name in missing)))
+
+    return select([ Port._port_id ]).select_from(table).where(condition)
+
+def _port_range(port_range: List[str]) -> List[str]:
+    """
+    Return names of all ports in given range of port names.
+
+    A range is given as list of the names of its first and its last port.
+    Both names consist of the same prefix followed by a number
+    (e.g. ``[ 'p1', 'p24' ]``). If the number of the first port has
+    leading zeros all numbers are padded to its length.
+    """
+
+    if not isinstance(port_range, list) or len(port_range) != 2 \
+            or not all(isinstance(name, str) for name in port_range):
+        raise TypeError('Given port range is not a list of the first and the last port name')
+
+    first, last = [ _NUMBERED_PORT.match(name) for name in port_range ]
+    if first is None or last is None or first.group(1) != last.group(1):
+        raise ValueError(
+            "Given port range from '{}' to '{}' does not consist of numbered "
+            "ports with the same prefix".format(*port_range))
+
+    start, end = int(first.group(2)), int(last.group(2))
+    if start > end:
+        raise ValueError("Given port range from '{}' to '{}' is empty".format(*port_range))
+    if end - start + 1 > MAX_PORT_RANGE:
+        raise ValueError('Given port range contains more than {} ports'.format(MAX_PORT_RANGE))
+
+    width = len(first.group(2)) if first.group(2).startswith('0') else 0
+    return [ '{}{:0{}d}'.format(first.group(1), number, width) for number in range(start, end + 1) ]
@@ -0,0 +1,134 @@
+import threading
+
+from collections import OrderedDict
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from .tracking import Tag
+
+DEFAULT_CACHE_SIZE = 32 * 1024 * 1024
+"""Default maximum size of all cached documents in bytes"""
+
+class CachedDocument(NamedTuple):
+    """Serialized resource document with the revision it was built from"""
+
+    document: bytes
+    revision: int
+
+class DocumentCache():
+    """
+    Least recently used cache of serialized resource documents.
+
+    Every document is stored together with the tags of all rows it was
+    built from (See :func:`tracking.dependencies`). Invalidating a tag
+    removes exactly the documents depending on it. When the total size of
+    all documents exceeds the maximum size the least recently used
+    documents are evicted.
+
+    Documents are only stored if no invalidation happened since the
+    document was read from the database (See :attr:`generation`), so that
+    a document read concurrently to a change never outlives the change.
+
+    :param max_size: Maximum size of all cached documents in bytes
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        if not isinstance(max_size, int):
+            raise TypeError('Given cache size is not of type int')
+        if max_size < 0:
+            raise ValueError('Given cache size is negative')
+
+        self.max_size = max_size
+        self.size = 0
+
+        self.generation = 0
+        """Counter increased by every invalidation"""
+
+        self._documents: OrderedDict = OrderedDict()
+        self._dependents: Dict[Tag, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def get(self, key: Hashable) -> Optional[CachedDocument]:
+        """Return cached document with given key or None if it is not cached"""
+
+        with self._lock:
+            entry = self._documents.get(key)
+            if entry is None:
+                return None
+            self._documents.move_to_end(key)
+            return CachedDocument(entry[0], entry[1])
+
+    def put(
+            self,
+            key: Hashable,
+            document: bytes,
+            revision: int,
+            tags: Iterable[Tag],
+            generation: int) -> None:
+        """
+        Store document with given key.
+
+        :param revision: Revision of the resource the document was built
+            from (See :mod:`tracking`)
+
+        :param tags: Tags of all rows the document depends on
+
+        :param generation: Value of :attr:`generation` before the document
+            was read from the database. The document is not stored if it
+            was invalidated since.
+        """
+
+        with self._lock:
+            if generation != self.generation or len(document) > self.max_size:
+                return
+
+            self._remove(key)
+            tags = frozenset(tags)
+            self._documents[key] = (document, revision, tags)
+            self.size += len(document)
+            for tag in tags:
+                self._dependents.setdefault(tag, set()).add(key)
+
+            # Evict least recently used documents
+            while self.size > self.max_size:
+                self._remove(next(iter(self._documents)))
+
+    def invalidate(self, tags: Iterable[Tag]) -> None:
+        """Remove all documents depending on any of given tags"""
+
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in self._dependents.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all documents"""
+
+        with self._lock:
+            self.generation += 1
+            self._documents.clear()
+            self._dependents.clear()
+            self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry: Optional[Tuple[bytes, int, frozenset]] = self._documents.pop(key, None)
+        if entry is None:
+            return
+
+        document, _, tags = entry
+        self.size -= len(document)
+        for tag in tags:
+            dependents = self._dependents.get(tag)
+            if dependents is not None:
+                dependents.discard(key)
+                if len(dependents) == 0:
+                    del self._dependents[tag]
@@ -0,0 +1,172 @@
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import select
+
+from switchmng.schema import *
+from switchmng.schema.base_resource import BaseResource
+from switchmng.schema.change import changes
+from switchmng.typing import JsonDict
+
+from .query import _apply_profile
+from .rows import _read
+
+_RESOURCES: Dict[str, Tuple[type, Optional[str]]] = {
+    cls.__tablename__: (cls, profile) for cls, profile in (
+        (SwitchModel,     'switch_model'),
+        (PortModel,       'port_model'),
+        (Switch,          'switch'),
+        (Port,            'port'),
+        (NetworkProtocol, None),
+        (Connector,       None),
+        (Vlan,            None),
+    )
+}
+"""
+Maps table name of every resource class to resource class and name of
+loading profile used for representing it (See :data:`LOADING_PROFILES`)
+"""
+
+def _current(session, rows: List) -> Dict[Tuple[str, int], BaseResource]:
+    """
+    Return resources of given change journal entries that were not deleted.
+
+    Resources of every class are loaded with a fixed number of statements.
+
+    :return: Dict mapping table name and database id to resource
+    """
+
+    row_ids: Dict[str, List[int]] = {}
+    for row in rows:
+        if not row.deleted:
+            row_ids.setdefault(row.resource, []).append(row.row_id)
+
+    resources: Dict[Tuple[str, int], BaseResource] = {}
+    for resource, ids in row_ids.items():
+        cls, profile = _RESOURCES[resource]
+        query = _apply_profile(session.query(cls), profile)
+        query = query.filter(inspect(cls).primary_key[0].in_(ids))
+        for obj in query:
+            resources[(resource, inspect(obj).identity[0])] = obj
+    return resources
+
+def _entry(row) -> JsonDict:
+    """Return json-ready dict of given change journal row"""
+
+    cls, _ = _RESOURCES[row.resource]
+    return {
+        'revision':           row.revision,
+        'resource':           row.resource,
+        'resource_id':        cls._Attributes[cls.ResourceIdentifier]['type'](row.resource_id),
+        'parent_resource_id': row.parent_resource_id,
+        'deleted':            row.deleted,
+    }
+
+def read_journal(connection, revision: int) -> List[JsonDict]:
+    """
+    Read resources changed by the transaction with given revision.
+
+    Every resource is returned once as json-ready dict with the keys
+    ``revision``, ``resource``, ``resource_id``, ``parent_resource_id``
+    and ``deleted`` (See :func:`read_changes`) but without its current
+    representation.
+
+    :param connection: Session or connection to read the journal with
+    """
+
+    statement = select([ changes ]).where(changes.c.revision == revision)
+    latest: Dict[Tuple, JsonDict] = {}
+    for row in connection.execute(statement.order_by(changes.c.id)):
+        key = (row.resource, row.resource_id, row.parent_resource_id)
+        latest.pop(key, None)
+        latest[key] = _entry(row)
+    return list(latest.values())
+
+def read_changes(
+        session,
+        since: int,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        batch_size: Optional[int] = None) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Read resources changed since given revision from the change journal.
+
+    Every resource created, changed or deleted since the revision is
+    returned once, ordered by its last change, as json-ready dict with the
+    keys:
+
+    * ``change_id``: Id of the last change journal entry of the resource
+    * ``revision``: Revision of the last change to the resource
+    * ``resource``: Name of the table of the resource (e.g. ``'switches'``)
+    * ``resource_id``: Resource identifier of the resource
+    * ``parent_resource_id``: Resource identifier of the resource
+      containing the resource or None
+    * ``deleted``: If the resource was deleted (or moved to another
+      resource identifier)
+    * ``data``: Current representation of the resource like returned by
+      :meth:`BaseResource.jsonify` or None if the resource was deleted
+
+    The cost of reading changes only depends on the number of changed
+    resources, not on the number of all resources.
+
+    :param since: Revision after which changes are returned
+        (See :func:`query_current_revision`)
+
+    :param limit: Maximum number of resources to return or None to return
+        all changed resources.
+    :type limit: int
+
+    :param after: Change journal id of the last resource of the previous page
+
+    :param batch_size: If given return an iterator reading changes from
+        the database in batches of this size instead of a list.
+    :type batch_size: int
+
+    :return: List of json-ready dicts of changed resources
+    """
+
+    if not isinstance(since, int):
+        raise TypeError('Given revision is not of type int')
+    if after is not None and not isinstance(after, int):
+        raise TypeError("Given pagination key '{}' is invalid".format(after))
+
+    def page(size: Optional[int], key) -> List[Tuple[Any, JsonDict]]:
+        # Last change journal entry of every resource changed since revision
+        last = func.max(changes.c.id)
+        latest = select([ last.label('id') ])
+        latest = latest.where(changes.c.revision > since)
+        latest = latest.group_by(
+            changes.c.resource,
+            changes.c.resource_id,
+            changes.c.parent_resource_id)
+        if key is not None:
+            latest = latest.having(last > key)
+        latest = latest.order_by(last).limit(size).alias()
+
+        entries = select([ changes ]).select_from(
+            changes.join(latest, changes.c.id == latest.c.id))
+        rows = session.execute(entries.order_by(changes.c.id)).fetchall()
+        if len(rows) == 0:
+            return []
+
+        resources = _current(session, rows)
+        result = []
+        for row in rows:
+            resource = None
+            if not row.deleted:
+                resource = resources.get((row.resource, row.row_id))
+            entry = _entry(row)
+            entry['change_id'] = row.id
+            entry['deleted'] = resource is None
+            entry['data'] = None if resource is None else resource.jsonify()
+            result.append((row.id, entry))
+        return result
+
+    return _read(page, limit, after, batch_size)
@@ -1,6 +1,7 @@
 from switchmng.schema import *
 
 from .query import *
+from .helper import *
 
 def delete_switch_model(session, resource_id: str) -> None:
     """
@@ -29,7 +30,7 @@ def delete_switch_model(session, resource_id: str) -> None:
 
     # Delete switch model
     session.delete(sm)
-    session.commit()
+    commit(session)
 
 def delete_port_model(
         session,
@@ -64,7 +65,7 @@ def delete_port_model(
 
     # Removing port model from switch model will automatically delete orphan
     # port model object. We just have to commit changes in our session.
-    session.commit()
+    commit(session)
 
 def delete_switch(session, resource_id: str) -> None:
     """
@@ -82,7 +83,7 @@ def delete_switch(session, resource_id: str) -> None:
 
     # Delete switch
     session.delete(sw)
-    session.commit()
+    commit(session)
 
 def delete_network_protocol(session, resource_id: str) -> None:
     """
@@ -112,7 +113,7 @@ def delete_network_protocol(session, resource_id: str) -> None:
 
     # Delete network protocol
     session.delete(np)
-    session.commit()
+    commit(session)
 
 def delete_connector(session, resource_id: str) -> None:
     """
@@ -142,7 +143,7 @@ def delete_connector(session, resource_id: str) -> None:
 
     # Delete connector
     session.delete(cn)
-    session.commit()
+    commit(session)
 
 def delete_vlan(session, resource_id: str) -> None:
     """
@@ -172,4 +173,4 @@ def delete_vlan(session, resource_id: str) -> None:
 
     # Delete vlan
     session.delete(vl)
-    session.commit()
+    commit(session)
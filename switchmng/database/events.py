@@ -0,0 +1,136 @@
+import threading
+
+from collections import deque
+from typing import Deque
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from switchmng.typing import JsonDict
+
+DEFAULT_QUEUE_SIZE = 1000
+"""Default maximum number of queued notifications per subscriber"""
+
+class Subscription():
+    """
+    Bounded queue of change notifications of a single subscriber.
+
+    Subscribers that do not take notifications as fast as they are
+    published do not slow down writers and do not grow without bound.
+    When more notifications are published than fit into the queue, all
+    queued notifications are dropped and the subscriber is told to resync
+    instead (See :meth:`get`).
+
+    :param revision: Revision the subscriber is up to date with
+
+    :param max_size: Maximum number of queued notifications
+    """
+
+    def __init__(self, feed: 'ChangeFeed', revision: int, max_size: int):
+        self.revision = revision
+        """Revision of the last notification taken from the queue"""
+
+        self._feed = feed
+        self._max_size = max_size
+        self._queue: Deque[JsonDict] = deque()
+        self._overflow = False
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def put(self, notifications: List[JsonDict]) -> None:
+        """Queue given notifications or drop all of them if they do not fit"""
+
+        with self._condition:
+            if self._overflow:
+                return
+            if len(self._queue) + len(notifications) > self._max_size:
+                self._queue.clear()
+                self._overflow = True
+            else:
+                self._queue.extend(notifications)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, JsonDict]]:
+        """
+        Take next notification from the queue.
+
+        Blocks until a notification is available or the timeout expires.
+
+        :return: Tuple of ``'change'`` and next notification, tuple of
+            ``'resync'`` and dict with the revision to resync from (key
+            ``since``) if notifications were dropped or None if the
+            timeout expired.
+        """
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._overflow or len(self._queue) > 0,
+                timeout)
+
+            if self._overflow:
+                self._overflow = False
+                return 'resync', { 'since': self.revision }
+            if len(self._queue) == 0:
+                return None
+
+            notification = self._queue.popleft()
+            self.revision = max(self.revision, notification['revision'])
+            return 'change', notification
+
+    def close(self) -> None:
+        """Stop receiving notifications"""
+
+        self._feed.unsubscribe(self)
+
+class ChangeFeed():
+    """
+    Publishes notifications about committed changes to all subscribers.
+
+    A notification is a json-ready dict with the keys ``resource``,
+    ``resource_id``, ``parent_resource_id``, ``revision`` and ``deleted``
+    (See :func:`read_journal`).
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, revision: int, max_size: int = DEFAULT_QUEUE_SIZE) -> Subscription:
+        """
+        Return new subscription receiving all notifications published from now on.
+
+        :param revision: Revision the subscriber is up to date with
+
+        :param max_size: Maximum number of queued notifications
+        """
+
+        if not isinstance(max_size, int):
+            raise TypeError('Given queue size is not of type int')
+        if max_size < 1:
+            raise ValueError('Given queue size has to be positive')
+
+        subscription = Subscription(self, revision, max_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, notifications: List[JsonDict]) -> None:
+        """Queue given notifications for all subscribers"""
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(notifications)
@@ -1,30 +1,170 @@
+from contextlib import contextmanager
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 
 from switchmng.schema import *
+from switchmng.schema.base_resource import BaseResource
 
 from .query import *
 
-def port_model_from_dict(session, **kwargs) -> PortModel:
+RESOLVE_CHUNK_SIZE = 500
+"""Maximum number of resource identifiers resolved with a single query"""
+
+_DEFERRED = 'switchmng_deferred_commit'
+"""Key in the session info marking sessions inside :func:`transaction`"""
+
+def commit(session) -> None:
     """
-    Create port model.
+    Commit changes of given session.
+
+    Inside of :func:`transaction` changes are only flushed, so that they
+    are committed together at the end of the transaction.
+    """
+
+    if session.info.get(_DEFERRED, False):
+        session.flush()
+    else:
+        session.commit()
+
+@contextmanager
+def transaction(session) -> Iterator:
+    """
+    Run multiple database functions in a single transaction of given session.
+
+    Inside the context all functions changing resources flush their
+    changes instead of committing them. All changes are committed at once
+    when the context is left or rolled back if an exception is raised.
+    Nested contexts take part in the outermost transaction.
+
+    :return: Context manager yielding the session
+    """
+
+    if session.info.get(_DEFERRED, False):
+        yield session
+        return
+
+    session.info[_DEFERRED] = True
+    try:
+        yield session
+        session.info.pop(_DEFERRED)
+        session.commit()
+    except BaseException:
+        session.info.pop(_DEFERRED, None)
+        session.rollback()
+        raise
+
+def resolve_resources(session, cls: type, resource_ids: Iterable, name: str) -> Dict[Any, Any]:
+    """
+    Retrieve resources of given class for multiple resource identifiers at once.
+
+    Instead of querying every resource on its own all resources are
+    retrieved with a single ``IN (...)`` query (split into chunks of
+    :data:`RESOLVE_CHUNK_SIZE` resource identifiers).
+
+    :param cls: Resource class to retrieve resources of
+
+    :param resource_ids: Resource identifiers of resources to retrieve.
+        May contain duplicates.
+
+    :param name: Name of resource type used in error messages
+
+    :return: Dict mapping every given resource identifier to its resource
+
+    :raises TypeError: When a resource identifier is of wrong type
+    :raises ValueError: When resources do not exist. All missing resource
+        identifiers are reported at once.
+    """
+
+    id_type = cls._Attributes[cls.ResourceIdentifier]['type']
+    ids = set()
+    for resource_id in resource_ids:
+        if not isinstance(resource_id, id_type):
+            raise TypeError("Given {} '{}' is not of type {}".format(
+                name,
+                resource_id,
+                id_type.__name__))
+        ids.add(resource_id)
+
+    column = getattr(cls, cls._Attributes[cls.ResourceIdentifier]['private'])
+    ordered = sorted(ids)
+    resources = {}
+    for i in range(0, len(ordered), RESOLVE_CHUNK_SIZE):
+        query = session.query(cls).filter(column.in_(ordered[i:i + RESOLVE_CHUNK_SIZE]))
+        for resource in query:
+            resources[getattr(resource, cls.ResourceIdentifier)] = resource
+
+    missing = ids - resources.keys()
+    if len(missing) > 0:
+        raise ValueError('Given {}(s) {} do not exist'.format(
+            name,
+            ', '.join(str(m) for m in sorted(missing))))
+
+    return resources
+
+def resolve_ports(session, ports: List[dict]) -> None:
+    """
+    Replace vlan tags of given ports with vlan objects.
+
+    Ports are given as dicts of attributes and get modified in place.
+    All vlans of all ports are retrieved at once
+    (See :func:`resolve_resources`).
+    """
+
+    for port in ports:
+        if 'vlans' in port and not isinstance(port['vlans'], list):
+            raise TypeError('Given list of vlans of port is not of type list')
+
+    vlans = resolve_resources(
+        session,
+        Vlan,
+        [ v for port in ports for v in port.get('vlans', []) ],
+        'vlan')
+
+    for port in ports:
+        if 'vlans' in port:
+            port['vlans'] = [ vlans[v] for v in port['vlans'] ]
+
+def resolve_port_models(session, ports: List[dict]) -> None:
+    """
+    Replace network protocol and connector names of given port models with
+    network protocol and connector objects.
+
+    Port models are given as dicts of attributes and get modified in place.
+    All network protocols and all connectors of all port models are
+    retrieved at once (See :func:`resolve_resources`).
     """
 
-    # Convert network protocols from list[str] to list[obj]
-    if 'network_protocols' in kwargs and kwargs['network_protocols'] is not None:
-        if not isinstance(kwargs['network_protocols'], list):
+    for port in ports:
+        if port.get('network_protocols') is not None \
+                and not isinstance(port['network_protocols'], list):
             raise TypeError('Given list of network protocols is not of type list')
-        kwargs['network_protocols'] = [ query_network_protocol(session, p)
-                                      for p in kwargs['network_protocols'] ]
-        if None in kwargs['network_protocols']:
-            raise ValueError('Given network protocol in list of network protocols does not exist')
 
-    # Convert connector from str to obj
-    if 'connector' in kwargs and kwargs['connector'] is not None:
-        kwargs['connector'] = query_connector(session, kwargs['connector'])
-        if kwargs['connector'] is None:
-            raise ValueError('Given connector of port model does not exist')
+    protocols = resolve_resources(
+        session,
+        NetworkProtocol,
+        [ p for port in ports for p in port.get('network_protocols') or [] ],
+        'network protocol')
+    connectors = resolve_resources(
+        session,
+        Connector,
+        [ port['connector'] for port in ports if port.get('connector') is not None ],
+        'connector')
+
+    for port in ports:
+        if port.get('network_protocols') is not None:
+            port['network_protocols'] = [ protocols[p] for p in port['network_protocols'] ]
+        if port.get('connector') is not None:
+            port['connector'] = connectors[port['connector']]
+
+def port_model_from_dict(session, **kwargs) -> PortModel:
+    """
+    Create port model.
+    """
 
-    return PortModel(**kwargs)
+    return port_models_from_dict(session, [ kwargs ])[0]
 
 def port_models_from_dict(session, ports: List[dict]) -> List[PortModel]:
     """
@@ -38,13 +178,10 @@ def port_models_from_dict(session, ports: List[dict]) -> List[PortModel]:
         if not isinstance(port, dict):
             raise TypeError('Given port is not of type dict')
 
-    # Convert
-    objs = []
-    for port in ports:
-        obj = port_model_from_dict(session, **port)
-        objs.append(obj)
+    # Convert network protocols and connectors from str to obj
+    resolve_port_models(session, ports)
 
-    return objs
+    return [ PortModel(**port) for port in ports ]
 
 def ports_from_dict(session, ports: List[dict]) -> List[Port]:
     """
@@ -59,21 +196,94 @@ def ports_from_dict(session, ports: List[dict]) -> List[Port]:
         if not isinstance(port, dict):
             raise TypeError('Given port is not of type dict')
 
-    # Convert
-    objs = []
-    for port in ports:
-        # Convert vlans from list of str to list of obj
-        if 'vlans' in port:
-            if not isinstance(port['vlans'], list):
-                raise TypeError('Given list of vlans of port is not of type list')
-            port['vlans'] = [ query_vlan(session, v) for v in port['vlans'] ]
+    # Convert vlans from list of int to list of obj
+    resolve_ports(session, ports)
+
+    return [ Port(**port) for port in ports ]
+
+def update_resource(resource: BaseResource, state: BaseResource) -> None:
+    """
+    Set all attributes of given resource to the state of another resource.
 
-            if None in port['vlans']:
-                raise ValueError('Given vlan in list of vlans of port does not exist')
+    The resource identifier is not changed. Attributes that already have
+    the value of the other resource are not set at all, so that they
+    neither cause statements nor run post hooks (See :func:`_unchanged`).
+    """
+
+    cls = type(resource)
+    for key in cls._Attributes:
+        if key != cls.ResourceIdentifier:
+            _set_changed(resource, key, getattr(state, key))
 
+def reconcile_resource(resource: BaseResource, state: BaseResource) -> None:
+    """
+    Set all attributes of given resource to the state of another resource.
+
+    Unlike :func:`update_resource` the resource identifier is changed as
+    well and nested ports are merged by name (See :func:`merge_ports`)
+    instead of being replaced. This way the resource and all ports that
+    exist in both states keep their database rows and only attributes
+    that differ are written to the database.
+    """
+
+    cls = type(resource)
+    for key, attr in cls._Attributes.items():
+        val = getattr(state, key)
+        if attr.get('nested', False):
+            val = merge_ports(getattr(resource, key), val)
+        _set_changed(resource, key, val)
+
+def _unchanged(current: Any, val: Any) -> bool:
+    """
+    Return if given attribute values are the same.
+
+    Resources are compared by identity. Lists of resources are the same if
+    they contain the same objects (The database does not store their order).
+    """
+
+    if isinstance(current, list) and isinstance(val, list):
+        return len(current) == len(val) \
+            and { id(obj) for obj in current } == { id(obj) for obj in val }
+    if isinstance(current, BaseResource) or isinstance(val, BaseResource):
+        return current is val
+    return type(current) is type(val) and current == val
+
+def _set_changed(resource: BaseResource, key: str, val: Any) -> None:
+    """Set attribute of given resource if its value changes"""
+
+    if not _unchanged(getattr(resource, key), val):
+        setattr(resource, key, val)
+
+def merge_ports(current: List, ports: List) -> List:
+    """
+    Merge list of new ports into list of current ports by name.
+
+    Current ports that have the same name as a new port are kept and
+    updated in place to the state of the new port (See
+    :func:`update_resource`) instead of being replaced by the new port.
+    Otherwise the new port would get inserted into the database before the
+    current port gets deleted, violating the uniqueness of port names.
+
+    Works for ports (See :class:`Port`) as well as port models (See
+    :class:`PortModel`).
+
+    :param current: Current ports
+
+    :param ports: New ports
+
+    :return: List of ports in order of new ports
+    """
+
+    by_name = { port._name: port for port in current }
+
+    merged = []
+    for port in ports:
+        existing = by_name.pop(port._name, None)
+        if existing is None:
+            merged.append(port)
+            continue
 
-        # Create port object with given parameter
-        obj = Port(**port)
-        objs.append(obj)
+        update_resource(existing, port)
+        merged.append(existing)
 
-    return objs
+    return merged
@@ -37,10 +37,12 @@ def modify_switch_model(session, resource_id: str, **kwargs) -> SwitchModel:
 
     # Apply modifications
     for key, val in kwargs.items():
+        if key == 'ports':
+            val = merge_ports(sm.ports, val)
         setattr(sm, key, val)
 
     session.add(sm)
-    session.commit()
+    commit(session)
 
     return sm
 
@@ -81,24 +83,23 @@ def modify_port_model(session,
             "Given port model '{}' of given switch model '{}' does not exist"
             .format(port_model_resource_id, switch_model_resource_id))
 
-    # Replace list of network protocol strings with list of network protocol objects
-    if 'network_protocols' in kwargs:
-        kwargs['network_protocols'] = [ query_network_protocol(session, proto)
-                                        for proto in kwargs['network_protocols'] ]
-
-    # Replace connector string with connector object
-    if 'connector' in kwargs and kwargs['connector'] is not None:
-        kwargs['connector'] = query_connector(session, kwargs['connector'])
+    # Replace network protocol strings and connector string with objects
+    resolve_port_models(session, [ kwargs ])
 
     # Check all arguments before making any changes
     PortModel.check_params(**kwargs)
+    if 'name' in kwargs and kwargs['name'] != port_model_resource_id:
+        if sm.port(kwargs['name']) is not None:
+            raise ValueError(
+                "Cannot rename port model to '{}' - port model already exists"
+                .format(kwargs['name']))
 
     # Apply modifications
     for key, val in kwargs.items():
         setattr(pm, key, val)
 
     session.add(pm)
-    session.commit()
+    commit(session)
     return pm
 
 def modify_switch(session, resource_id: str, **kwargs) -> Switch:
@@ -139,10 +140,12 @@ def modify_switch(session, resource_id: str, **kwargs) -> Switch:
 
     # Apply modifications
     for key, val in kwargs.items():
+        if key == 'ports':
+            val = merge_ports(sw.ports, val)
         setattr(sw, key, val)
 
     session.add(sw)
-    session.commit()
+    commit(session)
     return sw
 
 def modify_port(
@@ -184,10 +187,7 @@ def modify_port(
             .format(port_resource_id, switch_resource_id))
 
     # Replace list of vlan strings with list of vlan objects
-    if 'vlans' in kwargs:
-        kwargs['vlans'] = [ query_vlan(session, v) for v in kwargs['vlans'] ]
-        if None in kwargs['vlans']:
-            raise ValueError('Given vlan in list of vlans of port does not exist')
+    resolve_ports(session, [ kwargs ])
 
     # Check all arguments before making any changes
     Port.check_params(**kwargs)
@@ -203,7 +203,7 @@ def modify_port(
     sw.ports = sw.ports
 
     session.add(pt)
-    session.commit()
+    commit(session)
     return pt
 
 def modify_network_protocol(session, resource_id: str, **kwargs) -> NetworkProtocol:
@@ -239,7 +239,7 @@ def modify_network_protocol(session, resource_id: str, **kwargs) -> NetworkProto
         setattr(np, key, val)
 
     session.add(np)
-    session.commit()
+    commit(session)
 
     return np
 
@@ -275,7 +275,7 @@ def modify_connector(session, resource_id: str, **kwargs) -> Connector:
         setattr(cn, key, val)
 
     session.add(cn)
-    session.commit()
+    commit(session)
 
     return cn
 
@@ -312,6 +312,6 @@ def modify_vlan(session, resource_id: str, **kwargs) -> Vlan:
         setattr(vl, key, val)
 
     session.add(vl)
-    session.commit()
+    commit(session)
 
     return vl
@@ -1,8 +1,341 @@
+import string
+import sys
+
+from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import distinct
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.orm import Load
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import MultipleResultsFound
+from sqlalchemy.ext import baked
 
 from switchmng.schema import *
+from switchmng.schema.port import vlans_ports_mapping
+from switchmng.schema.port_model import network_protocols_port_models_mapping
+from switchmng.schema.revision import revision_counter
+
+LOADING_PROFILES: Dict[str, Tuple[Any, ...]] = {
+    # Switch with everything needed by :meth:`Switch.jsonify`
+    'switch': (
+        joinedload(Switch._model),
+        selectinload(Switch._ports).selectinload(Port._vlans),
+    ),
+
+    # Port with everything needed by :meth:`Port.jsonify`
+    'port': (
+        selectinload(Port._vlans),
+    ),
+
+    # Switch model with everything needed by :meth:`SwitchModel.jsonify`
+    'switch_model': (
+        selectinload(SwitchModel._ports).selectinload(PortModel._network_protocols),
+        selectinload(SwitchModel._ports).joinedload(PortModel._connector),
+    ),
+
+    # Port model with everything needed by :meth:`PortModel.jsonify`
+    'port_model': (
+        selectinload(PortModel._network_protocols),
+        joinedload(PortModel._connector),
+    ),
+}
+"""
+Named loading profiles for eagerly loading relationships of resources.
+
+Every profile is a tree of loader options that loads all relationships
+needed for a specific response shape with a fixed number of SQL statements
+(independent of the number of returned rows) instead of lazily loading
+every relationship of every row one after another.
+"""
+
+def _apply_profile(query, profile: Optional[str]):
+    """
+    Apply loading profile with given name to given query.
+
+    :param profile: Name of loading profile (See :data:`LOADING_PROFILES`)
+        or None to load all relationships lazily.
+    """
+
+    if profile is None:
+        return query
+    if profile not in LOADING_PROFILES:
+        raise ValueError("Unknown loading profile '{}'".format(profile))
+    return query.options(*LOADING_PROFILES[profile])
+
+def _apply_fields(query, cls: type, fields: Optional[Dict[str, Any]]):
+    """
+    Restrict loading of given query to selection of attributes.
+
+    Only columns and relationships backing the selected attributes (and
+    the resource identifier) are loaded. Selected relationships are loaded
+    eagerly like with a loading profile, all other relationships are never
+    loaded.
+
+    :param cls: Resource class queried by given query
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields` or None to load everything
+        needed by :meth:`BaseResource.jsonify`.
+    """
+
+    return query.options(*_field_options(cls, fields, None))
+
+def _field_options(cls: type, fields: Optional[Dict[str, Any]], parent) -> List:
+    """
+    Return loader options for selection of attributes of given resource class.
+
+    :param parent: Loader option of the relationship leading to given
+        resource class or None if resource class is queried directly.
+    """
+
+    mapper = inspect(cls)
+    options = []
+    columns = { cls._Attributes[cls.ResourceIdentifier]['private'], '_revision' }
+
+    for key, attribute in cls._Attributes.items():
+        if fields is not None and key not in fields:
+            continue
+
+        private = attribute['private']
+        if private not in mapper.relationships:
+            columns.add(private)
+            continue
+
+        # Collections get loaded with a second statement,
+        # single objects get joined.
+        if mapper.relationships[private].uselist:
+            loader = 'selectinload'
+        else:
+            loader = 'joinedload'
+        if parent is None:
+            option = getattr(Load(cls), loader)(getattr(cls, private))
+        else:
+            option = getattr(parent, loader)(getattr(cls, private))
+
+        # Restrict nested resources to their selected attributes as well
+        if attribute.get('nested', False):
+            nested = None if fields is None else fields[key]
+            options.extend(_field_options(attribute['type'], nested, option))
+        else:
+            options.append(option)
+
+    if parent is None:
+        options.append(Load(cls).load_only(*columns))
+    else:
+        options.append(parent.load_only(*columns))
+
+    return options
+
+def _result(query, yield_per: Optional[int]):
+    """
+    Return result of given query.
 
-def query_switch_model(session, resource_id: str) -> Optional[SwitchModel]:
+    :param yield_per: If None return all resulting objects as a list.
+        Otherwise return an iterator fetching resulting objects in batches of
+        this size.
+    """
+
+    if yield_per is None:
+        return query.all()
+    if not isinstance(yield_per, int):
+        raise TypeError('Given batch size is not of type int')
+    if yield_per < 1:
+        raise ValueError('Given batch size has to be positive')
+    return iter(query.yield_per(yield_per))
+
+def _paginate(query, columns: List, key_type: type, limit: Optional[int], after):
+    """
+    Order given query by given key columns and apply keyset pagination.
+
+    Has to be applied after all other filters because the query cannot
+    be filtered any more once it is limited.
+
+    :param columns: Columns that together uniquely identify a row
+
+    :param key_type: Type of the value of every key column or tuple of
+        the types of the values of all key columns
+
+    :param limit: Maximum number of rows to return or None for all rows
+
+    :param after: Key of the last row of the previous page or None to start
+        at the first row. For a single key column this is a single value,
+        for multiple key columns a tuple with a value for every column.
+    """
+
+    query = query.order_by(*columns)
+
+    if after is not None:
+        query = query.filter(_after(columns, key_type, after))
+
+    if limit is not None:
+        _check_limit(limit)
+        query = query.limit(limit)
+
+    return query
+
+def _after(columns: List, key_type: Union[type, Tuple[type, ...]], after):
+    """
+    Return condition selecting rows ordered after given key.
+
+    See :func:`_paginate` for a description of the parameters.
+    """
+
+    if len(columns) == 1:
+        after = (after, )
+    key_types = key_type if isinstance(key_type, tuple) else (key_type, ) * len(columns)
+    if not isinstance(after, (tuple, list)) \
+            or len(after) != len(columns) \
+            or not all(isinstance(val, typ) for val, typ in zip(after, key_types)):
+        raise TypeError("Given pagination key '{}' is invalid".format(after))
+
+    # Build (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ...
+    conditions = []
+    for i, column in enumerate(columns):
+        equal = [ columns[j] == after[j] for j in range(i) ]
+        conditions.append(and_(*equal, column > after[i]))
+    return or_(*conditions)
+
+def _check_limit(limit) -> None:
+    """Check given maximum number of rows to return"""
+
+    if not isinstance(limit, int):
+        raise TypeError('Given pagination limit is not of type int')
+    if limit < 0:
+        raise ValueError('Given pagination limit is negative')
+
+_PORT_KEYS = {
+    Port:      (Port._port_id, Port._switch_id, Switch, Switch._switch_id),
+    PortModel: (PortModel._port_model_id, PortModel._switch_model_id,
+                SwitchModel, SwitchModel._switch_model_id),
+}
+"""Primary key and parent columns of ports and port models"""
+
+def _port_key(session, cls: type, parent_id: Optional[int], after):
+    """
+    Return pagination key of port or port model with given resource identifier.
+
+    Ports and port models are paginated by their primary key, so that pages
+    list them in the order they were added to their switch or switch model
+    (like :attr:`Switch.ports` and :attr:`SwitchModel.ports`). Pages are
+    still continued after the resource identifier of the last port.
+
+    :param cls: :class:`Port` or :class:`PortModel`
+
+    :param parent_id: Primary key of the switch or switch model of the
+        ports or None for ports of all switches or switch models
+
+    :param after: Resource identifier of the last port of the previous page
+        or None to start at the first port. Without parent a tuple of
+        resource identifiers of switch (model) and port.
+
+    :raises KeyError: When the given port does not exist
+
+    :return: Primary key of the port or, without parent, tuple of resource
+        identifier of switch (model) and primary key of the port
+    """
+
+    if after is None:
+        return None
+
+    port_id, port_parent_id, parent, parent_pk = _PORT_KEYS[cls]
+    if parent_id is not None:
+        _after([ cls._name ], str, after)
+        statement = select([ port_id ]).where(and_(
+            port_parent_id == parent_id,
+            cls._name == after))
+    else:
+        _after([ parent._name, cls._name ], str, after)
+        statement = select([ port_id ]).where(and_(
+            port_parent_id == parent_pk,
+            parent._name == after[0],
+            cls._name == after[1]))
+
+    key = session.execute(statement).scalar()
+    if key is None:
+        raise KeyError("Given pagination key '{}' does not exist".format(after))
+    return key if parent_id is not None else (after[0], key)
+
+_bakery = baked.bakery()
+"""Cache of compiled statements of point lookups"""
+
+def _identifier(cls: type):
+    """Return column of resource identifier of given resource class"""
+
+    return getattr(cls, cls._Attributes[cls.ResourceIdentifier]['private'])
+
+def _filter_identifier(query, cls: type, parent: Optional[type]):
+    """
+    Filter given query by resource identifier.
+
+    The resource identifier is given as bound parameter ``resource_id``. If
+    a parent class is given the resource identifier of the parent resource
+    is given as bound parameter ``parent_resource_id``.
+    """
+
+    query = query.filter(_identifier(cls) == bindparam('resource_id'))
+    if parent is not None:
+        query = query.join(parent)
+        query = query.filter(_identifier(parent) == bindparam('parent_resource_id'))
+    return query
+
+def _lookup(
+        session,
+        cls: type,
+        resource_id,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        parent: Optional[type] = None,
+        parent_resource_id = None):
+    """
+    Query single resource by resource identifier with a single statement.
+
+    The statement is compiled once for every resource class and loading
+    profile and then taken from a cache (See :mod:`sqlalchemy.ext.baked`).
+    Lookups with a selection of attributes are not cached.
+
+    :param parent: Class of resource containing the resource to query
+        (e.g. :class:`Switch` for :class:`Port`) or None if resource is not
+        contained in another resource.
+
+    :param parent_resource_id: Resource identifier of containing resource
+
+    :return: The resource or None if no matching resource was found
+    """
+
+    params = { 'resource_id': resource_id, 'parent_resource_id': parent_resource_id }
+
+    if fields is None:
+        query = _bakery(lambda s: s.query(cls), cls, parent)
+        query.add_criteria(lambda q: _apply_profile(q, profile), profile)
+        query += lambda q: _filter_identifier(q, cls, parent)
+        result = query(session).params(**params)
+    else:
+        result = session.query(cls)
+        result = _apply_fields(result, cls, fields)
+        result = _filter_identifier(result, cls, parent).params(**params)
+
+    try:
+        return result.one_or_none()
+    except MultipleResultsFound:
+        raise TypeError('DB query resulted in multiple elements but only one was requested')
+
+def query_switch_model(
+        session,
+        resource_id: str,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None) -> Optional[SwitchModel]:
     """
     Retrieve :class:`SwitchModel` object from database.
 
@@ -13,6 +346,14 @@ def query_switch_model(session, resource_id: str) -> Optional[SwitchModel]:
         switch model to return.
         (See :class:`SwitchModel` for what attribute is the resource identifier)
 
+    :param profile: Name of loading profile to load relationships of
+        switch model with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
     :return: The switch model object matching the given resource identifier or
         None if no matching switch model resource was found.
     """
@@ -20,18 +361,14 @@ def query_switch_model(session, resource_id: str) -> Optional[SwitchModel]:
     if not isinstance(resource_id, str):
         raise TypeError('Cannot query switch model with resource id not of type str')
 
-    model = session.query(SwitchModel)
-    model = model.filter_by(_name = resource_id)
-
-    if len(model.all()) > 1:
-        raise TypeError('DB query resulted in multiple elements but only one was requested')
-
-    return model.first()
+    return _lookup(session, SwitchModel, resource_id, profile, fields)
 
 def query_port_model(
         session,
         switch_model_resource_id: str,
-        port_model_resource_id: str) -> Optional[PortModel]:
+        port_model_resource_id: str,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None) -> Optional[PortModel]:
     """
     Retrieve :class:`PortModel` object from database.
 
@@ -46,17 +383,43 @@ def query_port_model(
         uniquely identifying the port model to return.
         (See :class:`PortModel` for what attribute is the resource identifier)
 
+    :param profile: Name of loading profile to load relationships of
+        port model with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
     :return: The port model object matching the given resource identifiers or
         None if no matching port model resource was found.
     """
 
-    sm = query_switch_model(session, switch_model_resource_id)
-    if sm is None:
+    if not isinstance(switch_model_resource_id, str):
+        raise TypeError('Cannot query switch model with resource id not of type str')
+
+    pm = None
+    if isinstance(port_model_resource_id, str):
+        pm = _lookup(
+            session,
+            PortModel,
+            port_model_resource_id,
+            profile,
+            fields,
+            SwitchModel,
+            switch_model_resource_id)
+
+    # Only check if switch model exists if port model was not found
+    if pm is None and query_switch_model(session, switch_model_resource_id) is None:
         raise ValueError('Given switch model does not exist')
 
-    return sm.port(port_model_resource_id)
+    return pm
 
-def query_switch(session, resource_id: str) -> Optional[Switch]:
+def query_switch(
+        session,
+        resource_id: str,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None) -> Optional[Switch]:
     """
     Retrieve :class:`Switch` object from database.
 
@@ -67,6 +430,14 @@ def query_switch(session, resource_id: str) -> Optional[Switch]:
         switch to return.
         (See :class:`Switch` for what attribute is the resource identifier)
 
+    :param profile: Name of loading profile to load relationships of
+        switch with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
     :return: The switch object matching the given resource identifier or None
         if no matching switch resource was found.
     """
@@ -74,18 +445,14 @@ def query_switch(session, resource_id: str) -> Optional[Switch]:
     if not isinstance(resource_id, str):
         raise TypeError('Cannot query switch with resource id not of type str')
 
-    sw = session.query(Switch)
-    sw = sw.filter_by(_name = resource_id)
-
-    if len(sw.all()) > 1:
-        raise TypeError('DB query resulted in multiple elements but only one was requested')
-
-    return sw.first()
+    return _lookup(session, Switch, resource_id, profile, fields)
 
 def query_port(
         session,
         switch_resource_id: str,
-        port_resource_id: str) -> Optional[Port]:
+        port_resource_id: str,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None) -> Optional[Port]:
     """
     Retrieve :class:`Port` object from database.
 
@@ -100,15 +467,37 @@ def query_port(
         uniquely identifying the port to return.
         (See :class:`Port` for what attribute is the resource identifier)
 
+    :param profile: Name of loading profile to load relationships of
+        port with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
     :return: The port object matching the given resource identifiers or None
         if no matching port resource was found.
     """
 
-    sw = query_switch(session, switch_resource_id)
-    if sw is None:
+    if not isinstance(switch_resource_id, str):
+        raise TypeError('Cannot query switch with resource id not of type str')
+
+    pt = None
+    if isinstance(port_resource_id, str):
+        pt = _lookup(
+            session,
+            Port,
+            port_resource_id,
+            profile,
+            fields,
+            Switch,
+            switch_resource_id)
+
+    # Only check if switch exists if port was not found
+    if pt is None and query_switch(session, switch_resource_id) is None:
         raise ValueError('Given switch does not exist')
 
-    return sw.port(port_resource_id)
+    return pt
 
 def query_network_protocol(session, resource_id: str) -> Optional[NetworkProtocol]:
     """
@@ -128,13 +517,7 @@ def query_network_protocol(session, resource_id: str) -> Optional[NetworkProtoco
     if not isinstance(resource_id, str):
         raise TypeError('Cannot query network protocol with resource id not of type str')
 
-    pt = session.query(NetworkProtocol)
-    pt = pt.filter_by(_name = resource_id)
-
-    if len(pt.all()) > 1:
-        raise TypeError('DB query resulted in multiple elements but only one was requested')
-
-    return pt.first()
+    return _lookup(session, NetworkProtocol, resource_id)
 
 def query_connector(session, resource_id: str) -> Optional[Connector]:
     """
@@ -154,13 +537,7 @@ def query_connector(session, resource_id: str) -> Optional[Connector]:
     if not isinstance(resource_id, str):
         raise TypeError('Cannot query connector with resource id not of type str')
 
-    cn = session.query(Connector)
-    cn = cn.filter_by(_name = resource_id)
-
-    if len(cn.all()) > 1:
-        raise TypeError('DB query resulted in multiple elements but only one was requested')
-
-    return cn.first()
+    return _lookup(session, Connector, resource_id)
 
 def query_vlan(session, resource_id: str) -> Optional[Vlan]:
     """
@@ -180,70 +557,240 @@ def query_vlan(session, resource_id: str) -> Optional[Vlan]:
     if not isinstance(resource_id, int):
         raise TypeError('Cannot query vlan with resource id not of type int')
 
-    vl = session.query(Vlan)
-    vl = vl.filter_by(_tag = resource_id)
+    return _lookup(session, Vlan, resource_id)
 
-    if len(vl.all()) > 1:
-        raise TypeError('DB query resulted in multiple elements but only one was requested')
+def query_revision(
+        session,
+        cls: type,
+        resource_id,
+        parent: Optional[type] = None,
+        parent_resource_id = None) -> Optional[int]:
+    """
+    Retrieve revision of a single resource from database.
+
+    Only the revision column is read, neither the resource nor any of its
+    relationships are loaded. (See :mod:`switchmng.database.tracking` for
+    when the revision of a resource changes)
+
+    :param cls: Class of resource to return revision of
+
+    :param resource_id: Resource identifier of resource
 
-    return vl.first()
+    :param parent: Class of resource containing the resource (e.g.
+        :class:`Switch` for :class:`Port`) or None if resource is not
+        contained in another resource.
 
-def query_switch_models(session, **kwargs):
+    :param parent_resource_id: Resource identifier of containing resource
+
+    :return: Revision of resource or None if no matching resource was found
+    """
+
+    params = { 'resource_id': resource_id, 'parent_resource_id': parent_resource_id }
+
+    query = _bakery(lambda s: s.query(cls._revision), cls, parent)
+    query += lambda q: _filter_identifier(q, cls, parent)
+    return query(session).params(**params).scalar()
+
+def query_current_revision(session) -> int:
+    """
+    Retrieve revision of the last committed change to any resource.
+
+    The revision increases with every transaction changing resources, so
+    that collections of resources can only have changed if it changed.
+    """
+
+    return session.execute(select([ revision_counter.c.revision ])).scalar()
+
+def query_switch_models(
+        session,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`SwitchModel` objects from database.
 
-    # TODO: Implement and document query_switch_models() correctly
+    Only switch models matching all given filters are returned.
+    All filtering is done by the database.
+
+    :param size: Only return switch models of this size
+    :type size: int
+
+    :param network_protocol: Name of a network protocol. Only return switch
+        models with at least one port supporting this network protocol.
+    :type network_protocol: str
+
+    :param network_protocols: List of network protocol names. Only return
+        switch models with ports supporting these network protocols
+        (See ``network_protocols_match``).
+    :type network_protocols: list
+
+    :param network_protocols_match: Either ``'any'`` (default) to return
+        switch models supporting at least one of the given network protocols
+        or ``'all'`` to return only switch models supporting every given
+        network protocol (not necessarily on the same port).
+    :type network_protocols_match: str
+
+    :param min_speed: Only return switch models with at least one port
+        supporting a network protocol with at least this speed in Mb/s.
+    :type min_speed: int
+
+    :param profile: Name of loading profile to load relationships of
+        returned switch models with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
+    :param limit: Maximum number of switch models to return or None to return
+        all matching switch models.
+    :type limit: int
+
+    :param after: Resource identifier of the last switch model of the previous
+        page. Only switch models ordered after it are returned. Switch models
+        are always ordered by their resource identifier.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
+    :return: List of matching switch models
     """
 
     # TODO: Add csv output option to query_switch_models()
 
-    # Check all arguments before querying
-    SwitchModel.check_params(**kwargs)
+    protocols_match = kwargs.pop('network_protocols_match', 'any')
+    if protocols_match not in ('any', 'all'):
+        raise ValueError("Given network protocol match mode '{}' is neither 'any' nor 'all'"
+            .format(protocols_match))
 
     # Query
     models = session.query(SwitchModel)
+    if fields is None:
+        models = _apply_profile(models, profile)
+    else:
+        models = _apply_fields(models, SwitchModel, fields)
 
     # Filter with SQL
+    names = set()
     for key, val in kwargs.items():
         if key == 'size':
+            if not isinstance(val, int):
+                raise TypeError('Given size of switch model is not of type int')
             models = models.filter_by(_size = val)
         elif key == 'network_protocol':
-            val = query_network_protocols(val)
-            if val is None:
-                raise ValueError('Given network protocol does not exist')
+            if not isinstance(val, str):
+                raise TypeError('Given network protocol of switch model is not of type str')
+            names.add(val)
+        elif key == 'network_protocols':
+            if not isinstance(val, list) or not all(isinstance(v, str) for v in val):
+                raise TypeError(
+                    'Given network protocols of switch model are not of type list of str')
+            names.update(val)
+        elif key == 'min_speed':
+            if not isinstance(val, int):
+                raise TypeError('Given minimum speed of switch model is not of type int')
+            models = models.filter(SwitchModel._switch_model_id.in_(
+                _switch_model_ids_with_protocols(
+                    session,
+                    NetworkProtocol._speed >= val)))
         else:
             raise TypeError(
                 "Cannot query switch models with unexpected filter '{}'".format(key))
 
-    models = models.all()
+    if len(names) > 0:
+        # Check that all given network protocols exist
+        existing = session.query(NetworkProtocol._name)
+        existing = existing.filter(NetworkProtocol._name.in_(names))
+        missing = names - { name for name, in existing }
+        if len(missing) > 0:
+            raise ValueError('Given network protocol(s) {} do not exist'
+                .format(', '.join(sorted(missing))))
 
-    # TODO: When querying switch models don't filter manually but let database do the work
+        models = models.filter(SwitchModel._switch_model_id.in_(
+            _switch_model_ids_with_protocols(
+                session,
+                NetworkProtocol._name.in_(names),
+                len(names) if protocols_match == 'all' else None)))
 
-    # Filter manually
-    for key, val in kwargs.items():
-        if key == 'size':
-            pass
-        elif key == 'network_protocol':
-            new_models = list()
-            np = val
-            for model in models:
-                for port in model.ports:
-                    if np in port['network_protocols']:
-                        new_models.append(model)
-                        break
-            models = new_models
-        else:
-            raise TypeError(
-                "Cannot query switch models with unexpected filter '{}'".format(key))
+    models = _paginate(models, [ SwitchModel._name ], str, limit, after)
+
+    return _result(models, yield_per)
+
+def _switch_model_ids_with_protocols(session, condition, count: Optional[int] = None):
+    """
+    Return subquery selecting ids of switch models with ports supporting
+    network protocols.
+
+    :param condition: Condition network protocols have to fulfill
 
-    return models
+    :param count: If given only select switch models supporting at least
+        this many distinct network protocols fulfilling given condition.
+    """
 
-def query_port_models(session, switch_model_resource_id, **kwargs):
+    ids = session.query(PortModel._switch_model_id)
+    ids = ids.join(
+        network_protocols_port_models_mapping,
+        network_protocols_port_models_mapping.c.port_model_id
+            == PortModel._port_model_id)
+    ids = ids.join(
+        NetworkProtocol,
+        NetworkProtocol._network_protocol_id
+            == network_protocols_port_models_mapping.c.network_protocol_id)
+    ids = ids.filter(condition)
+
+    if count is not None:
+        ids = ids.group_by(PortModel._switch_model_id)
+        ids = ids.having(func.count(distinct(NetworkProtocol._name)) == count)
+    else:
+        ids = ids.distinct()
+
+    return ids.subquery()
+
+def query_port_models(
+        session,
+        switch_model_resource_id,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`PortModel` objects from database.
 
     switch_model_resource_id is optional
 
+    :param profile: Name of loading profile to load relationships of
+        returned port models with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
+    :param limit: Maximum number of port models to return or None to return
+        all matching port models.
+    :type limit: int
+
+    :param after: Resource identifier of the last port model of the previous
+        page. Only port models ordered after it are returned. Port models are
+        always ordered like they were added to their switch model. If no
+        switch model is given port models are ordered by resource identifier
+        of switch model first and this has to be a tuple of resource
+        identifiers of switch model and port model.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
     # TODO: Implement and document query_port_models() correctly
     """
 
@@ -254,6 +801,10 @@ def query_port_models(session, switch_model_resource_id, **kwargs):
 
     # Query
     port_models = session.query(PortModel)
+    if fields is None:
+        port_models = _apply_profile(port_models, profile)
+    else:
+        port_models = _apply_fields(port_models, PortModel, fields)
 
     # Filter by switch model if given
     if switch_model_resource_id is not None:
@@ -262,6 +813,10 @@ def query_port_models(session, switch_model_resource_id, **kwargs):
             raise ValueError('Given switch does not exist')
 
         port_models = port_models.filter_by(_switch_model_id = sm._switch_model_id)
+    else:
+        port_models = port_models.join(
+            SwitchModel,
+            SwitchModel._switch_model_id == PortModel._switch_model_id)
 
     # Filter
     for key, val in kwargs.items():
@@ -273,83 +828,280 @@ def query_port_models(session, switch_model_resource_id, **kwargs):
         else:
             raise NotImplementedError('query_port_models() is not yet implemented')
 
-    return port_models.all()
-
-def query_switches(session, **kwargs):
+    # Paginate after filtering
+    if switch_model_resource_id is not None:
+        port_models = _paginate(
+            port_models,
+            [ PortModel._port_model_id ],
+            int, limit,
+            _port_key(session, PortModel, sm._switch_model_id, after))
+    else:
+        port_models = _paginate(
+            port_models,
+            [ SwitchModel._name, PortModel._port_model_id ],
+            (str, int), limit,
+            _port_key(session, PortModel, None, after))
+
+    return _result(port_models, yield_per)
+
+def query_switches(
+        session,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`Switch` objects from database.
 
-    # TODO: Implement and document query_switches() correctly
+    Only switches matching all given filters are returned.
+    All filtering is done by the database.
+
+    :param location: Only return switches at this location
+    :type location: int
+
+    :param model: Resource identifier of a switch model.
+        Only return switches of this switch model.
+    :type model: str
+
+    :param vlan: Tag of a vlan. Only return switches with at least one port
+        carrying this vlan.
+    :type vlan: int
+
+    :param vlans: List of vlan tags. Only return switches with ports carrying
+        these vlans (See ``vlans_match``).
+    :type vlans: list
+
+    :param vlans_match: Either ``'any'`` (default) to return switches carrying
+        at least one of the given vlans or ``'all'`` to return only switches
+        carrying every given vlan (not necessarily on the same port).
+    :type vlans_match: str
+
+    :param profile: Name of loading profile to load relationships of
+        returned switches with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
+    :param limit: Maximum number of switches to return or None to return
+        all matching switches.
+    :type limit: int
+
+    :param after: Resource identifier of the last switch of the previous page.
+        Only switches ordered after it are returned. Switches are always
+        ordered by their resource identifier.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
+    :return: List of matching switches
     """
 
     # TODO: Add csv output option to query_switches()
 
-    # Check all arguments before querying
-    Switch.check_params(**kwargs)
+    vlans_match = kwargs.pop('vlans_match', 'any')
+    if vlans_match not in ('any', 'all'):
+        raise ValueError("Given vlan match mode '{}' is neither 'any' nor 'all'"
+            .format(vlans_match))
 
     # Query
     switches = session.query(Switch)
+    if fields is None:
+        switches = _apply_profile(switches, profile)
+    else:
+        switches = _apply_fields(switches, Switch, fields)
 
     # Filter with SQL
+    tags = set()
     for key, val in kwargs.items():
         if key == 'location':
             if not isinstance(val, int):
                 raise TypeError('Given location of switch is not of type int')
             switches = switches.filter_by(_location = val)
         elif key == 'model':
-            kwargs['model'] = query_switch_model(session, val)
-            if kwargs['model'] is None:
+            sm = query_switch_model(session, val)
+            if sm is None:
                 raise ValueError(
-                    "Got invalid switch model '{}' - switch model does not exist")
-            switches = switches.filter_by(_model = kwargs['model'])
+                    "Got invalid switch model '{}' - switch model does not exist"
+                    .format(val))
+            switches = switches.filter_by(_model_id = sm._switch_model_id)
         elif key == 'vlan':
             if not isinstance(val, int):
                 raise TypeError('Given vlan of port of switch is not of type int')
+            tags.add(val)
+        elif key == 'vlans':
+            if not isinstance(val, list) or not all(isinstance(v, int) for v in val):
+                raise TypeError('Given vlans of ports of switch are not of type list of int')
+            tags.update(val)
         else:
             raise TypeError(
                 "Cannot query switches with unexpected filter '{}'".format(key))
 
-    switches = switches.all()
+    if len(tags) > 0:
+        switches = switches.filter(
+            Switch._switch_id.in_(_switch_ids_with_vlans(session, tags, vlans_match)))
 
-    # TODO: When querying switches don't filter manually but let database do the work
+    switches = _paginate(switches, [ Switch._name ], str, limit, after)
 
-    # Filter manually
-    for key, val in kwargs.items():
-        if key == 'location':
-            pass
-        elif key == 'model':
-            pass
-        elif key == 'vlan':
-            new_switches = list()
-            vl = val
-            for switch in switches:
-                for port in switch.ports:
-                    if vl in port['vlans']:
-                        new_switches.append(switch)
-                        break
-            switches = new_switches
-        else:
-            raise TypeError(
-                "Cannot query switches with unexpected filter '{}'".format(key))
+    return _result(switches, yield_per)
+
+def _switch_ids_with_vlans(session, tags: Set[int], vlans_match: str):
+    """
+    Return subquery selecting ids of switches with ports carrying vlans.
+
+    The subquery starts at the given vlan tags and walks the association
+    table to the ports, so its cost only depends on the number of matching
+    rows and not on the number of switches or ports in the database.
 
-    return switches
+    :param tags: Set of vlan tags to look for
+
+    :param vlans_match: Either ``'any'`` or ``'all'``.
+        See :func:`query_switches`.
+    """
+
+    ids = session.query(Port._switch_id)
+    ids = ids.join(vlans_ports_mapping,
+                   vlans_ports_mapping.c.port_id == Port._port_id)
+    ids = ids.join(Vlan, Vlan._vlan_id == vlans_ports_mapping.c.vlan_id)
+    ids = ids.filter(Vlan._tag.in_(tags))
+
+    if vlans_match == 'all':
+        ids = ids.group_by(Port._switch_id)
+        ids = ids.having(func.count(distinct(Vlan._tag)) == len(tags))
+    else:
+        ids = ids.distinct()
+
+    return ids.subquery()
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+"""Translation table folding ASCII letters like the NOCASE collation of SQLite"""
+
+def _target_condition(target: str, match: str = 'exact', ignore_case: bool = False):
+    """
+    Return condition selecting ports connected to given target.
+
+    Conditions are built so that they are answered with the indexes on the
+    target column of ports. Exact lookups compare for equality. Prefix
+    lookups select the range of values starting with the prefix instead of
+    using ``LIKE``, which cannot use these indexes. Case-insensitive lookups
+    compare with the NOCASE collation, which only folds ASCII letters.
+
+    :param target: Target or prefix of targets to look for
+
+    :param match: Either ``'exact'`` or ``'prefix'``
+
+    :param ignore_case: Compare target case-insensitively
+    """
 
-def query_ports(session, switch_resource_id, **kwargs):
+    if not isinstance(target, str):
+        raise TypeError('Given target is not of type str')
+    if len(target) == 0:
+        raise ValueError('Given target is empty')
+    if match not in ('exact', 'prefix'):
+        raise ValueError("Given target match mode '{}' is neither 'exact' nor 'prefix'"
+            .format(match))
+    if not isinstance(ignore_case, bool):
+        raise TypeError('Given target case mode is not of type bool')
+
+    column = Port._target
+    if ignore_case:
+        column = column.collate('NOCASE')
+        target = target.translate(_ASCII_LOWER)
+
+    if match == 'exact':
+        return column == target
+
+    # Values starting with prefix are ordered before the prefix with its
+    # last character incremented (skipping surrogates that cannot be stored)
+    condition = column >= target
+    last = ord(target[-1]) + 1
+    if last <= sys.maxunicode:
+        last = 0xE000 if 0xD800 <= last < 0xE000 else last
+        condition = and_(condition, column < target[:-1] + chr(last))
+
+    # The incremented character might be folded to a letter ordered after
+    # other characters, so check the prefix of the remaining rows
+    if ignore_case:
+        condition = and_(condition,
+            func.substr(Port._target, 1, len(target)).collate('NOCASE') == target)
+
+    return condition
+
+def query_ports(
+        session,
+        switch_resource_id,
+        profile: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`Port` objects from database.
 
     switch_resource_id is optional
 
+    :param profile: Name of loading profile to load relationships of
+        returned ports with. (See :data:`LOADING_PROFILES`)
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields`. If given only relationships and
+        columns backing these attributes are loaded and the loading profile
+        is ignored.
+
+    :param limit: Maximum number of ports to return or None to return
+        all matching ports.
+    :type limit: int
+
+    :param after: Resource identifier of the last port of the previous page.
+        Only ports ordered after it are returned. Ports are always ordered
+        like they were added to their switch. If no switch is given ports
+        are ordered by resource identifier of switch first and this has to
+        be a tuple of resource identifiers of switch and port.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
+    :param target: Only return ports connected to this host
+        (See ``target_match`` and ``target_ignore_case``). Ports are looked
+        up with the indexes on their target.
+    :type target: str
+
+    :param target_match: Either ``'exact'`` (default) to return ports
+        connected to the given target or ``'prefix'`` to return ports
+        connected to targets starting with it.
+    :type target_match: str
+
+    :param target_ignore_case: Compare target case-insensitively.
+        Only ASCII letters are folded.
+    :type target_ignore_case: bool
+
     # TODO: Implement and document query_ports() correctly
     """
 
     # TODO: Add csv output option to query_ports()
 
+    target_match = kwargs.pop('target_match', 'exact')
+    target_ignore_case = kwargs.pop('target_ignore_case', False)
+
     # Check all arguments before querying
     Port.check_params(**kwargs)
 
     # Query
     pts = session.query(Port)
+    if fields is None:
+        pts = _apply_profile(pts, profile)
+    else:
+        pts = _apply_fields(pts, Port, fields)
 
     # Filter by switch if given
     if switch_resource_id is not None:
@@ -358,21 +1110,58 @@ def query_ports(session, switch_resource_id, **kwargs):
             raise ValueError('Given switch does not exist')
 
         pts = pts.filter_by(_switch_id = sw._switch_id)
+    else:
+        pts = pts.join(Switch, Switch._switch_id == Port._switch_id)
 
     # Filter
     for key, val in kwargs.items():
         if key == 'vlans':
             for vlan in val:
                 pts = pts.filter(Port._vlans.contains(vlan))
+        elif key == 'target':
+            pts = pts.filter(_target_condition(val, target_match, target_ignore_case))
         else:
             raise NotImplementedError('query_ports() is not yet implemented')
 
-    return pts.all()
-
-def query_network_protocols(session, **kwargs):
+    # Paginate after filtering
+    if switch_resource_id is not None:
+        pts = _paginate(
+            pts,
+            [ Port._port_id ],
+            int, limit,
+            _port_key(session, Port, sw._switch_id, after))
+    else:
+        pts = _paginate(
+            pts,
+            [ Switch._name, Port._port_id ],
+            (str, int), limit,
+            _port_key(session, Port, None, after))
+
+    return _result(pts, yield_per)
+
+def query_network_protocols(
+        session,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`NetworkProtocol` objects from database.
 
+    :param limit: Maximum number of network protocols to return or None to return
+        all matching network protocols.
+    :type limit: int
+
+    :param after: Resource identifier of the last network protocol of the
+        previous page. Only network protocols ordered after it are returned.
+        Network protocols are always ordered by their resource identifier.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
     # TODO: Implement and document query_network_protocols() correctly
     """
 
@@ -392,12 +1181,33 @@ def query_network_protocols(session, **kwargs):
             raise TypeError(
                 "Cannot query network protocols with unexpected filter '{}'".format(key))
 
-    return nps.all()
+    nps = _paginate(nps, [ NetworkProtocol._name ], str, limit, after)
 
-def query_connectors(session, **kwargs):
+    return _result(nps, yield_per)
+
+def query_connectors(
+        session,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`Connector` objects from database.
 
+    :param limit: Maximum number of connectors to return or None to return
+        all matching connectors.
+    :type limit: int
+
+    :param after: Resource identifier of the last connector of the previous
+        page. Only connectors ordered after it are returned. Connectors are
+        always ordered by their resource identifier.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
     # TODO: Implement and document query_connectors() correctly
     """
 
@@ -416,12 +1226,33 @@ def query_connectors(session, **kwargs):
     if len(kwargs.items()) > 0:
         raise NotImplementedError('query_connectors() is not yet implemented')
 
-    return cns.all()
+    cns = _paginate(cns, [ Connector._name ], str, limit, after)
 
-def query_vlans(session, **kwargs):
+    return _result(cns, yield_per)
+
+def query_vlans(
+        session,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        yield_per: Optional[int] = None,
+        **kwargs):
     """
     Retrieve multiple :class:`Vlan` objects from database.
 
+    :param limit: Maximum number of vlans to return or None to return
+        all matching vlans.
+    :type limit: int
+
+    :param after: Resource identifier of the last vlan of the previous page.
+        Only vlans ordered after it are returned. Vlans are always ordered by
+        their resource identifier.
+
+    :param yield_per: If given return an iterator fetching resources from
+        the database in batches of this size instead of a list.
+        Resources can then be processed one by one without holding all of
+        them in memory.
+    :type yield_per: int
+
     # TODO: Implement and document query_vlans() correctly
     """
 
@@ -441,4 +1272,6 @@ def query_vlans(session, **kwargs):
             raise TypeError(
                 "Cannot query vlans with unexpected filter '{}'".format(key))
 
-    return vls.all()
+    vls = _paginate(vls, [ Vlan._tag ], int, limit, after)
+
+    return _result(vls, yield_per)
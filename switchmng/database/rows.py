@@ -0,0 +1,489 @@
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from sqlalchemy import distinct
+from sqlalchemy import func
+from sqlalchemy import select
+
+from switchmng.schema import *
+from switchmng.schema.port import vlans_ports_mapping
+from switchmng.typing import JsonDict
+
+from .query import _after
+from .query import _target_condition
+from .query import _check_limit
+from .query import _port_key
+
+# Read functions in this module select plain rows with Core statements and
+# assemble json-ready dicts from them (See :meth:`BaseResource.jsonify_row`)
+# without ever creating resource objects. Every batch of resources is
+# assembled from a fixed number of set-based statements.
+
+_Page = Callable[[Optional[int], Any], List[Tuple[Any, JsonDict]]]
+
+def _pages(
+        page: _Page,
+        limit: Optional[int],
+        after,
+        batch_size: Optional[int]) -> Iterator[JsonDict]:
+    """
+    Yield json-ready dicts of resources batch by batch.
+
+    :param page: Function reading up to given number of resources (or all
+        resources if None) ordered after given key. Returns a list of
+        tuples of key and json-ready dict of every resource.
+
+    :param limit: Maximum number of resources to yield or None for all
+        resources
+
+    :param after: Key of the last resource before the first resource to yield
+
+    :param batch_size: Maximum number of resources to read at once or None
+        to read all resources at once
+    """
+
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size
+        if remaining is not None and (size is None or remaining < size):
+            size = remaining
+
+        batch = page(size, after)
+        for _, json_dict in batch:
+            yield json_dict
+
+        if size is None or len(batch) < size:
+            return
+        if remaining is not None:
+            remaining -= len(batch)
+        after = batch[-1][0]
+
+def _read(
+        page: _Page,
+        limit: Optional[int],
+        after,
+        batch_size: Optional[int]) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Check arguments and read json-ready dicts of resources.
+
+    :return: List of all resources if no batch size is given.
+        Otherwise an iterator reading resources batch by batch.
+    """
+
+    if limit is not None:
+        _check_limit(limit)
+    if batch_size is not None:
+        if not isinstance(batch_size, int):
+            raise TypeError('Given batch size is not of type int')
+        if batch_size < 1:
+            raise ValueError('Given batch size has to be positive')
+
+    resources = _pages(page, limit, after, batch_size)
+    if batch_size is None:
+        return list(resources)
+    return resources
+
+def _selected(fields: Optional[Dict[str, Any]], key: str) -> bool:
+    """Return if attribute with given name is part of selection of attributes"""
+
+    return fields is None or key in fields
+
+def _nested(fields: Optional[Dict[str, Any]], key: str) -> Optional[Dict[str, Any]]:
+    """Return selection of attributes of nested resources"""
+
+    return None if fields is None else fields[key]
+
+def _vlan_tags(session, port_ids) -> Dict[int, List[int]]:
+    """
+    Return tags of vlans of ports selected by given statement.
+
+    :param port_ids: Statement selecting ids of ports
+
+    :return: Dict mapping id of every port carrying vlans to list of tags
+    """
+
+    tags: Dict[int, List[int]] = {}
+    statement = select([ vlans_ports_mapping.c.port_id, Vlan._tag ])
+    statement = statement.select_from(vlans_ports_mapping.join(
+        Vlan.__table__,
+        Vlan._vlan_id == vlans_ports_mapping.c.vlan_id))
+    statement = statement.where(vlans_ports_mapping.c.port_id.in_(port_ids))
+    for port_id, tag in session.execute(statement):
+        tags.setdefault(port_id, []).append(tag)
+    return tags
+
+def _ports(session, switch_ids, fields: Optional[Dict[str, Any]]) -> Dict[int, List[tuple]]:
+    """
+    Return rows of ports of switches selected by given statement.
+
+    Ports are read with one statement and their vlans with another one.
+
+    :param switch_ids: Statement selecting ids of switches
+
+    :param fields: Selection of attributes of ports
+
+    :return: Dict mapping id of every switch with ports to list of port rows
+        (See :meth:`BaseResource.jsonify_row`) ordered like they were added
+        to the switch
+    """
+
+    ports = select([ Port._switch_id, Port._port_id, Port._name, Port._target ])
+    ports = ports.where(Port._switch_id.in_(switch_ids))
+    ports = ports.order_by(Port._switch_id, Port._port_id)
+
+    tags: Dict[int, List[int]] = {}
+    if _selected(fields, 'vlans'):
+        port_ids = select([ Port._port_id ]).where(Port._switch_id.in_(switch_ids))
+        tags = _vlan_tags(session, port_ids)
+
+    rows: Dict[int, List[tuple]] = {}
+    for switch_id, port_id, name, target in session.execute(ports):
+        rows.setdefault(switch_id, []).append((name, tags.get(port_id, []), target))
+    return rows
+
+def read_switches(
+        session,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        batch_size: Optional[int] = None) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Read switches from database as json-ready dicts.
+
+    Returns the same representation as :meth:`Switch.jsonify` of the
+    switches returned by :func:`query_switches` but without creating
+    objects. Every batch of switches is read with three statements
+    (switches, ports and vlans of ports) regardless of its size.
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields` or None for all attributes.
+        Ports and vlans are only read if they are selected.
+
+    :param limit: Maximum number of switches to return or None to return
+        all switches.
+    :type limit: int
+
+    :param after: Resource identifier of the last switch of the previous page.
+        Only switches ordered after it are returned. Switches are always
+        ordered by their resource identifier.
+
+    :param batch_size: If given return an iterator reading switches from
+        the database in batches of this size instead of a list.
+    :type batch_size: int
+
+    :return: List of json-ready dicts of switches
+    """
+
+    if after is not None:
+        _after([ Switch._name ], str, after)
+
+    def page(size: Optional[int], key) -> List[Tuple[Any, JsonDict]]:
+        switches = select([
+            Switch._switch_id,
+            Switch._name,
+            SwitchModel._name,
+            Switch._location,
+            Switch._ip ])
+        switches = switches.select_from(Switch.__table__.join(
+            SwitchModel.__table__,
+            SwitchModel._switch_model_id == Switch._model_id))
+        if key is not None:
+            switches = switches.where(_after([ Switch._name ], str, key))
+        switches = switches.order_by(Switch._name).limit(size)
+
+        rows = session.execute(switches).fetchall()
+        if len(rows) == 0:
+            return []
+
+        ports: Dict[int, List[tuple]] = {}
+        if _selected(fields, 'ports'):
+            ids = switches.with_only_columns([ Switch._switch_id ])
+            ports = _ports(session, ids.alias(), _nested(fields, 'ports'))
+
+        return [ (name, Switch.jsonify_row(
+                    (name, model, ports.get(switch_id, []), location, ip),
+                    fields))
+                 for switch_id, name, model, location, ip in rows ]
+
+    return _read(page, limit, after, batch_size)
+
+def read_ports(
+        session,
+        switch_resource_id: str,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        batch_size: Optional[int] = None) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Read ports of a switch from database as json-ready dicts.
+
+    Returns the same representation as :meth:`Port.jsonify` of the ports
+    returned by :func:`query_ports` but without creating objects. Every
+    batch of ports is read with two statements (ports and vlans of ports)
+    regardless of its size.
+
+    :param switch_resource_id: Resource identifier of switch of ports
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields` or None for all attributes.
+
+    :param limit: Maximum number of ports to return or None to return
+        all ports of switch.
+    :type limit: int
+
+    :param after: Resource identifier of the last port of the previous page.
+        Only ports ordered after it are returned. Ports are always ordered
+        like they were added to the switch.
+
+    :param batch_size: If given return an iterator reading ports from
+        the database in batches of this size instead of a list.
+    :type batch_size: int
+
+    :raises ValueError: When given switch does not exist
+
+    :return: List of json-ready dicts of ports
+    """
+
+    if not isinstance(switch_resource_id, str):
+        raise TypeError('Given switch is not of type str')
+    if after is not None:
+        _after([ Port._name ], str, after)
+
+    switch = select([ Switch._switch_id ]).where(Switch._name == switch_resource_id)
+    switch_id = session.execute(switch).scalar()
+    if switch_id is None:
+        raise ValueError('Given switch does not exist')
+
+    # Ports are paginated by their primary key (See _port_key)
+    def page(size: Optional[int], key) -> List[Tuple[Any, JsonDict]]:
+        ports = select([ Port._port_id, Port._name, Port._target ])
+        ports = ports.where(Port._switch_id == switch_id)
+        if key is not None:
+            ports = ports.where(Port._port_id > key)
+        ports = ports.order_by(Port._port_id).limit(size)
+
+        rows = session.execute(ports).fetchall()
+        if len(rows) == 0:
+            return []
+
+        tags: Dict[int, List[int]] = {}
+        if _selected(fields, 'vlans'):
+            ids = ports.with_only_columns([ Port._port_id ])
+            tags = _vlan_tags(session, ids.alias())
+
+        return [ (port_id, Port.jsonify_row((name, tags.get(port_id, []), target), fields))
+                 for port_id, name, target in rows ]
+
+    return _read(page, limit, _port_key(session, Port, switch_id, after), batch_size)
+
+def read_vlans(
+        session,
+        fields: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        batch_size: Optional[int] = None) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Read vlans from database as json-ready dicts.
+
+    Returns the same representation as :meth:`Vlan.jsonify` of the vlans
+    returned by :func:`query_vlans` but without creating objects. Every
+    batch of vlans is read with a single statement.
+
+    :param fields: Selection of attributes as returned by
+        :meth:`BaseResource.parse_fields` or None for all attributes.
+
+    :param limit: Maximum number of vlans to return or None to return
+        all vlans.
+    :type limit: int
+
+    :param after: Resource identifier of the last vlan of the previous page.
+        Only vlans ordered after it are returned. Vlans are always ordered
+        by their resource identifier.
+
+    :param batch_size: If given return an iterator reading vlans from
+        the database in batches of this size instead of a list.
+    :type batch_size: int
+
+    :return: List of json-ready dicts of vlans
+    """
+
+    if after is not None:
+        _after([ Vlan._tag ], int, after)
+
+    def page(size: Optional[int], key) -> List[Tuple[Any, JsonDict]]:
+        vlans = select([ Vlan._tag, Vlan._description ])
+        if key is not None:
+            vlans = vlans.where(_after([ Vlan._tag ], int, key))
+        vlans = vlans.order_by(Vlan._tag).limit(size)
+
+        return [ (row[0], Vlan.jsonify_row(row, fields))
+                 for row in session.execute(vlans) ]
+
+    return _read(page, limit, after, batch_size)
+
+def _vlan_id(session, tag: int) -> int:
+    """
+    Return database id of vlan with given tag.
+
+    :raises ValueError: When given vlan does not exist
+    """
+
+    if not isinstance(tag, int):
+        raise TypeError('Given vlan is not of type int')
+
+    vlan_id = session.execute(select([ Vlan._vlan_id ]).where(Vlan._tag == tag)).scalar()
+    if vlan_id is None:
+        raise ValueError('Given vlan does not exist')
+    return vlan_id
+
+def read_vlan_ports(
+        session,
+        tag: int,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None,
+        batch_size: Optional[int] = None) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Read all ports carrying a vlan from database as json-ready dicts.
+
+    Every port is returned as dict with the keys ``switch`` (resource
+    identifier of the switch containing the port), ``port`` (resource
+    identifier of the port) and ``target``. Ports are looked up by vlan
+    with the index on the vlan column of the association table. Every
+    batch of ports is read with a single statement regardless of its size.
+
+    :param tag: Resource identifier of vlan
+        (See :class:`Vlan` for what attribute is the resource identifier)
+
+    :param limit: Maximum number of ports to return or None to return
+        all ports carrying the vlan.
+    :type limit: int
+
+    :param after: Tuple of resource identifiers of switch and port of the
+        last port of the previous page. Only ports ordered after it are
+        returned. Ports are always ordered by switch and port.
+
+    :param batch_size: If given return an iterator reading ports from
+        the database in batches of this size instead of a list.
+    :type batch_size: int
+
+    :raises ValueError: When given vlan does not exist
+
+    :return: List of json-ready dicts of ports
+    """
+
+    columns = [ Switch._name, Port._name ]
+    if after is not None:
+        _after(columns, str, after)
+
+    vlan_id = _vlan_id(session, tag)
+
+    def page(size: Optional[int], key) -> List[Tuple[Any, JsonDict]]:
+        ports = select([ Switch._name, Port._name, Port._target ])
+        ports = ports.select_from(vlans_ports_mapping
+            .join(Port.__table__, Port._port_id == vlans_ports_mapping.c.port_id)
+            .join(Switch.__table__, Switch._switch_id == Port._switch_id))
+        ports = ports.where(vlans_ports_mapping.c.vlan_id == vlan_id)
+        if key is not None:
+            ports = ports.where(_after(columns, str, key))
+        ports = ports.order_by(*columns).limit(size)
+
+        return [ ((switch, port), { 'switch': switch, 'port': port, 'target': target })
+                 for switch, port, target in session.execute(ports) ]
+
+    return _read(page, limit, after, batch_size)
+
+def read_vlan_usage(session, tag: int) -> JsonDict:
+    """
+    Count ports and switches carrying a vlan.
+
+    The ports carrying the vlan are looked up with the index on the vlan
+    column of the association table and counted with a single statement.
+
+    :param tag: Resource identifier of vlan
+        (See :class:`Vlan` for what attribute is the resource identifier)
+
+    :raises ValueError: When given vlan does not exist
+
+    :return: Json-ready dict with the keys ``tag``, ``ports`` (number of
+        ports carrying the vlan) and ``switches`` (number of switches with
+        at least one port carrying the vlan)
+    """
+
+    vlan_id = _vlan_id(session, tag)
+
+    usage = select([ func.count(), func.count(distinct(Port._switch_id)) ])
+    usage = usage.select_from(vlans_ports_mapping
+        .join(Port.__table__, Port._port_id == vlans_ports_mapping.c.port_id))
+    usage = usage.where(vlans_ports_mapping.c.vlan_id == vlan_id)
+    ports, switches = session.execute(usage).first()
+
+    return { 'tag': tag, 'ports': ports, 'switches': switches }
+
+def read_targets(
+        session,
+        target: str,
+        match: str = 'exact',
+        ignore_case: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None,
+        batch_size: Optional[int] = None) -> Union[List[JsonDict], Iterator[JsonDict]]:
+    """
+    Read all ports connected to a host from database as json-ready dicts.
+
+    Every port is returned as dict with the keys ``switch`` (resource
+    identifier of the switch containing the port), ``port`` (resource
+    identifier of the port) and ``target``. Ports are looked up with the
+    indexes on their target (See :func:`query_ports`). Every batch of ports
+    is read with a single statement regardless of its size.
+
+    :param target: Target or prefix of targets to look for
+
+    :param match: Either ``'exact'`` (default) to return ports connected to
+        the given target or ``'prefix'`` to return ports connected to
+        targets starting with it.
+    :type match: str
+
+    :param ignore_case: Compare target case-insensitively.
+        Only ASCII letters are folded.
+    :type ignore_case: bool
+
+    :param limit: Maximum number of ports to return or None to return
+        all matching ports.
+    :type limit: int
+
+    :param after: Tuple of resource identifiers of switch and port of the
+        last port of the previous page. Only ports ordered after it are
+        returned. Ports are always ordered by switch and port.
+
+    :param batch_size: If given return an iterator reading ports from
+        the database in batches of this size instead of a list.
+    :type batch_size: int
+
+    :return: List of json-ready dicts of ports
+    """
+
+    columns = [ Switch._name, Port._name ]
+    if after is not None:
+        _after(columns, str, after)
+
+    condition = _target_condition(target, match, ignore_case)
+
+    def page(size: Optional[int], key) -> List[Tuple[Any, JsonDict]]:
+        ports = select([ Switch._name, Port._name, Port._target ])
+        ports = ports.select_from(Port.__table__
+            .join(Switch.__table__, Switch._switch_id == Port._switch_id))
+        ports = ports.where(condition)
+        if key is not None:
+            ports = ports.where(_after(columns, str, key))
+        ports = ports.order_by(*columns).limit(size)
+
+        return [ ((switch, port), { 'switch': switch, 'port': port, 'target': host })
+                 for switch, port, host in session.execute(ports) ]
+
+    return _read(page, limit, after, batch_size)
@@ -39,8 +39,9 @@ def set_switch_model(session, resource_id: Optional[str], **kwargs) -> SwitchMod
     # Check all arguments before making any changes
     SwitchModel.check_params(**kwargs)
 
-    # Check if switch model exists
-    source_sm = query_switch_model(session, resource_id)
+    # Check if switch model exists. Load port models eagerly because
+    # all of them are compared with the new state.
+    source_sm = query_switch_model(session, resource_id, 'switch_model')
 
     if source_sm is None:
         # Source switch model does not exist:
@@ -56,7 +57,7 @@ def set_switch_model(session, resource_id: Optional[str], **kwargs) -> SwitchMod
 
         target_sm = SwitchModel(**kwargs)
         session.add(target_sm)
-        session.commit()
+        commit(session)
         return target_sm
     else:
         # Source switch model exists
@@ -70,15 +71,15 @@ def set_switch_model(session, resource_id: Optional[str], **kwargs) -> SwitchMod
                     "Cannot set switch model with name '{}' - switch model already exists"
                     .format(kwargs['name']))
 
-        # Create new switch model object with given state
-        # and replace old object with it
+        # Set old object to state of new switch model object in place.
+        # (Replacing the old object would also replace all switches using
+        # it and their ports. Port models that exist in both states are
+        # kept, so only port models that differ are added or removed.)
         target_sm = SwitchModel(**kwargs)
+        reconcile_resource(source_sm, target_sm)
 
-        session.delete(source_sm)
-        session.flush()
-        session.add(target_sm)
-        session.commit()
-        return target_sm
+        commit(session)
+        return source_sm
 
 def set_port_model(
         session,
@@ -115,19 +116,8 @@ def set_port_model(
     if sm is None:
         raise ValueError('Given switch model does not exist')
 
-    # Replace list of network protocol strings with list of network protocol objects
-    if 'network_protocols' in kwargs:
-        kwargs['network_protocols'] = [ query_network_protocol(session, proto)
-                                        for proto in kwargs['network_protocols'] ]
-        if None in kwargs['network_protocols']:
-            raise ValueError(
-                'Given network protocol in list of network protocols of port does not exist')
-
-    # Replace connector string with connector object
-    if 'connector' in kwargs:
-        kwargs['connector'] = query_connector(session, kwargs['connector'])
-        if kwargs['connector'] is None:
-            raise ValueError('Given connector of port does not exist')
+    # Replace network protocol strings and connector string with objects
+    resolve_port_models(session, [ kwargs ])
 
     # Check all arguments before making any changes
     PortModel.check_params(**kwargs)
@@ -155,7 +145,7 @@ def set_port_model(
         ports.append(target_pm)
         sm.ports = ports
 
-        session.commit()
+        commit(session)
         return target_pm
     else:
         # Source port model exists
@@ -173,11 +163,17 @@ def set_port_model(
         # and replace old object with it
         target_pm = PortModel(**kwargs)
 
-        ports = [ port for port in sm.ports if port != source_pm ]
-        ports.append(target_pm)
-        sm.ports = ports
+        if target_pm.name == source_pm.name:
+            # Keep old object if name does not change in order to not
+            # replace it with another port model of the same name
+            update_resource(source_pm, target_pm)
+            target_pm = source_pm
+        else:
+            ports = [ port for port in sm.ports if port != source_pm ]
+            ports.append(target_pm)
+            sm.ports = ports
 
-        session.commit()
+        commit(session)
         return target_pm
 
 def set_switch(session, resource_id: Optional[str], **kwargs) -> Switch:
@@ -221,8 +217,9 @@ def set_switch(session, resource_id: Optional[str], **kwargs) -> Switch:
     # Check all arguments before making any changes
     Switch.check_params(**kwargs)
 
-    # Check if switch exists
-    source_sw = query_switch(session, resource_id)
+    # Check if switch exists. Load ports and their vlans eagerly because
+    # all of them are compared with the new state.
+    source_sw = query_switch(session, resource_id, 'switch')
 
     if source_sw is None:
         # Source switch does not exist:
@@ -238,7 +235,7 @@ def set_switch(session, resource_id: Optional[str], **kwargs) -> Switch:
 
         target_sw = Switch(**kwargs)
         session.add(target_sw)
-        session.commit()
+        commit(session)
         return target_sw
     else:
         # Source switch exists
@@ -252,15 +249,15 @@ def set_switch(session, resource_id: Optional[str], **kwargs) -> Switch:
                     "Cannot set switch with name '{}' - switch already exists"
                     .format(kwargs['name']))
 
-        # Create new switch object with given state
-        # and replace old object with it
+        # Set old object to state of new switch object in place.
+        # (Replacing the old object would rewrite all ports and their
+        # vlans. Ports that exist in both states are kept, so only
+        # attributes and vlans of ports that differ are written.)
         target_sw = Switch(**kwargs)
+        reconcile_resource(source_sw, target_sw)
 
-        session.delete(source_sw)
-        session.flush()
-        session.add(target_sw)
-        session.commit()
-        return target_sw
+        commit(session)
+        return source_sw
 
 def set_port(
         session,
@@ -299,16 +296,13 @@ def set_port(
         raise ValueError('Given switch does not exist')
 
     # Replace list of vlan strings with list of vlan objects
-    if 'vlans' in kwargs:
-        kwargs['vlans'] = [ query_vlan(session, v) for v in kwargs['vlans'] ]
-        if None in kwargs['vlans']:
-            raise ValueError('Given vlan in list of vlans of port does not exist')
+    resolve_ports(session, [ kwargs ])
 
     # Check all arguments before making any changes
     Port.check_params(**kwargs)
 
     # Check if port exists
-    source_pt = query_port(session, switch_resource_id, port_resource_id)
+    source_pt = query_port(session, switch_resource_id, port_resource_id, 'port')
 
     if source_pt is None:
         # Will not create a new port. Abort if port does not exist
@@ -323,16 +317,14 @@ def set_port(
             port_resource_id,
             kwargs['name']))
 
-    # Create new port object with given state
-    # and replace old object with it
+    # Set old object to state of new port object
+    # (Port cannot be renamed so replacing the old object would only
+    # insert another port with the same name)
     target_pt = Port(**kwargs)
+    update_resource(source_pt, target_pt)
 
-    ports = [ port for port in sw.ports if port != source_pt ]
-    ports.append(target_pt)
-    sw.ports = ports
-
-    session.commit()
-    return target_pt
+    commit(session)
+    return source_pt
 
 def set_network_protocol(
         session,
@@ -384,7 +376,7 @@ def set_network_protocol(
 
         target_np = NetworkProtocol(**kwargs)
         session.add(target_np)
-        session.commit()
+        commit(session)
         return target_np
     else:
         # Source network protocol exists
@@ -406,7 +398,7 @@ def set_network_protocol(
         session.delete(source_np)
         session.flush()
         session.add(target_np)
-        session.commit()
+        commit(session)
         return target_np
 
 def set_connector(session, resource_id: Optional[str], **kwargs) -> Connector:
@@ -456,7 +448,7 @@ def set_connector(session, resource_id: Optional[str], **kwargs) -> Connector:
 
         target_cn = Connector(**kwargs)
         session.add(target_cn)
-        session.commit()
+        commit(session)
         return target_cn
     else:
         # Source connector exists
@@ -478,7 +470,7 @@ def set_connector(session, resource_id: Optional[str], **kwargs) -> Connector:
         session.delete(source_cn)
         session.flush()
         session.add(target_cn)
-        session.commit()
+        commit(session)
         return target_cn
 
 def set_vlan(session, resource_id: Optional[str], **kwargs) -> Vlan:
@@ -528,7 +520,7 @@ def set_vlan(session, resource_id: Optional[str], **kwargs) -> Vlan:
 
         target_vl = Vlan(**kwargs)
         session.add(target_vl)
-        session.commit()
+        commit(session)
         return target_vl
     else:
         # Source vlan exists
@@ -549,5 +541,5 @@ def set_vlan(session, resource_id: Optional[str], **kwargs) -> Vlan:
         session.delete(source_vl)
         session.flush()
         session.add(target_vl)
-        session.commit()
+        commit(session)
         return target_vl
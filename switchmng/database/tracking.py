@@ -0,0 +1,520 @@
+from itertools import chain
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from sqlalchemy import event
+from sqlalchemy import inspect
+from sqlalchemy import select
+
+from switchmng.schema import *
+from switchmng.schema.base_resource import BaseResource
+from switchmng.schema.change import changes
+from switchmng.schema.revision import revision_counter
+
+Tag = Tuple[str, tuple]
+"""
+Table name and primary key identifying a row of a resource.
+
+Tags of the form ``table.identifier`` (e.g. ``vlans.tag``) identify only
+the resource identifier of the row (See :func:`identifier_tag`).
+"""
+
+_TOUCHED = 'switchmng_touched'
+"""Key of tags touched by the current transaction in the session info"""
+
+_REVISION = 'switchmng_revision'
+"""Key of revision of the current transaction in the session info"""
+
+_PARENTS: Dict[type, Tuple[type, str]] = {
+    Port:      (Switch, '_switch_id'),
+    PortModel: (SwitchModel, '_switch_model_id'),
+}
+"""
+Resources contained in another resource.
+
+Maps resource class to class of the containing resource and the private
+attribute holding its primary key.
+"""
+
+_DEPENDENTS: Dict[type, List[Tuple[type, Callable[[Any], Any], bool]]] = {}
+"""
+Resources whose representation depends on another resource.
+
+Maps resource class to list of tuples of dependent resource class,
+function turning a statement selecting ids of resources into a statement
+selecting ids of dependent resources and whether dependent resources
+only reference the resources (See :func:`_build_dependents`).
+"""
+
+def tag(resource: BaseResource) -> Tag:
+    """Return tag identifying the row of given resource"""
+
+    return (
+        type(resource).__tablename__,
+        tuple(inspect(resource).mapper.primary_key_from_instance(resource)))
+
+def identifier_tag(resource: BaseResource) -> Tag:
+    """
+    Return tag identifying the resource identifier of given resource.
+
+    This tag is only touched when the resource identifier changes or the
+    resource gets deleted.
+    """
+
+    table, key = tag(resource)
+    return ('{}.{}'.format(table, type(resource).ResourceIdentifier), key)
+
+def _tags(resource: BaseResource) -> Set[Tag]:
+    """Return tags of given resource and the resource containing it"""
+
+    tags = { tag(resource) }
+    if type(resource) in _PARENTS:
+        parent, private = _PARENTS[type(resource)]
+        tags.add((parent.__tablename__, (getattr(resource, private), )))
+    return tags
+
+def dependencies(resource: BaseResource) -> Set[Tag]:
+    """
+    Return tags of all rows the representation of given resource depends on.
+
+    That is the resource itself, the resource containing it, the resource
+    identifiers of all referenced resources and all nested resources with
+    their dependencies.
+    The resource should be loaded with the loading profile used for
+    representing it, so that no further statements are needed.
+    """
+
+    tags = _tags(resource)
+    for attr in type(resource)._Attributes.values():
+        typ = attr['type']
+        if not isinstance(typ, type) or not issubclass(typ, BaseResource):
+            continue
+
+        val = getattr(resource, attr['private'])
+        if val is None:
+            continue
+        for other in (val if attr['list'] else [ val ]):
+            # Referenced resources are only represented by their identifier
+            if attr.get('nested', False):
+                tags.update(dependencies(other))
+            else:
+                tags.add(identifier_tag(other))
+
+    return tags
+
+def pending(session) -> bool:
+    """Return if given session has flushed changes that are not committed yet"""
+
+    return len(session.info.get(_TOUCHED, ())) > 0
+
+def touch(session, tags: Set[Tag]) -> None:
+    """
+    Mark given tags as touched by the current transaction of given session.
+
+    Changes to resources through the session are tracked automatically.
+    This has to be called for changes done with plain SQL statements.
+    """
+
+    session.info.setdefault(_TOUCHED, set()).update(tags)
+
+def revision(session) -> int:
+    """
+    Return revision of the current transaction of given session.
+
+    The revision counter is increased when this is called for the first
+    time in a transaction. All resources changed in the transaction get
+    this revision.
+    """
+
+    rev = session.info.get(_REVISION)
+    if rev is None:
+        session.execute(revision_counter.update().values(
+            revision = revision_counter.c.revision + 1))
+        rev = session.execute(select([ revision_counter.c.revision ])).scalar()
+        session.info[_REVISION] = rev
+    return rev
+
+def mark_changed(session, cls: type, ids: List) -> None:
+    """
+    Track changes to given resources done with plain SQL statements.
+
+    Changes to resources through the session are tracked automatically.
+    Changes done with plain SQL statements have to be marked with this
+    after they were executed. The changed resources and all resources
+    depending on them get the revision of the current transaction, are
+    recorded in the change journal and their tags are touched. Resources
+    loaded into the session are expired, so that their new state is loaded.
+
+    Only changes that neither add nor delete resources nor change their
+    resource identifiers can be marked.
+
+    :param cls: Class of changed resources
+
+    :param ids: Primary keys of changed resources
+    """
+
+    if len(ids) == 0:
+        return
+
+    rev = revision(session)
+    entries: List[Entry] = []
+    condition = _primary_key(cls).in_(ids)
+    _journal(session, entries, rev, cls, condition)
+    session.execute(cls.__table__.update()
+        .where(condition)
+        .values(revision = rev))
+    _propagate(session, entries, rev, cls, ids, False)
+    _write_journal(session, entries)
+
+    tags = { (cls.__tablename__, (key, )) for key in ids }
+    objects = [ (cls, key) for key in ids ]
+    if cls in _PARENTS:
+        parent, private = _PARENTS[cls]
+        keys = session.execute(select([ getattr(cls, private) ]).where(condition).distinct())
+        for key, in keys:
+            tags.add((parent.__tablename__, (key, )))
+            objects.append((parent, key))
+    touch(session, tags)
+
+    for other, key in objects:
+        obj = session.identity_map.get(inspect(other).identity_key_from_primary_key([ key ]))
+        if obj is not None:
+            session.expire(obj)
+
+def _primary_key(cls: type):
+    """Return primary key column of given resource class"""
+
+    return inspect(cls).primary_key[0]
+
+def _identifier(cls: type):
+    """Return column of resource identifier of given resource class"""
+
+    return getattr(cls, cls._Attributes[cls.ResourceIdentifier]['private'])
+
+def _renamed(obj: BaseResource) -> bool:
+    """Return if resource identifier of given resource changed in the flush"""
+
+    return inspect(obj).attrs[_identifier(type(obj)).key].history.has_changes()
+
+def _committed(obj: BaseResource, private: str):
+    """Return value of given attribute of given resource before the flush"""
+
+    history = inspect(obj).attrs[private].history
+    return (history.deleted or history.unchanged or history.added or [ None ])[0]
+
+Entry = Dict[str, Any]
+"""Entry of the change journal as dict of column values"""
+
+def _journal(
+        session,
+        entries: List[Entry],
+        rev: int,
+        cls: type,
+        condition,
+        deleted: bool = False,
+        resource_id: Optional[str] = None,
+        parent_resource_id: Optional[str] = None) -> None:
+    """
+    Collect entries of the change journal for rows of given resource class.
+
+    The current resource identifiers of all matching rows are read with a
+    single statement. The entries are only appended to given list and
+    written all at once by :func:`_write_journal`.
+
+    :param entries: List to append entries to
+
+    :param condition: Condition selecting rows to add entries for
+
+    :param deleted: If resources were deleted (or moved to another
+        resource identifier)
+
+    :param resource_id: Resource identifier to record instead of the
+        current one
+
+    :param parent_resource_id: Resource identifier of the containing
+        resource to record instead of the current one
+    """
+
+    table = cls.__table__
+    columns = [ _primary_key(cls), _identifier(cls) ]
+    join_parent = cls in _PARENTS and parent_resource_id is None
+    if join_parent:
+        parent, private = _PARENTS[cls]
+        table = table.join(parent.__table__, getattr(cls, private) == _primary_key(parent))
+        columns.append(_identifier(parent))
+
+    rows = session.execute(select(columns).select_from(table).where(condition))
+    for row_id, identifier, *parent_identifier in rows:
+        entries.append({
+            'revision':           rev,
+            'resource':           cls.__tablename__,
+            'row_id':             row_id,
+            'resource_id':        str(identifier) if resource_id is None else resource_id,
+            'parent_resource_id': (str(parent_identifier[0])
+                                   if join_parent
+                                   else parent_resource_id),
+            'deleted':            deleted,
+        })
+
+def _journal_deleted(session, entries: List[Entry], rev: int, deleted: List[BaseResource]) -> None:
+    """
+    Collect entries of the change journal for given deleted resources.
+
+    The rows of the resources are already gone, so the entries are built
+    from the state of the resources before the flush.
+
+    :param entries: List to append entries to
+    """
+
+    for obj in deleted:
+        cls = type(obj)
+        parent_resource_id = None
+        if cls in _PARENTS:
+            parent, private = _PARENTS[cls]
+            parent_key = _committed(obj, private)
+            other = session.identity_map.get(inspect(parent).identity_key_from_primary_key([ parent_key ]))
+            if other is not None:
+                parent_resource_id = _committed(other, _identifier(parent).key)
+            else:
+                parent_resource_id = session.execute(select([ _identifier(parent) ])
+                    .where(_primary_key(parent) == parent_key)).scalar()
+            parent_resource_id = str(parent_resource_id)
+
+        entries.append({
+            'revision':           rev,
+            'resource':           cls.__tablename__,
+            'row_id':             inspect(obj).identity[0],
+            'resource_id':        str(_committed(obj, _identifier(cls).key)),
+            'parent_resource_id': parent_resource_id,
+            'deleted':            True,
+        })
+
+def _write_journal(session, entries: List[Entry]) -> None:
+    """Add given entries to the change journal with a single statement"""
+
+    if len(entries) > 0:
+        session.execute(changes.insert(), entries)
+
+def _build_dependents() -> None:
+    """
+    Find dependent resources of every resource class.
+
+    A resource depends on the resource identifier of all resources it
+    references (e.g. a port on the tags of its vlans) and a containing
+    resource on all resources it contains (e.g. a switch on its ports).
+    """
+
+    for cls in (Switch, SwitchModel, Port, PortModel, NetworkProtocol, Connector, Vlan):
+        mapper = inspect(cls)
+        for attr in cls._Attributes.values():
+            typ = attr['type']
+            if not isinstance(typ, type) or not issubclass(typ, BaseResource) \
+                    or attr.get('nested', False):
+                continue
+
+            relationship = mapper.relationships[attr['private']]
+            if relationship.secondary is not None:
+                # Referenced with association table
+                (_, local), = relationship.synchronize_pairs
+                (_, remote), = relationship.secondary_synchronize_pairs
+                dependents = lambda ids, local = local, remote = remote: \
+                    select([ local ]).where(remote.in_(ids))
+            else:
+                # Referenced with foreign key
+                (local, _), = relationship.local_remote_pairs
+                dependents = lambda ids, local = local, pk = _primary_key(cls): \
+                    select([ pk ]).where(local.in_(ids))
+            _DEPENDENTS.setdefault(typ, []).append((cls, dependents, True))
+
+    for cls, (parent, private) in _PARENTS.items():
+        dependents = lambda ids, local = getattr(cls, private), pk = _primary_key(cls): \
+            select([ local ]).where(pk.in_(ids))
+        _DEPENDENTS.setdefault(cls, []).append((parent, dependents, False))
+
+def _propagate(session, entries: List[Entry], rev: int, cls: type, ids, renamed: bool) -> None:
+    """
+    Set revision of all resources depending on given resources.
+
+    :param entries: List to append entries of the change journal to
+
+    :param cls: Class of changed resources
+
+    :param ids: List of ids of changed resources or statement selecting them
+
+    :param renamed: If resource identifiers of given resources changed.
+        Otherwise resources only referencing them are not changed.
+    """
+
+    for dependent, dependent_ids, reference in _DEPENDENTS.get(cls, ()):
+        if reference and not renamed:
+            continue
+        statement = dependent_ids(ids)
+        condition = (_primary_key(dependent).in_(statement)) & (dependent._revision != rev)
+        _journal(session, entries, rev, dependent, condition)
+        session.execute(dependent.__table__.update()
+            .where(condition)
+            .values(revision = rev))
+        _propagate(session, entries, rev, dependent, statement, False)
+
+def _modified(session) -> Tuple[List[BaseResource], List[BaseResource]]:
+    """
+    Return resources changed by the current flush of given session.
+
+    :return: Tuple of list of new and modified resources and list of
+        deleted resources
+    """
+
+    changed = [ obj for obj in chain(session.new, session.dirty)
+                if isinstance(obj, BaseResource)
+                and (obj in session.new or session.is_modified(obj)) ]
+    deleted = [ obj for obj in session.deleted if isinstance(obj, BaseResource) ]
+    return changed, deleted
+
+def _before_flush(session, flush_context, instances) -> None:    #pylint: disable = unused-argument
+    # Set revision of changed resources before they are written
+    changed, deleted = _modified(session)
+    if len(changed) == 0 and len(deleted) == 0:
+        return
+
+    rev = revision(session)
+    for obj in changed:
+        obj._revision = rev
+
+def _removed(flush_context) -> List[BaseResource]:
+    """
+    Return resources deleted by given flush.
+
+    Unlike :attr:`Session.deleted` this includes resources deleted because
+    they were removed from the resource containing them (orphans).
+    """
+
+    removed = []
+    for state, (isdelete, listonly) in flush_context.states.items():
+        obj = state.obj()
+        if isdelete and not listonly and isinstance(obj, BaseResource):
+            removed.append(obj)
+    return removed
+
+def _after_flush(session, flush_context) -> None:
+    changed, _ = _modified(session)
+    deleted = _removed(flush_context)
+
+    # Collect tags of all resources changed by this flush.
+    # (Primary keys of new resources are known at this point)
+    tags: Set[Tag] = set()
+    for obj in chain(changed, deleted):
+        tags.update(_tags(obj))
+
+    # Resources referencing other resources only depend on their
+    # resource identifiers
+    for obj in deleted:
+        tags.add(identifier_tag(obj))
+    for obj in changed:
+        if obj not in session.new and _renamed(obj):
+            tags.add(identifier_tag(obj))
+    touch(session, tags)
+
+    if len(changed) == 0 and len(deleted) == 0:
+        return
+    rev = revision(session)
+
+    # Only containing resources can depend on new or deleted resources
+    parents: Dict[type, Set] = {}
+    sources: Dict[Tuple[type, bool], Set] = {}
+    journaled: Dict[type, Set] = {}
+    for obj in deleted:
+        if type(obj) in _PARENTS:
+            parent, private = _PARENTS[type(obj)]
+            parents.setdefault(parent, set()).add(_committed(obj, private))
+
+    # Entries of the change journal are collected and written at once
+    entries: List[Entry] = []
+
+    # Record deleted resources in change journal
+    _journal_deleted(session, entries, rev, deleted)
+
+    for obj in changed:
+        cls = type(obj)
+        key = inspect(obj).mapper.primary_key_from_instance(obj)[0]
+        journaled.setdefault(cls, set()).add(key)
+        if obj in session.new:
+            if cls in _PARENTS:
+                parent, private = _PARENTS[cls]
+                parents.setdefault(parent, set()).add(getattr(obj, private))
+            continue
+
+        renamed = _renamed(obj)
+        sources.setdefault((cls, renamed), set()).add(key)
+        if not renamed:
+            continue
+
+        # Renamed resources (and resources contained in them) are
+        # recorded as deleted under their old resource identifier
+        old = str(inspect(obj).attrs[_identifier(cls).key].history.deleted[0])
+        _journal(session, entries, rev, cls, _primary_key(cls) == key, True, resource_id = old)
+        for child, (parent, private) in _PARENTS.items():
+            if parent is cls:
+                condition = getattr(child, private) == key
+                _journal(session, entries, rev, child, condition, True, parent_resource_id = old)
+                _journal(session, entries, rev, child, condition)
+
+    # Record changed resources in change journal
+    for cls, keys in journaled.items():
+        _journal(session, entries, rev, cls, _primary_key(cls).in_(list(keys)))
+
+    # Set revision of all resources depending on changed resources
+    for cls, keys in parents.items():
+        condition = _primary_key(cls).in_(list(keys)) & (cls._revision != rev)
+        _journal(session, entries, rev, cls, condition)
+        session.execute(cls.__table__.update()
+            .where(condition)
+            .values(revision = rev))
+        _propagate(session, entries, rev, cls, list(keys), False)
+    for (cls, renamed), keys in sources.items():
+        _propagate(session, entries, rev, cls, list(keys), renamed)
+    _write_journal(session, entries)
+
+def track(session_factory, committed: Callable[[Set[Tag], Optional[int]], None]) -> None:
+    """
+    Track changes to resources done with sessions of given session factory.
+
+    Every transaction changing resources gets a new revision (See
+    :func:`revision`). Changed resources and all resources depending on
+    them get this revision.
+
+    Whenever a transaction touching resources gets committed the given
+    function is called with the tags of all touched rows and the revision
+    of the transaction (or None if it did not get a revision). Tags of
+    transactions that get rolled back are discarded.
+
+    :param session_factory: :class:`sqlalchemy.orm.sessionmaker`
+
+    :param committed: Function called with set of touched tags and
+        revision after commit
+    """
+
+    if len(_DEPENDENTS) == 0:
+        _build_dependents()
+
+    def after_commit(session) -> None:
+        rev = session.info.pop(_REVISION, None)
+        tags = session.info.pop(_TOUCHED, None)
+        if tags:
+            committed(tags, rev)
+
+    def after_soft_rollback(session, previous) -> None:
+        # Only discard tags when the outermost transaction is rolled back
+        if previous.parent is None:
+            session.info.pop(_REVISION, None)
+            session.info.pop(_TOUCHED, None)
+
+    event.listen(session_factory, 'before_flush', _before_flush)
+    event.listen(session_factory, 'after_flush', _after_flush)
+    event.listen(session_factory, 'after_commit', after_commit)
+    event.listen(session_factory, 'after_soft_rollback', after_soft_rollback)
@@ -68,6 +68,13 @@ def import_from_path(
     **Note**: If path is a directory files in this directory starting
     with ``.`` will not be imported!
 
+    All files of a directory are read and checked (See
+    :meth:`BaseResource.validate_many`) before any of them is added. If
+    one of them is invalid no file of this directory is added and the
+    error names the invalid file. Files are committed one by one, so if
+    adding a file fails (e.g. because it references a resource that does
+    not exist) files added before it stay in the database.
+
     :param db: Connection to the database
 
     :param path: The path to the file or directory containing the
@@ -125,16 +132,42 @@ def _import_from_file(
     :param resource_type: The type of resource the file contains
     """
 
+    _add_resource(db, _read_file(path), resource_type)
+    print(f'Imported {path}')
+
+def _read_file(path: str) -> Dict:
+    """
+    Read resource from json file.
+
+    :param path: Path to the file to read resource from.
+
+    :return: The resource as parsed from json
+    """
+
     # Read content of file
     with open(path, 'r') as f:
         str_content = f.read()
 
     # Parse content of file
     try:
-        content = json.loads(str_content)
+        return json.loads(str_content)
     except JSONDecodeError as e:
         raise ValueError(f'File {path} does not contain valid json') from e
 
+def _add_resource(
+        db: DatabaseConnection,
+        content: Dict,
+        resource_type: Type[BaseResource]) -> None:
+    """
+    Add resource parsed from json to database.
+
+    :param db: Connection to the database
+
+    :param content: The resource as parsed from json
+
+    :param resource_type: The type of the resource
+    """
+
     # TODO: Implement --update command line parameter
     if resource_type is SwitchModel:
         database.add_switch_model(db.Session(), **content)
@@ -154,8 +187,6 @@ def _import_from_file(
     else:
         raise ValueError(f"Cannot import resource of unknown type '{resource_type}'")
 
-    print(f'Imported {path}')
-
 def _import_from_directory(
         db: DatabaseConnection,
         path: str,
@@ -171,14 +202,18 @@ def _import_from_directory(
         directory contain.
     """
 
-    # Import all files in this directory
+    # Read all files in this directory
     files = ( os.path.abspath(os.path.join(path, f)) for f in os.listdir(path) )
-    for f in files:
-        if not os.path.isfile(f):
-            continue
-        if f.startswith('.'):
-            continue
-        _import_from_file(db, f, resource_type)
+    files = [ f for f in files if os.path.isfile(f) and not f.startswith('.') ]
+    contents = [ _read_file(f) for f in files ]
+
+    # Check all resources before adding any of them
+    resource_type.validate_many(contents, names = files)
+
+    # Import all files in this directory
+    for f, content in zip(files, contents):
+        _add_resource(db, content, resource_type)
+        print(f'Imported {f}')
 
 def _import_from_directories(db: DatabaseConnection, path: str) -> None:
     """
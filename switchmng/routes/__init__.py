@@ -16,4 +16,9 @@ def create_app(database_connection):
     app.config['SWITCHMNG_DB_CONNECTION'] = database_connection
     app.register_blueprint(restbp)
 
+    @app.teardown_appcontext
+    def remove_session(exception = None):    #pylint: disable = unused-argument
+        """Discard database session of this thread after every request"""
+        database_connection.Session.remove()
+
     return app
@@ -0,0 +1,59 @@
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+from flask import Response
+from flask import request
+from werkzeug.datastructures import ETags
+from werkzeug.http import quote_etag
+
+def etag(revision: int) -> str:
+    """
+    Return entity tag of resource with given revision.
+
+    The revision of a resource changes whenever its representation changes
+    (See :mod:`switchmng.database.tracking`), so it is used as strong
+    entity tag directly.
+    """
+
+    return str(revision)
+
+def etag_header(revision: int) -> Dict[str, str]:
+    """Return headers sending entity tag of resource with given revision"""
+
+    return { 'ETag': quote_etag(etag(revision)) }
+
+def not_modified(revision: int) -> bool:
+    """
+    Return if the current request is a conditional request (``If-None-Match``)
+    for a resource with given revision that the client already has.
+    """
+
+    return request.if_none_match.contains_weak(etag(revision))
+
+def not_modified_response(revision: int) -> Response:
+    """Return response telling the client that its representation is current"""
+
+    response = Response(status = 304)
+    response.set_etag(etag(revision))
+    return response
+
+def precondition_failed(revision: Callable[[], Optional[int]], if_match: ETags) -> bool:
+    """
+    Return if the precondition (``If-Match``) of a request fails.
+
+    :param revision: Function returning the current revision of the
+        resource or None if the resource does not exist. Only gets called
+        if the request has a precondition.
+
+    :param if_match: Entity tags of the precondition of the request
+        (e.g. ``request.if_match``)
+    """
+
+    if not if_match:
+        return False
+
+    current = revision()
+    if current is None:
+        return True
+    return not if_match.contains(etag(current))
@@ -1,23 +1,57 @@
+import base64
+import json
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlencode
+
+from flask import Response
 from flask import abort
 from flask import current_app
+from flask import request
+from flask import stream_with_context
 
 from switchmng.typing import FlaskResponse
+from switchmng.typing import JsonDict
 
 from switchmng import database
+from switchmng.schema import *
 from .blueprint import restbp
 from .errors import *
+from .conditional import etag
+from .conditional import not_modified
+from .conditional import not_modified_response
+
+STREAM_BATCH_SIZE = 100
+"""Number of resources fetched at once when streaming collections"""
+
+EVENTS_KEEPALIVE = 15.0
+"""Seconds after which an idle event stream sends a comment to keep it open"""
 
 @restbp.route('/switch_models/<string:resource_id>', methods = ['GET'])
 def get_switch_model(resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if switch model exists
-    sm = database.query_switch_model(session, resource_id)
-    if sm is None:
-        abort(404)
-
-    return { 'status': 200,
-             'data': sm.jsonify() }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(SwitchModel)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    return _resource(
+        SwitchModel,
+        (resource_id, ),
+        fields,
+        lambda: database.query_switch_model(
+            session,
+            resource_id,
+            profile = 'switch_model',
+            fields = fields))
 
 @restbp.route('/switch_models/<string:switch_model_resource_id>/ports/<string:port_model_resource_id>', methods = ['GET'])
 def get_port_model(
@@ -26,143 +60,777 @@ def get_port_model(
 
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if switch model exists
-    sm = database.query_switch_model(session, switch_model_resource_id)
-    if sm is None:
-        abort(404)
-
-    # Check if port model exists
-    pm = sm.port(port_model_resource_id)
-    if pm is None:
-        abort(404)
-
-    return { 'status': 200,
-             'data': pm.jsonify() }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(PortModel)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    return _resource(
+        PortModel,
+        (switch_model_resource_id, port_model_resource_id),
+        fields,
+        lambda: database.query_port_model(
+            session,
+            switch_model_resource_id,
+            port_model_resource_id,
+            profile = 'port_model',
+            fields = fields),
+        SwitchModel)
 
 @restbp.route('/switches/<string:resource_id>', methods = ['GET'])
 def get_switch(resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if switch exists
-    sw = database.query_switch(session, resource_id)
-    if sw is None:
-        abort(404)
-
-    return { 'status': 200,
-             'data': sw.jsonify() }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Switch)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    return _resource(
+        Switch,
+        (resource_id, ),
+        fields,
+        lambda: database.query_switch(
+            session,
+            resource_id,
+            profile = 'switch',
+            fields = fields))
 
 @restbp.route('/switches/<string:switch_resource_id>/ports/<string:port_resource_id>', methods = ['GET'])
 def get_port(switch_resource_id: str, port_resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if switch exists
-    sw = database.query_switch(session, switch_resource_id)
-    if sw is None:
-        abort(404)
-
-    # Check if port exists
-    pt = sw.port(port_resource_id)
-    if pt is None:
-        abort(404)
-
-    return { 'status': 200,
-             'data': pt.jsonify() }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Port)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    return _resource(
+        Port,
+        (switch_resource_id, port_resource_id),
+        fields,
+        lambda: database.query_port(
+            session,
+            switch_resource_id,
+            port_resource_id,
+            profile = 'port',
+            fields = fields),
+        Switch)
 
 @restbp.route('/network_protocols/<string:resource_id>', methods = ['GET'])
 def get_network_protocol(resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if network protocol exists
-    np = database.query_network_protocol(session, resource_id)
-    if np is None:
-        abort(404)
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(NetworkProtocol)
+    except ValueError as e:
+        return error_400(message = str(e))
 
-    return { 'status': 200,
-             'data': np.jsonify() }, 200
+    return _resource(
+        NetworkProtocol,
+        (resource_id, ),
+        fields,
+        lambda: database.query_network_protocol(session, resource_id))
 
 @restbp.route('/connectors/<string:resource_id>', methods = ['GET'])
 def get_connector(resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if connector exists
-    cn = database.query_connector(session, resource_id)
-    if cn is None:
-        abort(404)
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Connector)
+    except ValueError as e:
+        return error_400(message = str(e))
 
-    return { 'status': 200,
-             'data': cn.jsonify() }, 200
+    return _resource(
+        Connector,
+        (resource_id, ),
+        fields,
+        lambda: database.query_connector(session, resource_id))
 
 @restbp.route('/vlans/<int:resource_id>', methods = ['GET'])
 def get_vlan(resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if vlan exists
-    vl = database.query_vlan(session, resource_id)
-    if vl is None:
-        abort(404)
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Vlan)
+    except ValueError as e:
+        return error_400(message = str(e))
 
-    return { 'status': 200,
-             'data': vl.jsonify() }, 200
+    return _resource(
+        Vlan,
+        (resource_id, ),
+        fields,
+        lambda: database.query_vlan(session, resource_id))
 
 @restbp.route('/switch_models', methods = ['GET'])
 def get_switch_models() -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    return { 'status': 200,
-             'data': [ sm.jsonify() for sm in database.query_switch_models(session) ] }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(SwitchModel)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Collect filters from query string
+    filters: Dict[str, Any] = {}
+    if 'network_protocol' in request.args:
+        filters['network_protocols'] = request.args.getlist('network_protocol')
+    if 'network_protocols_match' in request.args:
+        filters['network_protocols_match'] = request.args['network_protocols_match']
+    for key in ('size', 'min_speed'):
+        if key in request.args:
+            try:
+                filters[key] = int(request.args[key])
+            except ValueError:
+                return error_400(message = "Query parameter '{}' is not an integer"
+                    .format(key))
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        sms = database.query_switch_models(
+            session,
+            profile = 'switch_model',
+            fields = fields,
+            limit = _lookahead(limit),
+            after = after,
+            yield_per = STREAM_BATCH_SIZE,
+            **filters)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page(_jsonified(sms, fields), limit, revision)
 
 @restbp.route('/switch_models/<string:switch_model_resource_id>/ports', methods = ['GET'])
 def get_port_models(switch_model_resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if switch model exists
-    sm = database.query_switch_model(session, switch_model_resource_id)
-    if sm is None:
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(PortModel)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Parse pagination
+    try:
+        limit, after = _page_args()
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Query database (checking if switch model exists)
+    try:
+        pms = database.query_port_models(
+            session,
+            switch_model_resource_id,
+            profile = 'port_model',
+            fields = fields,
+            limit = _lookahead(limit),
+            after = after,
+            yield_per = STREAM_BATCH_SIZE)
+    except ValueError:
         abort(404)
+    except BaseException as e:
+        return error_400(message = str(e))
 
-    return { 'status': 200,
-             'data': [ pm.jsonify()
-                       for pm in
-                       database.query_port_models(session, switch_model_resource_id) ] }, 200
+    return _page(_jsonified(pms, fields), limit, revision)
 
 @restbp.route('/switches', methods = ['GET'])
 def get_switches() -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    return { 'status': 200,
-             'data': [ sw.jsonify() for sw in database.query_switches(session) ] }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Switch)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        sws = _rows(
+            Switch,
+            database.read_switches,
+            fields,
+            session = session,
+            limit = _lookahead(limit),
+            after = after,
+            batch_size = STREAM_BATCH_SIZE)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page(sws, limit, revision)
 
 @restbp.route('/switches/<string:switch_resource_id>/ports', methods = ['GET'])
 def get_ports(switch_resource_id: str) -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    # Check if switch exists
-    sw = database.query_switch(session, switch_resource_id)
-    if sw is None:
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Port)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Parse pagination
+    try:
+        limit, after = _page_args()
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Query database (checking if switch exists)
+    try:
+        pts = _rows(
+            Port,
+            database.read_ports,
+            fields,
+            session = session,
+            switch_resource_id = switch_resource_id,
+            limit = _lookahead(limit),
+            after = after,
+            batch_size = STREAM_BATCH_SIZE)
+    except ValueError:
         abort(404)
+    except BaseException as e:
+        return error_400(message = str(e))
 
-    return { 'status': 200,
-             'data': [ pt.jsonify()
-                       for pt in
-                       database.query_ports(session, switch_resource_id) ] }, 200
+    return _page(pts, limit, revision)
 
 @restbp.route('/network_protocols', methods = ['GET'])
 def get_network_protocols() -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    return { 'status': 200,
-             'data': [ np.jsonify() for np in database.query_network_protocols(session) ] }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(NetworkProtocol)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        nps = database.query_network_protocols(
+            session,
+            limit = _lookahead(limit),
+            after = after,
+            yield_per = STREAM_BATCH_SIZE)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page(_jsonified(nps, fields), limit, revision)
 
 @restbp.route('/connectors', methods = ['GET'])
 def get_connectors() -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    return { 'status': 200,
-             'data': [ cn.jsonify() for cn in database.query_connectors(session) ] }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Connector)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        cns = database.query_connectors(
+            session,
+            limit = _lookahead(limit),
+            after = after,
+            yield_per = STREAM_BATCH_SIZE)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page(_jsonified(cns, fields), limit, revision)
 
 @restbp.route('/vlans', methods = ['GET'])
 def get_vlans() -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
-    return { 'status': 200,
-             'data': [ vl.jsonify() for vl in database.query_vlans(session) ] }, 200
+    # Parse selection of attributes
+    try:
+        fields = _fields_arg(Vlan)
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Answer conditional request without reading collection
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        vls = _rows(
+            Vlan,
+            database.read_vlans,
+            fields,
+            session = session,
+            limit = _lookahead(limit),
+            after = after,
+            batch_size = STREAM_BATCH_SIZE)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page(vls, limit, revision)
+
+@restbp.route('/vlans/<int:resource_id>/ports', methods = ['GET'])
+def get_vlan_ports(resource_id: int) -> FlaskResponse:
+    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
+
+    # Answer conditional request without reading ports
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Parse pagination
+    try:
+        limit, after = _page_args()
+    except ValueError as e:
+        return error_400(message = str(e))
+
+    # Query database (checking if vlan exists)
+    try:
+        pts = database.read_vlan_ports(
+            session,
+            resource_id,
+            limit = _lookahead(limit),
+            after = after,
+            batch_size = STREAM_BATCH_SIZE)
+    except ValueError:
+        abort(404)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page((((pt['switch'], pt['port']), pt) for pt in pts), limit, revision)
+
+@restbp.route('/vlans/<int:resource_id>/usage', methods = ['GET'])
+def get_vlan_usage(resource_id: int) -> FlaskResponse:
+    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
+
+    # Answer conditional request without counting ports
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Query database (checking if vlan exists)
+    try:
+        usage = database.read_vlan_usage(session, resource_id)
+    except ValueError:
+        abort(404)
+
+    return _document(json.dumps(usage).encode(), revision)
+
+@restbp.route('/targets/<string:resource_id>', methods = ['GET'])
+def get_target_ports(resource_id: str) -> FlaskResponse:
+    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
+
+    # Answer conditional request without reading ports
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Parse how target is compared
+    match = request.args.get('match', 'exact')
+    ignore_case = request.args.get('ignore_case', 'false')
+    if ignore_case not in ('true', 'false'):
+        return error_400(message = "Query parameter 'ignore_case' is neither 'true' nor 'false'")
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        pts = database.read_targets(
+            session,
+            resource_id,
+            match = match,
+            ignore_case = ignore_case == 'true',
+            limit = _lookahead(limit),
+            after = after,
+            batch_size = STREAM_BATCH_SIZE)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page((((pt['switch'], pt['port']), pt) for pt in pts), limit, revision)
+
+@restbp.route('/changes', methods = ['GET'])
+def get_changes() -> FlaskResponse:
+    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
+
+    # Parse revision to return changes after
+    if 'since' not in request.args:
+        return error_400(message = "Query parameter 'since' is missing")
+    try:
+        since = int(request.args['since'])
+    except ValueError:
+        return error_400(message = "Query parameter 'since' is not an integer")
+
+    # Answer conditional request without reading changes.
+    # The entity tag is the revision to continue with on the next request.
+    revision = database.query_current_revision(session)
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    # Query database
+    try:
+        limit, after = _page_args()
+        chs = database.read_changes(
+            session,
+            since,
+            limit = _lookahead(limit),
+            after = after,
+            batch_size = STREAM_BATCH_SIZE)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return _page(((ch.pop('change_id'), ch) for ch in chs), limit, revision)
+
+@restbp.route('/events', methods = ['GET'])
+def get_events() -> FlaskResponse:
+    db = current_app.config['SWITCHMNG_DB_CONNECTION']
+
+    # Check request
+    if request.accept_mimetypes.best_match([ 'text/event-stream' ]) is None:
+        return error_406(message = 'Content-Type text/event-stream is not accepted by client')
+
+    # Revision of the last event the client received before reconnecting
+    last_event_id = None
+    if 'Last-Event-ID' in request.headers:
+        try:
+            last_event_id = int(request.headers['Last-Event-ID'])
+        except ValueError:
+            return error_400(message = 'Header Last-Event-ID is not an integer')
+
+    def generate() -> Iterator[str]:
+        with db.feed.subscribe(-1) as subscription:
+            # Read current revision after subscribing so that no change is
+            # missed, then release the database session while streaming.
+            try:
+                subscription.revision = database.query_current_revision(db.Session())
+            finally:
+                db.Session.remove()
+
+            yield _event('open', { 'revision': subscription.revision }, subscription.revision)
+            if last_event_id is not None and last_event_id < subscription.revision:
+                yield _event('resync', { 'since': last_event_id }, subscription.revision)
+
+            while True:
+                item = subscription.get(EVENTS_KEEPALIVE)
+                if item is None:
+                    yield ': keepalive\n\n'
+                    continue
+
+                event, data = item
+                yield _event(event, data, subscription.revision)
+
+    return Response(
+        generate(),
+        status = 200,
+        mimetype = 'text/event-stream',
+        headers = { 'Cache-Control': 'no-cache' })
+
+def _resource(
+        cls: type,
+        resource_ids: Tuple,
+        fields: Optional[Dict[str, Any]],
+        query: Callable[[], Any],
+        parent: Optional[type] = None) -> Response:
+    """
+    Return response containing representation of a single resource.
+
+    The revision of the resource is sent as entity tag. Conditional
+    requests (``If-None-Match``) for a current representation are answered
+    with 304 after reading only the revision of the resource.
+
+    Complete representations are taken from the document cache of the
+    database connection if possible. Otherwise the resource is queried with
+    the given function, serialized and stored in the cache until any row it
+    was built from is changed.
+
+    Aborts with 404 if the query returns None or raises a ValueError.
+
+    :param resource_ids: Resource identifier of the resource preceded by
+        resource identifier of the resource containing it (if any)
+
+    :param fields: Selection of attributes to return (See :func:`_fields_arg`)
+
+    :param query: Function returning the resource
+
+    :param parent: Class of resource containing the resource or None if
+        resource is not contained in another resource
+    """
+
+    db = current_app.config['SWITCHMNG_DB_CONNECTION']
+    key = (cls.__tablename__, ) + resource_ids
+
+    # Serve complete representation from cache
+    if fields is None:
+        cached = db.cache.get(key)
+        if cached is not None:
+            return _document(cached.document, cached.revision)
+
+    # Answer conditional request without loading resource
+    if request.if_none_match:
+        revision = database.query_revision(
+            db.Session(),
+            cls,
+            resource_ids[-1],
+            parent,
+            *resource_ids[:-1])
+        if revision is None:
+            abort(404)
+        if not_modified(revision):
+            return not_modified_response(revision)
+
+    generation = db.cache.generation
+    try:
+        resource = query()
+    except ValueError:
+        abort(404)
+    if resource is None:
+        abort(404)
+    document = json.dumps(resource.jsonify(fields)).encode()
+
+    # Never cache changes that are not committed yet
+    if fields is None and not database.tracking.pending(db.Session()):
+        db.cache.put(
+            key,
+            document,
+            resource._revision,
+            database.tracking.dependencies(resource),
+            generation)
+
+    return _document(document, resource._revision)
+
+def _document(document: bytes, revision: int) -> Response:
+    """Return response containing serialized representation of a resource"""
+
+    if not_modified(revision):
+        return not_modified_response(revision)
+
+    response = Response(
+        b'{"status": 200, "data": ' + document + b'}',
+        status = 200,
+        mimetype = 'application/json')
+    response.set_etag(etag(revision))
+    return response
+
+def _event(event: str, data: JsonDict, revision: int) -> str:
+    """
+    Return server-sent event with given name and data.
+
+    The revision is sent as event id, so that reconnecting clients send it
+    back as ``Last-Event-ID`` header.
+    """
+
+    return 'event: {}\nid: {}\ndata: {}\n\n'.format(event, revision, json.dumps(data))
+
+def _page_args() -> Tuple[Optional[int], Any]:
+    """
+    Parse pagination parameters from query string of current request.
+
+    Collections can be requested page by page with the query parameters
+    ``limit`` (maximum number of resources per page) and ``cursor``
+    (opaque value from the ``next`` link of the previous page).
+
+    :return: Tuple of maximum number of resources to return (or None for
+        all resources) and resource identifier of the last resource of the
+        previous page (or None for the first page).
+    """
+
+    limit = None
+    if 'limit' in request.args:
+        try:
+            limit = int(request.args['limit'])
+        except ValueError:
+            raise ValueError("Query parameter 'limit' is not an integer")
+        if limit < 1:
+            raise ValueError("Query parameter 'limit' has to be positive")
+
+    after = None
+    if 'cursor' in request.args:
+        try:
+            after = json.loads(base64.urlsafe_b64decode(request.args['cursor'].encode()))
+        except ValueError:
+            raise ValueError("Query parameter 'cursor' is invalid")
+        if isinstance(after, list):
+            after = tuple(after)
+
+    return limit, after
+
+def _fields_arg(cls: type) -> Optional[Dict[str, Any]]:
+    """
+    Parse selection of attributes from query string of current request.
+
+    Attributes to return can be selected with the query parameter
+    ``fields`` as a comma separated list (e.g. ``fields=name,ports.name``).
+    The parameter can also be given multiple times.
+
+    :param cls: Resource class to select attributes of
+
+    :return: Selection of attributes (See
+        :meth:`BaseResource.parse_fields`) or None if all attributes
+        should be returned.
+    """
+
+    if 'fields' not in request.args:
+        return None
+
+    fields = [ field
+               for arg in request.args.getlist('fields')
+               for field in arg.split(',') ]
+    return cls.parse_fields(fields)
+
+def _lookahead(limit: Optional[int]) -> Optional[int]:
+    """
+    Return number of resources to query for a page of given size.
+
+    One more resource than fits on the page is queried in order to know if
+    there is a next page.
+    """
+
+    if limit is None:
+        return None
+    return limit + 1
+
+def _jsonified(
+        resources: Iterable,
+        fields: Optional[Dict[str, Any]]) -> Iterator[Tuple[Any, JsonDict]]:
+    """
+    Represent given resource objects one after another.
+
+    :param fields: Selection of attributes of every resource to return
+        (See :func:`_fields_arg`)
+
+    :return: Iterator of tuples of resource identifier and json-ready dict
+        of every resource
+    """
+
+    for resource in resources:
+        key = getattr(resource, type(resource).ResourceIdentifier)
+        yield key, resource.jsonify(fields)
+
+def _rows(
+        cls: type,
+        read: Callable[..., Iterable[JsonDict]],
+        fields: Optional[Dict[str, Any]],
+        **kwargs) -> Iterator[Tuple[Any, JsonDict]]:
+    """
+    Read resources as json-ready dicts without creating resource objects.
+
+    The resource identifier is always read in order to continue on the
+    next page but only returned if it was selected.
+
+    :param cls: Resource class to read
+
+    :param read: Read function of :mod:`switchmng.database` for given
+        resource class (e.g. :func:`read_switches`). Gets called with the
+        selection of attributes and all given keyword arguments before
+        returning.
+
+    :param fields: Selection of attributes of every resource to return
+        (See :func:`_fields_arg`)
+
+    :return: Iterator of tuples of resource identifier and json-ready dict
+        of every resource
+    """
+
+    key = cls.ResourceIdentifier
+    selection = fields
+    if fields is not None and key not in fields:
+        selection = dict(fields)
+        selection[key] = None
+
+    resources = read(fields = selection, **kwargs)
+
+    def generate() -> Iterator[Tuple[Any, JsonDict]]:
+        for json_dict in resources:
+            if selection is fields:
+                yield json_dict[key], json_dict
+            else:
+                yield json_dict.pop(key), json_dict
+
+    return generate()
+
+def _page(
+        resources: Iterable[Tuple[Any, JsonDict]],
+        limit: Optional[int],
+        revision: int) -> Response:
+    """
+    Return streamed response containing a page of given resources.
+
+    Resources are taken from given iterable of tuples of resource
+    identifier and json-ready dict (See :func:`_jsonified` and
+    :func:`_rows`) and serialized one after another while the response is
+    sent, so that neither all resources nor the complete response have to
+    be held in memory at once.
+
+    If there are more resources than fit on the page (See
+    :func:`_lookahead`) the response contains a link to the next page.
+    Otherwise the link is null.
+
+    :param revision: Revision of the last change to any resource (See
+        :func:`query_current_revision`) sent as entity tag
+    """
+
+    path = request.path
+    args = request.args.copy()
+
+    def generate() -> Iterator[str]:
+        yield '{"status": 200, "data": ['
+
+        next_link = None
+        key = None
+        for i, (resource_id, json_dict) in enumerate(resources):
+            if limit is not None and i >= limit:
+                # Continue after resource identifier of last resource on this page
+                args['cursor'] = base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+                next_link = path + '?' + urlencode(list(args.items(multi = True)))
+                break
+
+            if i > 0:
+                yield ', '
+            yield json.dumps(json_dict)
+            key = resource_id
+
+        yield '], "next": {}}}'.format(json.dumps(next_link))
+
+    response = Response(
+        stream_with_context(generate()),
+        status = 200,
+        mimetype = 'application/json')
+    response.set_etag(etag(revision))
+    return response
@@ -0,0 +1,379 @@
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from flask import current_app
+from flask import request
+from werkzeug.datastructures import ETags
+from werkzeug.routing import Map
+from werkzeug.routing import Rule
+
+from switchmng.typing import FlaskResponse
+
+from switchmng import database
+from switchmng.schema import *
+from .errors import *
+from .conditional import etag_header
+from .conditional import precondition_failed
+
+Operation = Callable[..., FlaskResponse]
+"""
+Function changing resources.
+
+Operations are called with the database session, the json body of the
+request (None if the request has no valid json body), the entity tags of
+the precondition of the request (``If-Match``) and the arguments parsed
+from the path of the request as keyword arguments. They return the
+response as tuple of json body, status code and optionally headers.
+Failures are returned as error responses (See :func:`error_400` etc.)
+instead of being raised.
+"""
+
+class Collection():
+    """
+    Operations changing resources of one type.
+
+    :param cls: Class of the resources
+
+    :param parent: Class of the resource containing the resources
+        or None if the resources are not contained in another resource
+
+    :param query: Database function looking up a single resource
+
+    :param add: Database function adding a resource or None if resources
+        cannot be added on their own
+
+    :param set: Database function setting a resource
+
+    :param modify: Database function modifying a resource
+
+    :param delete: Database function deleting a resource or None if
+        resources cannot be deleted on their own
+
+    The resource identifiers passed to operations are named like the
+    parameters of the database functions. Operations on resources
+    contained in another resource get the resource identifier of the
+    parent first.
+    """
+
+    def __init__(
+            self,
+            cls: type,
+            parent: Optional[type],
+            query: Callable,
+            add: Optional[Callable],
+            set: Callable,    #pylint: disable = redefined-builtin
+            modify: Callable,
+            delete: Optional[Callable]):
+
+        self.cls = cls
+        self.parent = parent
+        self._query = query
+        self._add = add
+        self._set = set
+        self._modify = modify
+        self._delete = delete
+
+    def post(self, session, body, if_match: ETags, **ids) -> FlaskResponse:    #pylint: disable = unused-argument
+        """Add resource (contained in parent resource with given identifier)"""
+
+        if not isinstance(body, dict):
+            return error_400(message = 'Request is not a valid json object')
+
+        # Add to database
+        try:
+            resource = self._add(session, **ids, **body)
+        except BaseException as e:
+            return error_400(message = str(e))
+
+        return { 'status': 201,
+                 'data': resource.jsonify() }, 201
+
+    def put(self, session, body, if_match: ETags, **ids) -> FlaskResponse:
+        """Set resource with given identifiers to state given in body"""
+
+        if not isinstance(body, dict):
+            return error_400(message = 'Request is not a valid json object')
+
+        # Check precondition
+        if precondition_failed(lambda: self._revision(session, ids), if_match):
+            return error_412()
+
+        # Set in database
+        try:
+            resource = self._set(session, **ids, **body)
+        except BaseException as e:
+            return error_400(message = str(e))
+
+        # Send new revision for further conditional requests.
+        # (The resource is read again after the commit, so its revision
+        # includes changes written to resources it depends on)
+        return { 'status': 200,
+                 'data': resource.jsonify() }, 200, etag_header(resource._revision)
+
+    def patch(self, session, body, if_match: ETags, **ids) -> FlaskResponse:
+        """Modify attributes given in body of resource with given identifiers"""
+
+        if not isinstance(body, dict):
+            return error_400(message = 'Request is not a valid json object')
+
+        # Check if resource exists
+        # (Looking up a resource raises ValueError if its parent does not exist)
+        try:
+            resource = self._query(session, **ids)
+        except ValueError:
+            return error_404()
+        if resource is None:
+            return error_404()
+
+        # Check precondition
+        if precondition_failed(lambda: resource._revision, if_match):
+            return error_412()
+
+        # Modify in database
+        try:
+            resource = self._modify(session, **ids, **body)
+        except BaseException as e:
+            return error_400(message = str(e))
+
+        # Send new revision for further conditional requests.
+        # (The resource is read again after the commit, so its revision
+        # includes changes written to resources it depends on)
+        return { 'status': 200,
+                 'data': resource.jsonify() }, 200, etag_header(resource._revision)
+
+    def delete(self, session, body, if_match: ETags, **ids) -> FlaskResponse:    #pylint: disable = unused-argument
+        """Delete resource with given identifiers"""
+
+        # Check if resource exists
+        # (Looking up a resource raises ValueError if its parent does not exist)
+        try:
+            resource = self._query(session, **ids)
+        except ValueError:
+            return error_404()
+        if resource is None:
+            return error_404()
+
+        # Check precondition
+        if precondition_failed(lambda: resource._revision, if_match):
+            return error_412()
+
+        # Delete from database
+        try:
+            self._delete(session, **ids)
+        except BaseException as e:
+            return error_400(message = str(e))
+
+        return { 'status': 200,
+                 'data': None }, 200
+
+    def _revision(self, session, ids: Dict[str, Any]) -> Optional[int]:
+        """Return revision of resource with given identifiers without loading it"""
+
+        *parent_ids, resource_id = ids.values()
+        if self.parent is None:
+            return database.query_revision(session, self.cls, resource_id)
+        return database.query_revision(session, self.cls, resource_id,
+                                       self.parent, parent_ids[0])
+
+SWITCH_MODELS = Collection(
+    SwitchModel, None,
+    database.query_switch_model,
+    database.add_switch_model,
+    database.set_switch_model,
+    database.modify_switch_model,
+    database.delete_switch_model)
+
+PORT_MODELS = Collection(
+    PortModel, SwitchModel,
+    database.query_port_model,
+    database.add_port_model,
+    database.set_port_model,
+    database.modify_port_model,
+    database.delete_port_model)
+
+SWITCHES = Collection(
+    Switch, None,
+    database.query_switch,
+    database.add_switch,
+    database.set_switch,
+    database.modify_switch,
+    database.delete_switch)
+
+PORTS = Collection(
+    Port, Switch,
+    database.query_port,
+    None,
+    database.set_port,
+    database.modify_port,
+    None)
+
+NETWORK_PROTOCOLS = Collection(
+    NetworkProtocol, None,
+    database.query_network_protocol,
+    database.add_network_protocol,
+    database.set_network_protocol,
+    database.modify_network_protocol,
+    database.delete_network_protocol)
+
+CONNECTORS = Collection(
+    Connector, None,
+    database.query_connector,
+    database.add_connector,
+    database.set_connector,
+    database.modify_connector,
+    database.delete_connector)
+
+VLANS = Collection(
+    Vlan, None,
+    database.query_vlan,
+    database.add_vlan,
+    database.set_vlan,
+    database.modify_vlan,
+    database.delete_vlan)
+
+def assign_vlan(session, body, if_match: ETags, resource_id: int) -> FlaskResponse:    #pylint: disable = unused-argument
+    """Add vlan with given tag to all ports selected by body"""
+
+    return _assign(database.assign_vlan, session, body, resource_id)
+
+def unassign_vlan(session, body, if_match: ETags, resource_id: int) -> FlaskResponse:    #pylint: disable = unused-argument
+    """Remove vlan with given tag from all ports selected by body"""
+
+    return _assign(database.unassign_vlan, session, body, resource_id)
+
+def _assign(assign: Callable, session, body, resource_id: int) -> FlaskResponse:
+    """Add vlan to or remove vlan from all ports selected by body"""
+
+    if not isinstance(body, dict):
+        return error_400(message = 'Request is not a valid json object')
+
+    # Check if vlan exists
+    if database.query_vlan(session, resource_id) is None:
+        return error_404()
+
+    # Change all selected ports
+    try:
+        count = assign(session, resource_id, **body)
+    except BaseException as e:
+        return error_400(message = str(e))
+
+    return { 'status': 200,
+             'data': { 'affected_ports': count } }, 200
+
+def _rules(path: str, **operations: Operation) -> List[Rule]:
+    """Return rules dispatching given methods on path to operations"""
+
+    return [ Rule(path, methods = [ method.upper() ], endpoint = operation)
+             for method, operation in operations.items() ]
+
+OPERATIONS = Map([
+    *_rules('/switch_models',
+            post = SWITCH_MODELS.post),
+    *_rules('/switch_models/<string:resource_id>',
+            put = SWITCH_MODELS.put,
+            patch = SWITCH_MODELS.patch,
+            delete = SWITCH_MODELS.delete),
+    *_rules('/switch_models/<string:switch_model_resource_id>/ports',
+            post = PORT_MODELS.post),
+    *_rules('/switch_models/<string:switch_model_resource_id>/ports/<string:port_model_resource_id>',
+            put = PORT_MODELS.put,
+            patch = PORT_MODELS.patch,
+            delete = PORT_MODELS.delete),
+    *_rules('/switches',
+            post = SWITCHES.post),
+    *_rules('/switches/<string:resource_id>',
+            put = SWITCHES.put,
+            patch = SWITCHES.patch,
+            delete = SWITCHES.delete),
+    *_rules('/switches/<string:switch_resource_id>/ports/<string:port_resource_id>',
+            put = PORTS.put,
+            patch = PORTS.patch),
+    *_rules('/network_protocols',
+            post = NETWORK_PROTOCOLS.post),
+    *_rules('/network_protocols/<string:resource_id>',
+            put = NETWORK_PROTOCOLS.put,
+            patch = NETWORK_PROTOCOLS.patch,
+            delete = NETWORK_PROTOCOLS.delete),
+    *_rules('/connectors',
+            post = CONNECTORS.post),
+    *_rules('/connectors/<string:resource_id>',
+            put = CONNECTORS.put,
+            patch = CONNECTORS.patch,
+            delete = CONNECTORS.delete),
+    *_rules('/vlans',
+            post = VLANS.post),
+    *_rules('/vlans/<int:resource_id>',
+            put = VLANS.put,
+            patch = VLANS.patch,
+            delete = VLANS.delete),
+    *_rules('/vlans/<int:resource_id>/assign',
+            post = assign_vlan),
+    *_rules('/vlans/<int:resource_id>/unassign',
+            post = unassign_vlan),
+], strict_slashes = False)
+"""
+Operations by path and method.
+
+These are the operations that can be run in a batch. (See :func:`post_batch`)
+"""
+
+def validate_added(batch: List[Tuple[Operation, Any]]) -> None:
+    """
+    Check resources added by multiple operations at once.
+
+    Bodies of all operations adding resources (See :meth:`Collection.post`)
+    are checked together per type of resource with
+    :meth:`BaseResource.validate_many`. Other operations are not checked.
+
+    :param batch: List of operations and their bodies
+
+    :raises TypeError: When type of an attribute does not match
+        expectation or a required attribute is missing
+    :raises ValueError: When value of an attribute does not match
+        expectation
+
+    Error messages contain the position of the failing operation.
+    """
+
+    added: Dict[type, Tuple[List[Any], List[str]]] = {}
+    for i, (operation, body) in enumerate(batch):
+        collection = getattr(operation, '__self__', None)
+        if not isinstance(collection, Collection) or operation != collection.post:
+            continue
+        bodies, names = added.setdefault(collection.cls, ([], []))
+        bodies.append(body)
+        names.append('Operation {}'.format(i))
+
+    for cls, (bodies, names) in added.items():
+        cls.validate_many(bodies, names = names)
+
+def run_request(
+        operation: Operation,
+        content_type: Optional[str] = 'application/json',
+        **ids) -> FlaskResponse:
+    """
+    Run operation with body and precondition of the current request.
+
+    :param content_type: Content type the body of the request has to have
+        or None if the request has no body
+
+    :param ids: Arguments parsed from the path of the request
+    """
+
+    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
+
+    # Check request
+    if content_type is not None and request.content_type != content_type:
+        return error_415(message = 'Expected Content-Type to be {}'.format(content_type))
+    if not request.accept_mimetypes.accept_json:
+        return error_406(message = 'Content-Type application/json is not accepted by client')
+
+    body = None
+    if content_type is not None:
+        body = request.get_json(silent = True)
+
+    return operation(session, body, request.if_match, **ids)
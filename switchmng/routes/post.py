@@ -1,139 +1,65 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
 from flask import current_app
 from flask import request
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import MethodNotAllowed
+from werkzeug.exceptions import NotFound
+from werkzeug.http import parse_etags
 
 from switchmng.typing import FlaskResponse
+from switchmng.typing import JsonDict
 
 from switchmng import database
 from .blueprint import restbp
 from .errors import *
+from . import operations
+from .operations import Operation
+from .operations import run_request
 
 @restbp.route('/switch_models', methods = ['POST'])
 def post_switch_model() -> FlaskResponse:
-    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
-
-    # Check request
-    if request.content_type != 'application/json':
-        return error_415(message = 'Expected Content-Type to be application/json')
-    if not request.accept_mimetypes.accept_json:
-        return error_406(message = 'Content-Type application/json is not accepted by client')
-    try:
-        req = request.json
-        if not isinstance(req, dict):
-            raise BaseException()
-    except:
-        return error_400(message = 'Request is not a valid json object')
-
-    # Add to database
-    try:
-        sm = database.add_switch_model(session, **req)
-    except BaseException as e:
-        return error_400(message = str(e))
-
-    return { 'status': 201,
-             'data': sm.jsonify() }, 201
+    return run_request(operations.SWITCH_MODELS.post)
 
 @restbp.route('/switch_models/<string:switch_model_resource_id>/ports', methods = ['POST'])
 def post_port_model(switch_model_resource_id: str) -> FlaskResponse:
-    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
-
-    # Check request
-    if request.content_type != 'application/json':
-        return error_415(message = 'Expected Content-Type to be application/json')
-    if not request.accept_mimetypes.accept_json:
-        return error_406(message = 'Content-Type application/json is not accepted by client')
-    try:
-        req = request.json
-        if not isinstance(req, dict):
-            raise BaseException()
-    except:
-        return error_400(message = 'Request is not a valid json object')
-
-    # Add to database
-    try:
-        pm = database.add_port_model(session, switch_model_resource_id, **req)
-    except BaseException as e:
-        return error_400(message = str(e))
-
-    return { 'status': 201,
-             'data': pm.jsonify() }, 201
+    return run_request(operations.PORT_MODELS.post, switch_model_resource_id = switch_model_resource_id)
 
 @restbp.route('/switches', methods = ['POST'])
 def post_switch() -> FlaskResponse:
-    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
-
-    # Check request
-    if request.content_type != 'application/json':
-        return error_415(message = 'Expected Content-Type to be application/json')
-    if not request.accept_mimetypes.accept_json:
-        return error_406(message = 'Content-Type application/json is not accepted by client')
-    try:
-        req = request.json
-        if not isinstance(req, dict):
-            raise BaseException()
-    except:
-        return error_400(message = 'Request is not a valid json object')
-
-    # Add to database
-    try:
-        sw = database.add_switch(session, **req)
-    except BaseException as e:
-        return error_400(message = str(e))
-
-    return { 'status': 201,
-             'data': sw.jsonify() }, 201
+    return run_request(operations.SWITCHES.post)
 
 @restbp.route('/network_protocols', methods = ['POST'])
 def post_network_protocol() -> FlaskResponse:
-    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
-
-    # Check request
-    if request.content_type != 'application/json':
-        return error_415(message = 'Expected Content-Type to be application/json')
-    if not request.accept_mimetypes.accept_json:
-        return error_406(message = 'Content-Type application/json is not accepted by client')
-    try:
-        req = request.json
-        if not isinstance(req, dict):
-            raise BaseException()
-    except:
-        return error_400(message = 'Request is not a valid json object')
-
-    # Add to database
-    try:
-        np = database.add_network_protocol(session, **req)
-    except BaseException as e:
-        return error_400(message = str(e))
-
-    return { 'status': 201,
-             'data': np.jsonify() }, 201
+    return run_request(operations.NETWORK_PROTOCOLS.post)
 
 @restbp.route('/connectors', methods = ['POST'])
 def post_connector() -> FlaskResponse:
-    session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
+    return run_request(operations.CONNECTORS.post)
 
-    # Check request
-    if request.content_type != 'application/json':
-        return error_415(message = 'Expected Content-Type to be application/json')
-    if not request.accept_mimetypes.accept_json:
-        return error_406(message = 'Content-Type application/json is not accepted by client')
-    try:
-        req = request.json
-        if not isinstance(req, dict):
-            raise BaseException()
-    except:
-        return error_400(message = 'Request is not a valid json object')
+@restbp.route('/vlans', methods = ['POST'])
+def post_vlan() -> FlaskResponse:
+    return run_request(operations.VLANS.post)
 
-    # Add to database
-    try:
-        cn = database.add_connector(session, **req)
-    except BaseException as e:
-        return error_400(message = str(e))
+@restbp.route('/vlans/<int:resource_id>/assign', methods = ['POST'])
+def post_vlan_assign(resource_id: int) -> FlaskResponse:
+    return run_request(operations.assign_vlan, resource_id = resource_id)
 
-    return { 'status': 201,
-             'data': cn.jsonify() }, 201
+@restbp.route('/vlans/<int:resource_id>/unassign', methods = ['POST'])
+def post_vlan_unassign(resource_id: int) -> FlaskResponse:
+    return run_request(operations.unassign_vlan, resource_id = resource_id)
 
-@restbp.route('/vlans', methods = ['POST'])
-def post_vlan() -> FlaskResponse:
+BATCH_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+"""HTTP methods of operations allowed in a batch"""
+
+class _BatchFailed(Exception):
+    """Raised to roll back a batch when one of its operations failed"""
+
+@restbp.route('/batch', methods = ['POST'])
+def post_batch() -> FlaskResponse:
     session = current_app.config['SWITCHMNG_DB_CONNECTION'].Session()
 
     # Check request
@@ -143,16 +69,98 @@ def post_vlan() -> FlaskResponse:
         return error_406(message = 'Content-Type application/json is not accepted by client')
     try:
         req = request.json
-        if not isinstance(req, dict):
+        if not isinstance(req, list):
             raise BaseException()
     except:
-        return error_400(message = 'Request is not a valid json object')
-
-    # Add to database
+        return error_400(message = 'Request is not a valid json array')
+
+    # Check all operations before running any of them
+    resolved = []
+    for i, operation in enumerate(req):
+        try:
+            _check_operation(operation)
+        except (TypeError, ValueError) as e:
+            return error_400(message = 'Operation {}: {}'.format(i, e))
+        try:
+            resolved.append(_resolve_operation(operation))
+        except NotFound:
+            return error_404(message = "Operation {}: No resource at path '{}'".format(
+                i, operation['path']))
+        except MethodNotAllowed:
+            return error_405(message = "Operation {}: Method {} is not allowed for path '{}'"
+                .format(i, operation['method'], operation['path']))
+
+    # Check all added resources together before running any operation
     try:
-        vl = database.add_vlan(session, **req)
-    except BaseException as e:
+        operations.validate_added([ (run, operation.get('body'))
+                                    for operation, (run, _) in zip(req, resolved) ])
+    except (TypeError, ValueError) as e:
         return error_400(message = str(e))
 
-    return { 'status': 201,
-             'data': vl.jsonify() }, 201
+    # Run all operations in a single transaction
+    results: List[JsonDict] = []
+    try:
+        with database.transaction(session):
+            for operation, (run, ids) in zip(req, resolved):
+                if_match = parse_etags(Headers(operation.get('headers', {})).get('If-Match'))
+                result, code, *_ = run(session, operation.get('body'), if_match, **ids)
+                results.append(result)
+                if code >= 400:
+                    raise _BatchFailed()
+    except _BatchFailed:
+        result, code = results[-1], results[-1]['status']
+        return { 'status': code,
+                 'data': results,
+                 'message': 'Operation {} failed: {}'.format(
+                     len(results) - 1,
+                     result.get('message')) }, code
+
+    return { 'status': 200,
+             'data': results }, 200
+
+def _check_operation(operation: Any) -> None:
+    """
+    Check structure of a single operation of a batch.
+
+    An operation is a json object with the keys ``method`` (one of
+    :data:`BATCH_METHODS`), ``path`` (path of the resource as used in
+    single requests), ``body`` (json body of the request, not needed for
+    DELETE) and optionally ``headers`` (additional request headers like
+    ``If-Match``).
+    """
+
+    if not isinstance(operation, dict):
+        raise TypeError('Operation is not a json object')
+    unexpected = set(operation) - { 'method', 'path', 'body', 'headers' }
+    if len(unexpected) > 0:
+        raise TypeError("Unexpected key '{}' in operation".format(sorted(unexpected)[0]))
+
+    if operation.get('method') not in BATCH_METHODS:
+        raise ValueError('Method has to be one of {}'.format(', '.join(BATCH_METHODS)))
+    if not isinstance(operation.get('path'), str) or not operation['path'].startswith('/'):
+        raise ValueError('Path has to be an absolute path')
+    if operation['method'] != 'DELETE' and not isinstance(operation.get('body'), dict):
+        raise TypeError('Body is not a json object')
+    headers = operation.get('headers', {})
+    if not isinstance(headers, dict) \
+            or not all(isinstance(v, str) for v in headers.values()):
+        raise TypeError('Headers are not a json object of strings')
+
+def _resolve_operation(operation: Dict[str, Any]) -> Tuple[Operation, Dict[str, Any]]:
+    """
+    Look up what to run for a single operation of a batch.
+
+    Operations are looked up by path and method in
+    :data:`operations.OPERATIONS`, so that they are checked and applied
+    exactly like single requests.
+
+    :raises NotFound: When there is no resource at the path of the operation
+
+    :raises MethodNotAllowed: When the method cannot be used in a batch for
+        the path of the operation
+
+    :return: Tuple of operation and arguments parsed from path
+    """
+
+    adapter = operations.OPERATIONS.bind('localhost')
+    return adapter.match(operation['path'], method = operation['method'])
@@ -1,8 +1,185 @@
+from operator import attrgetter
+from operator import itemgetter
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 
 from switchmng.typing import JsonDict
 
+def _validator(cls: type, key: str, attr: Dict[str, Any]) -> Callable[[Any], None]:
+    """
+    Compile validator for resource attribute with given name and metadata.
+
+    The returned function checks a value for the resource attribute like
+    described in :meth:`BaseResource.check_param`. All metadata is read
+    once when compiling and error messages are only built when a check
+    fails.
+    """
+
+    typ = attr['type']
+    optional = attr['optional']
+    checks = tuple(attr.get('checks', ()))
+
+    def check_values(val) -> None:
+        for value_check in checks:
+            if value_check(cls, val) is False:
+                raise ValueError("Illegal value '{}' for attribute '{}' of resource {}".format(
+                    val,
+                    key,
+                    cls))
+
+    if attr['list']:
+        def validate(val) -> None:
+            if optional and val is None:
+                return
+
+            # Only check every distinct type of items once
+            if not isinstance(val, list) \
+                    or not all(issubclass(t, typ) for t in set(map(type, val))):
+                raise TypeError(
+                    "Attribute '{}' of resource {} has to be of type list of '{}'".format(
+                        key,
+                        cls,
+                        typ))
+
+            if checks:
+                check_values(val)
+    else:
+        def validate(val) -> None:
+            if optional and val is None:
+                return
+
+            if not isinstance(val, typ):
+                raise TypeError("Attribute '{}' of resource {} has to be of type '{}'".format(
+                    key,
+                    cls,
+                    typ))
+
+            if checks:
+                check_values(val)
+
+    return validate
+
+def _resource_attribute(
+        key: str,
+        attr: Dict[str, Any],
+        validate: Callable[[Any], None]) -> property:
+    """
+    Create descriptor for resource attribute with given name and metadata.
+
+    Getting the resource attribute returns the private attribute backing
+    it. Setting the resource attribute checks the given value with given
+    validator, sets the private attribute and runs all post hooks
+    afterwards.
+    """
+
+    private = attr['private']
+    post_hooks = tuple(attr.get('post_hooks', ()))
+
+    def fset(self, val) -> None:
+        # Check resource attribute before setting
+        validate(val)
+
+        setattr(self, private, val)
+
+        # Run post hooks after setting resource attribute
+        for hook in post_hooks:
+            hook(self)
+
+    return property(attrgetter(private), fset)
+
+def _state_getter(private: str) -> Callable[[Any], Any]:
+    """
+    Create function returning private attribute with given name of an object.
+
+    The value is read straight from the instance dict. Only if it is not
+    present there (e.g. because it was not loaded from the database yet)
+    the attribute is accessed regularly.
+    """
+
+    def get(obj) -> Any:
+        state = obj.__dict__
+        if private in state:
+            return state[private]
+        return getattr(obj, private)
+
+    return get
+
+_Converter = Optional[Callable[[Any, Optional[Dict[str, Any]]], Any]]
+_SerializedAttribute = Tuple[str, Callable[[Any], Any], _Converter]
+
+def _converters(attr: Dict[str, Any]) -> Tuple[_Converter, _Converter]:
+    """
+    Compile converters for resource attribute with given metadata.
+
+    Return a converter for values of resource objects and a converter for
+    values of row tuples (See :meth:`BaseResource.jsonify_row`). Every
+    converter takes the value and the selection of nested attributes
+    and returns the json-ready value. None is returned instead of a
+    converter if the value can be used as is.
+    """
+
+    typ = attr['type']
+    resource = isinstance(typ, type) and issubclass(typ, BaseResource)
+
+    if resource and attr.get('nested', False):
+        # Nested resources get serialized completely
+        if attr['list']:
+            def from_object(val, nested):
+                return [ typ._jsonify_object(v, nested) for v in val ]
+            def from_row(val, nested):
+                return [ typ._jsonify_row(v, nested) for v in val ]
+        else:
+            def from_object(val, nested):
+                return None if val is None else typ._jsonify_object(val, nested)
+            def from_row(val, nested):
+                return None if val is None else typ._jsonify_row(val, nested)
+        return from_object, from_row
+
+    if resource:
+        # Referenced resources get represented by their identifier
+        identifier = _state_getter(typ._Attributes[typ.ResourceIdentifier]['private'])
+        if attr['list']:
+            def from_object(val, nested):    #pylint: disable = unused-argument
+                return [ identifier(v) for v in val ]
+        else:
+            def from_object(val, nested):    #pylint: disable = unused-argument
+                return None if val is None else identifier(val)
+        return from_object, None
+
+    if 'jsonify' in attr:
+        hook = attr['jsonify']
+        return lambda val, nested: hook(val), None
+
+    return None, None
+
+def _serializer(attributes: List[_SerializedAttribute]) -> Callable[..., JsonDict]:
+    """
+    Create function representing resources as json-ready dicts.
+
+    Every given attribute consists of the name of the resource attribute,
+    a function returning its value and a converter for this value.
+    """
+
+    def serialize(resource, fields: Optional[Dict[str, Any]] = None) -> JsonDict:
+        if fields is None:
+            return { key: get(resource) if convert is None else convert(get(resource), None)
+                     for key, get, convert in attributes }
+
+        # Only represent selected attributes
+        json_dict: JsonDict = {}
+        for key, get, convert in attributes:
+            if key in fields:
+                val = get(resource)
+                json_dict[key] = val if convert is None else convert(val, fields[key])
+        return json_dict
+
+    return serialize
+
 class BaseResource():
     """
     Represents the base for all REST resources.
@@ -18,6 +195,9 @@ class BaseResource():
 
     _Attributes: Dict[str, Dict[str, Any]] = {}
 
+    _validators: Dict[str, Callable[[Any], None]] = {}
+    """Validator of every resource attribute compiled from `_Attributes`"""
+
     def __init__(self, **kwargs):
         cls = type(self)
 
@@ -39,29 +219,26 @@ class BaseResource():
         for key, val in kwargs.items():
             setattr(self, key, val)
 
-    def __setattr__(self, name, val) -> None:
-        # If attribute is not a resource attribute set it normally
-        if name not in type(self)._Attributes:
-            super().__setattr__(name, val)
-            return
-
-        # Check resource attribute before setting
-        self.check_param(name, val)
-
-        attr = type(self)._Attributes[name]
-        super().__setattr__(attr['private'], val)
-
-        # Run post hooks after setting resource attribute
-        if 'post_hooks' in attr:
-            for hook in attr['post_hooks']:
-                hook(self)
-
-    def __getattribute__(self, name):
-        # If attribute is not a resource attribute get it normally
-        attrs = type(self)._Attributes
-        if name not in attrs:
-            return super().__getattribute__(name)
-        return getattr(self, attrs[name]['private'])
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Compile a validator and a descriptor for every resource attribute
+        # so that all other attributes keep their native lookup
+        cls._validators = {}
+        for key, attr in cls._Attributes.items():
+            cls._validators[key] = _validator(cls, key, attr)
+            setattr(cls, key, _resource_attribute(key, attr, cls._validators[key]))
+
+        # Compile serializers reading resource attributes from objects
+        # and from row tuples
+        from_object: List[_SerializedAttribute] = []
+        from_row: List[_SerializedAttribute] = []
+        for i, (key, attr) in enumerate(cls._Attributes.items()):
+            object_converter, row_converter = _converters(attr)
+            from_object.append((key, _state_getter(attr['private']), object_converter))
+            from_row.append((key, itemgetter(i), row_converter))
+        cls._jsonify_object = staticmethod(_serializer(from_object))
+        cls._jsonify_row = staticmethod(_serializer(from_row))
 
     def __str__(self) -> str:
         # Represent this resource as a string of resource identifier
@@ -70,7 +247,7 @@ class BaseResource():
     def __repr__(self) -> str:
         return self.__str__()
 
-    def jsonify(self) -> JsonDict:
+    def jsonify(self, fields: Optional[Dict[str, Any]] = None) -> JsonDict:
         """
         Represent this resource as a json-ready dict.
 
@@ -83,23 +260,80 @@ class BaseResource():
         * int
         * bool
         * None / null
+
+        :param fields: Selection of attributes to represent as returned by
+            :meth:`parse_fields` or None to represent all attributes.
         """
 
-        Attributes = type(self)._Attributes
+        return type(self)._jsonify_object(self, fields)
 
-        # Create json dictionary
-        json_dict: JsonDict = {}
-        # Add every resource attribute to dictionary
-        for key in Attributes:
+    @classmethod
+    def jsonify_row(
+            cls,
+            row: Sequence[Any],
+            fields: Optional[Dict[str, Any]] = None) -> JsonDict:
+        """
+        Represent a resource given as row tuple as a json-ready dict.
+
+        Allows representing resources without creating resource objects.
+        The row contains a value for every resource attribute in the order
+        of declaration. Referenced resources are given by their identifier
+        (e.g. the tag of a vlan) and nested resources as list of rows of
+        the nested resource.
 
-            # If necessary jsonify attribute before adding it
-            var = getattr(self, key)
-            if 'jsonify' in Attributes[key]:
-                var = Attributes[key]['jsonify'](var)
+        :param row: Values of resource attributes
+        :param fields: Selection of attributes to represent as returned by
+            :meth:`parse_fields` or None to represent all attributes.
+        """
 
-            json_dict[key] = var
+        return cls._jsonify_row(row, fields)
 
-        return json_dict
+    @classmethod
+    def parse_fields(cls, fields: List[str]) -> Dict[str, Any]:
+        """
+        Parse selection of attributes of this resource.
+
+        Every field is the name of an attribute of this resource. Attributes
+        containing nested resources can be followed by a dot and an
+        attribute of the nested resource (e.g. ``ports.name``) to only
+        select this attribute of the nested resources.
+
+        :param fields: List of fields to select
+
+        :return: Dict with selected attributes as keys. The value of every key
+            is either None when selecting the whole attribute or a dict of
+            selected attributes of the nested resources.
+
+        :raises ValueError: When a field does not match an attribute of
+            this resource
+        """
+
+        # Group nested fields by attribute of this resource
+        nested: Dict[str, Optional[List[str]]] = {}
+        for field in fields:
+            key, _, rest = field.partition('.')
+            if key not in cls._Attributes:
+                raise ValueError("Unexpected field '{}' for resource {}".format(
+                    key,
+                    cls))
+
+            if rest == '':
+                nested[key] = None
+                continue
+
+            if not cls._Attributes[key].get('nested', False):
+                raise ValueError("Attribute '{}' of resource {} has no nested fields".format(
+                    key,
+                    cls))
+            if key not in nested:
+                nested[key] = []
+            if nested[key] is not None:
+                nested[key].append(rest)
+
+        return { key: (None
+                       if sub is None
+                       else cls._Attributes[key]['type'].parse_fields(sub))
+                 for key, sub in nested.items() }
 
     @classmethod
     def check_param(cls, key, val) -> None:
@@ -120,45 +354,13 @@ class BaseResource():
         """
 
         # Check if attribute is valid for this resource at all
-        if key not in cls._Attributes:
+        validate = cls._validators.get(key)
+        if validate is None:
             raise TypeError("Unexpected attribute '{}' for resource '{}'".format(
                 key,
                 cls))
 
-        Attribute = cls._Attributes[key]
-
-        # Check if attribute is null and is allowed to be null
-        if Attribute['optional'] and val is None:
-            return
-
-        # Check if attribute has correct type
-        if Attribute['list']:
-            msg = "Attribute '{}' of resource {} has to be of type list of '{}'".format(
-                key,
-                cls,
-                Attribute['type'])
-            if not isinstance(val, list):
-                raise TypeError(msg)
-            for item in val:
-                if not isinstance(item, Attribute['type']):
-                    raise TypeError(msg)
-        else:
-            msg = "Attribute '{}' of resource {} has to be of type '{}'".format(
-                key,
-                cls,
-                Attribute['type'])
-            if not isinstance(val, Attribute['type']):
-                raise TypeError(msg)
-
-        # Check all checks
-        if 'checks' in Attribute:
-            msg = "Illegal value '{}' for attribute '{}' of resource {}".format(
-                val,
-                key,
-                cls)
-            for value_check in Attribute['checks']:
-                if value_check(cls, val) is False:
-                    raise ValueError(msg)
+        validate(val)
 
     @classmethod
     def check_params(cls, **kwargs) -> None:
@@ -180,3 +382,67 @@ class BaseResource():
 
         for key, val in kwargs.items():
             cls.check_param(key, val)
+
+    @classmethod
+    def validate_many(
+            cls,
+            resources: List[Dict[str, Any]],
+            names: Optional[List[str]] = None) -> None:
+        """
+        Check attributes of multiple resources at once.
+
+        Every resource is given as a dict of attributes like they would be
+        given when adding the resource to the database (See
+        :func:`switchmng.database.add_switch` etc.). All required attributes
+        have to be given and all given attributes have to be valid (See
+        :meth:`check_param`). Attributes referencing other resources are
+        only checked for presence because they are given as resource
+        identifiers or nested dicts and resolved by the database functions.
+
+        Can be used to check a whole batch of resources before adding any
+        of them.
+
+        :param resources: List of dicts of attributes
+
+        :param names: Names of the resources used in error messages or None
+            to name resources by their position
+
+        :raises TypeError: When type of a given parameter does not match
+            expectation or a required attribute is missing
+        :raises ValueError: When value of a given parameter does not match
+            expectation
+
+        Error messages contain the name or position of the failing resource.
+        """
+
+        if not isinstance(resources, list):
+            raise TypeError('Given resources are not of type list')
+
+        required = [ key
+                     for key, attr in cls._Attributes.items()
+                     if not attr['optional'] ]
+        validators = { key: (None
+                             if issubclass(attr['type'], BaseResource)
+                             else cls._validators[key])
+                       for key, attr in cls._Attributes.items() }
+
+        for i, resource in enumerate(resources):
+            try:
+                if not isinstance(resource, dict):
+                    raise TypeError('Given resource is not of type dict')
+                for key in required:
+                    if key not in resource:
+                        raise TypeError("Missing attribute '{}' for resource {}".format(
+                            key,
+                            cls))
+                for key, val in resource.items():
+                    if key not in validators:
+                        raise TypeError("Unexpected attribute '{}' for resource '{}'".format(
+                            key,
+                            cls))
+                    validate = validators[key]
+                    if validate is not None:
+                        validate(val)
+            except (TypeError, ValueError) as e:
+                name = 'Resource {}'.format(i) if names is None else names[i]
+                raise type(e)('{}: {}'.format(name, e)) from e
@@ -0,0 +1,56 @@
+from sqlalchemy import Boolean, Integer, String
+from sqlalchemy import Column
+from sqlalchemy import Table
+
+from .base import Base
+
+changes = Table(
+    'changes',
+    Base.metadata,
+    Column(
+        'id',
+        Integer,
+        primary_key = True),
+
+    # Revision of the transaction that changed the resource
+    Column(
+        'revision',
+        Integer,
+        nullable = False,
+        index = True),
+
+    # Name of the table of the resource (e.g. 'switches')
+    Column(
+        'resource',
+        String,
+        nullable = False),
+
+    # Database id of the row of the resource
+    Column(
+        'row_id',
+        Integer,
+        nullable = False),
+
+    # Resource identifier of the resource and of the resource containing
+    # it (if any) at the time of the change
+    Column(
+        'resource_id',
+        String,
+        nullable = False),
+    Column(
+        'parent_resource_id',
+        String,
+        nullable = True),
+
+    # If the resource was deleted (or moved to another resource identifier)
+    Column(
+        'deleted',
+        Boolean,
+        nullable = False),
+)
+"""
+Append-only journal of changes to resources.
+
+Every transaction changing resources adds an entry for every resource it
+created, changed or deleted (See :mod:`switchmng.database.tracking`).
+"""
@@ -47,6 +47,11 @@ class NetworkProtocol(BaseResource, Base):
     # Database id
     _network_protocol_id = Column('id', Integer, primary_key = True, nullable = False)
 
+    # Revision of last change to this resource or any resource it contains
+    # or references (See :mod:`switchmng.database.tracking`)
+    _revision = Column('revision', Integer, nullable = False,
+                       default = 0, server_default = '0')
+
     # Resource identifier
     _name = Column('name', String, nullable = False, unique = True)
 
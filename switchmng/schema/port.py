@@ -2,7 +2,8 @@ from typing import Any
 from typing import Dict
 
 from sqlalchemy import Integer, String
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
+from sqlalchemy import text
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -22,6 +23,10 @@ vlans_ports_mapping = Table(
         Integer,
         ForeignKey('vlans.id'),
         primary_key = True),
+
+    # Reverse index for looking up ports by vlan.
+    # (The primary key only covers lookups by port)
+    Index('ix_vlan_ports_vlan_id', 'vlan_id'),
 )
 
 class Port(BaseResource, Base):
@@ -58,7 +63,6 @@ class Port(BaseResource, Base):
             'type':     Vlan,
             'list':     True,
             'private':  '_vlans',
-            'jsonify':  lambda vs: [ int(str(v)) for v in vs ],
             'optional': True,
             'null':     [],
         },
@@ -73,12 +77,28 @@ class Port(BaseResource, Base):
     }
 
     __tablename__ = 'ports'
+    __table_args__ = (
+        # Ports are looked up by switch and name.
+        # Port names are unique per switch.
+        Index('ix_ports_switch_id_name', 'switch_id', 'name', unique = True),
+
+        # Ports are looked up by the host connected to them.
+        # (Exact and prefix lookups use the first index, case-insensitive
+        # lookups compare with the NOCASE collation of the second one)
+        Index('ix_ports_target', 'target'),
+        Index('ix_ports_target_nocase', text('target COLLATE NOCASE')),
+    )
 
     # Database id
     _port_id = Column('id', Integer, primary_key = True, nullable = False)
     _switch_id = Column('switch_id', Integer, ForeignKey('switches.id'),
                        nullable = False)
 
+    # Revision of last change to this resource or any resource it contains
+    # or references (See :mod:`switchmng.database.tracking`)
+    _revision = Column('revision', Integer, nullable = False,
+                       default = 0, server_default = '0')
+
     # Resource state
     _name = Column('name', String, nullable = False)
     _vlans = relationship('Vlan', secondary = vlans_ports_mapping, uselist = True)
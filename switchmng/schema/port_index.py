@@ -0,0 +1,73 @@
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import NEVER_SET
+from sqlalchemy.orm.attributes import NO_VALUE
+
+_generation = 0
+"""Counter that gets increased whenever a tracked port gets renamed"""
+
+def lookup(obj, resource_id: str) -> Optional[Any]:
+    """
+    Return port of given object identified by resource identifier.
+
+    Ports are looked up in an index mapping port names to ports that is
+    kept in the given object. The index gets built on first use and is
+    dropped whenever the port collection of the object changes (See
+    :func:`track`).
+
+    :param obj: Object with port collection ``_ports``
+        (e.g. :class:`Switch` or :class:`SwitchModel`)
+
+    :param resource_id: Name of port to return
+    """
+
+    index = obj.__dict__.get('_port_index')
+    if index is None or index[0] != _generation:
+        ports: Dict[str, Any] = {}
+        for port in obj._ports:
+            # Like a linear search prefer the first port with a given name
+            ports.setdefault(port._name, port)
+        index = (_generation, ports)
+        obj.__dict__['_port_index'] = index
+
+    return index[1].get(resource_id)
+
+def invalidate(obj, *args) -> None:    #pylint: disable = unused-argument
+    """Drop port index of given object"""
+
+    obj.__dict__.pop('_port_index', None)
+
+def _expired(state, *args) -> None:    #pylint: disable = unused-argument
+    """Drop port index of object with given instance state"""
+
+    # Object might already be garbage collected
+    state.dict.pop('_port_index', None)
+
+def _renamed(target, value, oldvalue, initiator) -> None:    #pylint: disable = unused-argument
+    """Invalidate all port indexes when a port gets renamed"""
+
+    global _generation    #pylint: disable = global-statement
+    if oldvalue not in (NO_VALUE, NEVER_SET) and oldvalue != value:
+        _generation += 1
+
+def track(cls: type, port_cls: type) -> None:
+    """
+    Keep port indexes of all objects of given class up to date.
+
+    Indexes get dropped when ports are added to or removed from the port
+    collection and when the collection gets expired or refreshed from
+    the database. Renaming any port of given port class drops all indexes.
+
+    :param cls: Class with port collection ``_ports``
+
+    :param port_cls: Class of ports in port collection
+    """
+
+    event.listen(cls._ports, 'append', invalidate)
+    event.listen(cls._ports, 'remove', invalidate)
+    event.listen(cls, 'expire', _expired, raw = True)
+    event.listen(cls, 'refresh', _expired, raw = True)
+    event.listen(port_cls._name, 'set', _renamed, active_history = True)
@@ -2,7 +2,7 @@ from typing import Any
 from typing import Dict
 
 from sqlalchemy import Integer, String
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -23,6 +23,10 @@ network_protocols_port_models_mapping = Table(
         Integer,
         ForeignKey('network_protocols.id'),
         primary_key = True),
+
+    # Reverse index for looking up port models by network protocol.
+    # (The primary key only covers lookups by port model)
+    Index('ix_network_protocols_port_models_network_protocol_id', 'network_protocol_id'),
 )
 
 class PortModel(BaseResource, Base):
@@ -58,7 +62,6 @@ class PortModel(BaseResource, Base):
             'type':     NetworkProtocol,
             'list':     True,
             'private':  '_network_protocols',
-            'jsonify':  lambda ps: [ str(p) for p in ps ],
             'optional': True,
             'null':     [],
         },
@@ -66,13 +69,18 @@ class PortModel(BaseResource, Base):
             'type':     Connector,
             'list':     False,
             'private':  '_connector',
-            'jsonify':  lambda c: None if c is None else str(c),
             'optional': True,
             'null':     None,
         },
     }
 
     __tablename__ = 'port_models'
+    __table_args__ = (
+        # Port models are looked up by switch model and name.
+        # Port model names are unique per switch model.
+        Index('ix_port_models_switch_model_id_name', 'switch_model_id', 'name',
+              unique = True),
+    )
 
     # Database id
     _port_model_id = Column('id', Integer, primary_key = True, nullable = False)
@@ -81,6 +89,11 @@ class PortModel(BaseResource, Base):
     _connector_id = Column('connector_id', Integer,
                           ForeignKey('connectors.id'), nullable = True)
 
+    # Revision of last change to this resource or any resource it contains
+    # or references (See :mod:`switchmng.database.tracking`)
+    _revision = Column('revision', Integer, nullable = False,
+                       default = 0, server_default = '0')
+
     # Resource state
     _name = Column('name', String, nullable = False)
     _network_protocols = relationship(
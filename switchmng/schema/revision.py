@@ -0,0 +1,22 @@
+from sqlalchemy import Integer
+from sqlalchemy import Column
+from sqlalchemy import Table
+
+from .base import Base
+
+revision_counter = Table(
+    'revision_counter',
+    Base.metadata,
+    Column(
+        'id',
+        Integer,
+        primary_key = True),
+
+    # Revision of the last committed transaction changing any resource.
+    # Every transaction changing resources increases it by one.
+    Column(
+        'revision',
+        Integer,
+        nullable = False,
+        default = 0),
+)
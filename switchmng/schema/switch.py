@@ -8,10 +8,12 @@ from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy.orm import relationship
 
 from .base import Base
 from .base_resource import BaseResource
+from . import port_index
 from .switch_model import SwitchModel
 from .port import Port
 
@@ -61,7 +63,6 @@ class Switch(BaseResource, Base):
             'list':       False,
             'private':    '_model',
             'post_hooks': [ lambda obj: obj.sync_ports_from_model() ],
-            'jsonify':    str,
             'optional':   False,
         },
         'ports': {
@@ -69,7 +70,7 @@ class Switch(BaseResource, Base):
             'list':       True,
             'private':    '_ports',
             'post_hooks': [ lambda obj: obj.sync_ports_from_model() ],
-            'jsonify':    lambda ps: [ p.jsonify() for p in ps ],
+            'nested':     True,
             'optional':   True,
             'null':       [],
         },
@@ -92,18 +93,28 @@ class Switch(BaseResource, Base):
     }
 
     __tablename__ = 'switches'
+    __table_args__ = (
+        # Switches are looked up by switch model
+        Index('ix_switches_model_id', 'model_id'),
+    )
 
     # Database ids
     _switch_id = Column('id', Integer, primary_key = True, nullable = False)
     _model_id = Column('model_id', Integer, ForeignKey('switch_models.id'),
                       nullable = False)
 
+    # Revision of last change to this resource or any resource it contains
+    # or references (See :mod:`switchmng.database.tracking`)
+    _revision = Column('revision', Integer, nullable = False,
+                       default = 0, server_default = '0')
+
     # Resource identifier
     _name = Column('name', String, nullable = False, unique = True)
 
     # Resource state
     _model = relationship('SwitchModel', uselist = False)
-    _ports = relationship('Port', uselist = True, cascade = 'all, delete-orphan')
+    _ports = relationship('Port', uselist = True, cascade = 'all, delete-orphan',
+                          order_by = 'Port._port_id')
     _location = Column('location', Integer, nullable = True)
     _ip = Column('ip', String, nullable = True)
 
@@ -121,15 +132,22 @@ class Switch(BaseResource, Base):
         if self.model is None:
             return
 
+        model_names = { p._name for p in self.model._ports }
+        names = { p._name for p in self._ports }
+
         # Port list 1: Ports currently set that also exist in switch model
         nports1 = [ p
                     for p in self._ports
-                    if self.model.port(p.name) is not None ]
+                    if p._name in model_names ]
 
         # Port list 2: Ports from switch model that do not currently exist
-        nports2 = [ Port(name = p.name)
-                    for p in self.model.ports
-                    if self.port(p.name) is None ]
+        nports2 = [ Port(name = p._name)
+                    for p in self.model._ports
+                    if p._name not in names ]
+
+        # Do not touch port collection if nothing changed
+        if len(nports2) == 0 and len(nports1) == len(self._ports):
+            return
 
         # Set ports of this switch to concatenation of generated two lists
         self._ports = nports1 + nports2
@@ -149,10 +167,6 @@ class Switch(BaseResource, Base):
         if not isinstance(resource_id, str):
             return None
 
-        # Search for port with specified name
-        for port in self._ports:
-            if port.name == resource_id:
-                return port
+        return port_index.lookup(self, resource_id)
 
-        # Did not find port for given port name
-        return None
+port_index.track(Switch, Port)
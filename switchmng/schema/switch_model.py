@@ -9,6 +9,7 @@ from sqlalchemy.orm import relationship
 
 from .base import Base
 from .base_resource import BaseResource
+from . import port_index
 from .port_model import PortModel
 
 class SwitchModel(BaseResource, Base):
@@ -44,7 +45,7 @@ class SwitchModel(BaseResource, Base):
             'list':       True,
             'private':    '_ports',
             'post_hooks': [ lambda obj: obj.refresh_switches() ],
-            'jsonify':    lambda ps: [ p.jsonify() for p in ps ],
+            'nested':     True,
             'optional':   True,
             'null':       [],
         },
@@ -63,11 +64,17 @@ class SwitchModel(BaseResource, Base):
     # Database id
     _switch_model_id = Column('id', Integer, primary_key = True, nullable = False)
 
+    # Revision of last change to this resource or any resource it contains
+    # or references (See :mod:`switchmng.database.tracking`)
+    _revision = Column('revision', Integer, nullable = False,
+                       default = 0, server_default = '0')
+
     # Resource identifier
     _name = Column('name', String, nullable = False, unique = True)
 
     # Resource state
-    _ports = relationship('PortModel', uselist = True, cascade = 'all, delete-orphan')
+    _ports = relationship('PortModel', uselist = True, cascade = 'all, delete-orphan',
+                          order_by = 'PortModel._port_model_id')
     _size = Column('size', Integer, nullable = True)
 
     # Helper relationship to ensure that all switches that have
@@ -96,10 +103,6 @@ class SwitchModel(BaseResource, Base):
         if not isinstance(resource_id, str):
             return None
 
-        # Search for port with specified name
-        for port in self._ports:
-            if port.name == resource_id:
-                return port
+        return port_index.lookup(self, resource_id)
 
-        # Did not find port for given port name
-        return None
+port_index.track(SwitchModel, PortModel)
@@ -45,6 +45,11 @@ class Vlan(BaseResource, Base):
     # Database id
     _vlan_id = Column('id', Integer, primary_key = True, nullable = False)
 
+    # Revision of last change to this resource or any resource it contains
+    # or references (See :mod:`switchmng.database.tracking`)
+    _revision = Column('revision', Integer, nullable = False,
+                       default = 0, server_default = '0')
+
     # Resource identifier
     _tag = Column('tag', Integer, nullable = False, unique = True)
 
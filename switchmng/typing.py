@@ -4,6 +4,8 @@ from typing import List
 from typing import Tuple
 from typing import Union
 
+from flask import Response
+
 # Sadly mypy does not support recursive types (See mypy github issue #731)
 # Otherwise this would be the correct way:
 #
@@ -17,4 +19,4 @@ _JsonItem1 = Union[_JsonPrimitive, _JsonItem2, Dict[str, _JsonItem2], List[_Json
 JsonDict   = Dict[str, _JsonItem1]
 
 
-FlaskResponse = Tuple[JsonDict, int]
+FlaskResponse = Union[Tuple[JsonDict, int], Response]
@@ -0,0 +1,135 @@
+import json
+
+import unittest
+
+from switchmng.schema import *
+from switchmng import database
+from switchmng.database import helper
+
+from test_rest import Test_REST
+
+class Test_Database_Helper(Test_REST):
+    """Test class that converts resources from dicts to objects"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_vlans()
+        self.setUp_connectors()
+        self.setUp_network_protocols()
+        self.setUp_switch_models()
+
+        for tag in range(3, 21):
+            self._post('/vlans', 201, json.dumps({ 'tag': tag }))
+
+    def test_resolve_resources(self):
+        """Resolve multiple vlans at once"""
+
+        with self.record_statements() as statements:
+            vlans = helper.resolve_resources(self.session, Vlan, [ 1, 3, 1, 20 ], 'vlan')
+        self.assertEqual(sorted(vlans), [ 1, 3, 20 ])
+        self.assertEqual(str(vlans[3]), '3')
+        self.assertEqual(len(statements), 1)
+
+        self.assertEqual(helper.resolve_resources(self.session, Vlan, [], 'vlan'), {})
+
+    def test_resolve_resources_chunked(self):
+        """Resolve more vlans than fit into a single query"""
+
+        chunk_size = helper.RESOLVE_CHUNK_SIZE
+        helper.RESOLVE_CHUNK_SIZE = 7
+        try:
+            with self.record_statements() as statements:
+                vlans = helper.resolve_resources(self.session, Vlan, list(range(1, 21)), 'vlan')
+        finally:
+            helper.RESOLVE_CHUNK_SIZE = chunk_size
+        self.assertEqual(len(vlans), 20)
+        self.assertEqual(len(statements), 3)
+
+    def test_resolve_resources_fail(self):
+        """Resolve non-existing vlans"""
+
+        with self.assertRaises(ValueError) as cm:
+            helper.resolve_resources(self.session, Vlan, [ 1, 22, 21 ], 'vlan')
+        self.assertIn('21, 22', str(cm.exception))
+
+        with self.assertRaises(TypeError):
+            helper.resolve_resources(self.session, Vlan, [ 1, '2' ], 'vlan')
+
+    def test_ports_from_dict(self):
+        """Convert ports with many vlans with a single query"""
+
+        ports = [ { 'name': 'p{}'.format(i), 'vlans': list(range(1, 21)) }
+                  for i in range(48) ]
+        with self.record_statements() as statements:
+            ports = helper.ports_from_dict(self.session, ports)
+
+        self.assertEqual(len(ports), 48)
+        self.assertEqual([ int(str(v)) for v in ports[47].vlans ], list(range(1, 21)))
+        self.assertEqual(len(statements), 1)
+
+    def test_port_models_from_dict(self):
+        """Convert port models with one query per referenced resource type"""
+
+        ports = [
+            { 'name': 'p1', 'network_protocols': [ 'proto1', 'proto2' ], 'connector': 'rj45' },
+            { 'name': 'p2', 'network_protocols': [ 'proto2' ], 'connector': 'rj11' },
+            { 'name': 'p3', 'connector': None },
+            { 'name': 'p4' },
+        ]
+        with self.record_statements() as statements:
+            ports = helper.port_models_from_dict(self.session, ports)
+            self.assertEqual([ str(p.connector) for p in ports ], [ 'rj45', 'rj11', 'None', 'None' ])
+            self.assertEqual([ str(p) for p in ports[0].network_protocols ], [ 'proto1', 'proto2' ])
+        self.assertEqual(len(statements), 2)
+
+    def test_port_models_from_dict_fail(self):
+        """Convert port models referencing non-existing resources"""
+
+        ports = [
+            { 'name': 'p1', 'network_protocols': [ 'proto1', 'proto4' ] },
+            { 'name': 'p2', 'network_protocols': [ 'proto3' ] },
+        ]
+        with self.assertRaises(ValueError) as cm:
+            helper.port_models_from_dict(self.session, ports)
+        self.assertIn('proto3, proto4', str(cm.exception))
+
+    def test_put_switch(self):
+        """PUT switch with non-existing vlans"""
+
+        switch = {
+            'name':  'switch',
+            'model': 'big_switch',
+            'ports': [ { 'name': 'p1', 'vlans': [ 1, 30 ] },
+                       { 'name': 'p2', 'vlans': [ 31 ] } ],
+        }
+        rv = self._put('/switches/switch', 400, json.dumps(switch))
+        self.assertIn('30, 31', rv['message'])
+
+        self.assertIsNone(database.query_switch(self.session, 'switch'))
+
+    def test_unit_of_work(self):
+        """Change multiple resources in a single unit of work"""
+
+        db = self.app.config['SWITCHMNG_DB_CONNECTION']
+        with self.record_commits() as commits:
+            with db.transaction() as session:
+                database.add_vlan(session, tag = 21)
+                database.modify_vlan(session, 21, description = 'vlan21')
+                database.delete_vlan(session, 20)
+                self.assertEqual(len(commits), 0)
+            self.assertEqual(len(commits), 1)
+
+            with self.assertRaises(ValueError):
+                with db.transaction() as session:
+                    database.add_vlan(session, tag = 22)
+                    database.add_vlan(session, tag = 21)
+            self.assertEqual(len(commits), 1)
+
+        self.assertEqual(database.query_vlan(self.session, 21).description, 'vlan21')
+        self.assertIsNone(database.query_vlan(self.session, 20))
+        self.assertIsNone(database.query_vlan(self.session, 22))
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+
+import unittest
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from switchmng.schema import *
+from switchmng import database
+from switchmng.database import DatabaseConnection
+
+from test_rest import Test_REST
+
+class Test_Database_Index(Test_REST):
+    """Test class that checks that lookups are answered using indexes"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+        self.engine = self.app.config['SWITCHMNG_DB_CONNECTION'].engine
+
+    def _plan(self, statement):
+        """Return query plan of given statement as a single string"""
+
+        if not isinstance(statement, str):
+            statement = str(statement.compile(
+                self.engine,
+                compile_kwargs = { 'literal_binds': True }))
+
+        rows = self.engine.execute('EXPLAIN QUERY PLAN ' + statement)
+        return '\n'.join(row[-1] for row in rows)
+
+    def test_port(self):
+        """Look up port by switch and name using index"""
+
+        plan = self._plan("SELECT * FROM ports WHERE switch_id = 1 AND name = 'p1'")
+        self.assertIn('ix_ports_switch_id_name', plan)
+
+    def test_port_model(self):
+        """Look up port model by switch model and name using index"""
+
+        plan = self._plan(
+            "SELECT * FROM port_models WHERE switch_model_id = 1 AND name = 'p1'")
+        self.assertIn('ix_port_models_switch_model_id_name', plan)
+
+    def test_switches_by_model(self):
+        """Look up switches by switch model using index"""
+
+        switches = self.session.query(Switch).filter_by(_model_id = 1)
+        self.assertIn('ix_switches_model_id', self._plan(switches.statement))
+
+    def test_ports_by_vlan(self):
+        """Look up switches by vlan using reverse index"""
+
+        ids = database.query._switch_ids_with_vlans(self.session, { 1 }, 'any')
+        self.assertIn('ix_vlan_ports_vlan_id', self._plan(ids.select()))
+
+    def test_ports_carrying_vlan(self):
+        """Look up and count ports carrying a vlan using reverse index"""
+
+        plan = self._plan(
+            'SELECT switches.name, ports.name, ports.target FROM vlan_ports '
+            'JOIN ports ON ports.id = vlan_ports.port_id '
+            'JOIN switches ON switches.id = ports.switch_id '
+            'WHERE vlan_ports.vlan_id = 1 ORDER BY switches.name, ports.name')
+        self.assertIn('ix_vlan_ports_vlan_id', plan)
+
+        plan = self._plan(
+            'SELECT count(*), count(DISTINCT ports.switch_id) FROM vlan_ports '
+            'JOIN ports ON ports.id = vlan_ports.port_id '
+            'WHERE vlan_ports.vlan_id = 1')
+        self.assertIn('ix_vlan_ports_vlan_id', plan)
+
+    def test_ports_by_target(self):
+        """Look up ports by exact, prefix and case-insensitive target using indexes"""
+
+        def plan(*args):
+            condition = database.query._target_condition(*args)
+            return self._plan(select([ Port._port_id ]).where(condition))
+
+        self.assertIn('ix_ports_target (target=?)', plan('Mars', 'exact', False))
+        self.assertIn('ix_ports_target (target>? AND target<?)', plan('Ma', 'prefix', False))
+        self.assertIn('ix_ports_target_nocase (target=?)', plan('mars', 'exact', True))
+        self.assertIn('ix_ports_target_nocase (target>? AND target<?)', plan('MA', 'prefix', True))
+
+    def test_port_models_by_network_protocol(self):
+        """Look up switch models by network protocol using reverse index"""
+
+        ids = database.query._switch_model_ids_with_protocols(
+            self.session,
+            NetworkProtocol._name == 'proto1')
+        self.assertIn(
+            'ix_network_protocols_port_models_network_protocol_id',
+            self._plan(ids.select()))
+
+    def test_unique(self):
+        """Add ports with duplicate names"""
+
+        with self.assertRaises(IntegrityError):
+            self.engine.execute(
+                "INSERT INTO ports (switch_id, name) VALUES (1, 'p1')")
+
+    def test_ports_order(self):
+        """Return ports in the order they were added instead of index order"""
+
+        names = [ str(i) for i in range(1, 13) ]
+        self._post('/switch_models', 201, json.dumps({
+            'name': 'numbered', 'ports': [ { 'name': name } for name in names ] }))
+        self._post('/switches', 201, json.dumps({ 'name': 'numbered', 'model': 'numbered' }))
+
+        # Expire loaded ports so that they are loaded from database again
+        self.session.expire_all()
+
+        sm = database.query_switch_model(self.session, 'numbered')
+        self.assertEqual([ pm.name for pm in sm.ports ], names)
+        sw = database.query_switch(self.session, 'numbered')
+        self.assertEqual([ pt.name for pt in sw.ports ], names)
+
+        for url in ('/switch_models/numbered', '/switches/numbered'):
+            rv = self._get(url, 200)
+            self.assertEqual([ p['name'] for p in rv['data']['ports'] ], names)
+        for url in ('/switch_models/numbered/ports', '/switches/numbered/ports'):
+            rv = self._get(url, 200)
+            self.assertEqual([ p['name'] for p in rv['data'] ], names)
+
+class Test_Database_Index_Upgrade(unittest.TestCase):
+    """Test class that adds missing indexes to existing database"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix = '.db')
+        os.close(fd)
+
+        # Create database and remove indexes again
+        db = DatabaseConnection('sqlite', self.path, False, Base)
+        db.engine.execute('DROP INDEX ix_ports_switch_id_name')
+        db.engine.execute('DROP INDEX ix_switches_model_id')
+        db.engine.dispose()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _indexes(self, db):
+        rows = db.engine.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        return { name for name, in rows }
+
+    def test_upgrade(self):
+        """Open existing database without indexes"""
+
+        db = DatabaseConnection('sqlite', self.path, False, Base)
+        self.assertIn('ix_ports_switch_id_name', self._indexes(db))
+        self.assertIn('ix_switches_model_id', self._indexes(db))
+        db.engine.dispose()
+
+    def test_upgrade_fail(self):
+        """Open existing database with duplicate ports"""
+
+        db = DatabaseConnection('sqlite', self.path, False, Base)
+        db.engine.execute('DROP INDEX ix_ports_switch_id_name')
+        db.engine.execute("INSERT INTO ports (switch_id, name) VALUES (1, 'p1')")
+        db.engine.execute("INSERT INTO ports (switch_id, name) VALUES (1, 'p1')")
+        db.engine.dispose()
+
+        with self.assertRaises(ValueError):
+            DatabaseConnection('sqlite', self.path, False, Base)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -0,0 +1,229 @@
+import json
+
+import unittest
+
+from switchmng import database
+
+from test_rest import Test_REST
+
+class Test_Database_Query(Test_REST):
+    """Test class that queries multiple resources directly from database"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _names(self, resources):
+        return sorted([ str(r) for r in resources ])
+
+    def test_query_switches(self):
+        """Query switches without filter"""
+
+        switches = database.query_switches(self.session)
+        self.assertEqual(self._names(switches), [ 'switch1', 'switch2' ])
+
+    def test_query_switches_location(self):
+        """Query switches by location"""
+
+        switches = database.query_switches(self.session, location = 5)
+        self.assertEqual(self._names(switches), [ 'switch2' ])
+
+    def test_query_switches_model(self):
+        """Query switches by switch model"""
+
+        switches = database.query_switches(self.session, model = 'small_switch')
+        self.assertEqual(self._names(switches), [ 'switch1' ])
+
+        with self.assertRaises(ValueError):
+            database.query_switches(self.session, model = 'non-existing')
+
+    def test_query_switches_vlan(self):
+        """Query switches by single vlan"""
+
+        switches = database.query_switches(self.session, vlan = 1)
+        self.assertEqual(self._names(switches), [ 'switch1', 'switch2' ])
+
+        switches = database.query_switches(self.session, vlan = 2)
+        self.assertEqual(self._names(switches), [ 'switch2' ])
+
+        switches = database.query_switches(self.session, vlan = 3)
+        self.assertEqual(self._names(switches), [])
+
+    def test_query_switches_vlans_any(self):
+        """Query switches carrying any of multiple vlans"""
+
+        switches = database.query_switches(self.session, vlans = [ 2, 3 ])
+        self.assertEqual(self._names(switches), [ 'switch2' ])
+
+        switches = database.query_switches(
+            self.session, vlans = [ 1, 2 ], vlans_match = 'any')
+        self.assertEqual(self._names(switches), [ 'switch1', 'switch2' ])
+
+    def test_query_switches_vlans_all(self):
+        """Query switches carrying all of multiple vlans"""
+
+        switches = database.query_switches(
+            self.session, vlans = [ 1, 2 ], vlans_match = 'all')
+        self.assertEqual(self._names(switches), [ 'switch2' ])
+
+        switches = database.query_switches(
+            self.session, vlans = [ 1, 3 ], vlans_match = 'all')
+        self.assertEqual(self._names(switches), [])
+
+    def test_query_switches_combined(self):
+        """Query switches with multiple filters"""
+
+        switches = database.query_switches(
+            self.session, vlan = 1, model = 'big_switch')
+        self.assertEqual(self._names(switches), [ 'switch2' ])
+
+        switches = database.query_switches(
+            self.session, vlan = 1, location = 12)
+        self.assertEqual(self._names(switches), [ 'switch1' ])
+
+    def test_query_switches_fail(self):
+        """Query switches with invalid filters"""
+
+        with self.assertRaises(TypeError):
+            database.query_switches(self.session, vlan = '1')
+        with self.assertRaises(TypeError):
+            database.query_switches(self.session, vlans = 1)
+        with self.assertRaises(TypeError):
+            database.query_switches(self.session, non_existing = 1)
+        with self.assertRaises(ValueError):
+            database.query_switches(self.session, vlans = [ 1 ], vlans_match = 'some')
+
+    def test_query_switch_models_network_protocol(self):
+        """Query switch models by network protocols"""
+
+        self._post('/switch_models', 201, json.dumps({
+            'name':  'slow_switch',
+            'ports': [ { 'name': 'p1', 'network_protocols': [ 'proto1' ] } ],
+        }))
+
+        models = database.query_switch_models(self.session, network_protocol = 'proto2')
+        self.assertEqual(self._names(models), [ 'big_switch', 'small_switch' ])
+
+        models = database.query_switch_models(
+            self.session, network_protocols = [ 'proto1', 'proto2' ])
+        self.assertEqual(
+            self._names(models),
+            [ 'big_switch', 'slow_switch', 'small_switch' ])
+
+        models = database.query_switch_models(
+            self.session,
+            network_protocols = [ 'proto1', 'proto2' ],
+            network_protocols_match = 'all')
+        self.assertEqual(self._names(models), [ 'big_switch', 'small_switch' ])
+
+        with self.assertRaises(ValueError):
+            database.query_switch_models(self.session, network_protocol = 'proto3')
+
+    def test_query_switch_models_min_speed(self):
+        """Query switch models by minimum speed of network protocols"""
+
+        models = database.query_switch_models(self.session, min_speed = 200)
+        self.assertEqual(self._names(models), [ 'big_switch', 'small_switch' ])
+
+        models = database.query_switch_models(self.session, min_speed = 200, size = 1)
+        self.assertEqual(self._names(models), [ 'small_switch' ])
+
+        models = database.query_switch_models(self.session, min_speed = 201)
+        self.assertEqual(self._names(models), [])
+
+    def test_query_switches_page(self):
+        """Query switches page by page"""
+
+        page1 = database.query_switches(self.session, limit = 1)
+        self.assertEqual(self._names(page1), [ 'switch1' ])
+
+        page2 = database.query_switches(self.session, limit = 1, after = 'switch1')
+        self.assertEqual(self._names(page2), [ 'switch2' ])
+
+        page3 = database.query_switches(self.session, limit = 1, after = 'switch2')
+        self.assertEqual(page3, [])
+
+        with self.assertRaises(TypeError):
+            database.query_switches(self.session, after = 1)
+        with self.assertRaises(ValueError):
+            database.query_switches(self.session, limit = -1)
+
+    def test_query_ports_page(self):
+        """Query ports of all switches page by page"""
+
+        complete = database.query_ports(self.session, None)
+        self.assertEqual(len(complete), 5)
+
+        page = database.query_ports(self.session, None, after = ('switch1', 'p1'))
+        self.assertEqual(len(page), 4)
+        # Ports are ordered like they were added to their switch
+        # (p2 was added from the switch model after the given ports)
+        page = database.query_ports(self.session, None, after = ('switch2', 'p1'))
+        self.assertEqual([ p.name for p in page ], [ 'p3', 'p4', 'p2' ])
+
+        page = database.query_ports(self.session, 'switch2', limit = 2, after = 'p1')
+        self.assertEqual([ p.name for p in page ], [ 'p3', 'p4' ])
+
+        with self.assertRaises(TypeError):
+            database.query_ports(self.session, None, after = 'p1')
+        with self.assertRaises(KeyError):
+            database.query_ports(self.session, 'switch2', after = 'p5')
+
+    def test_query_page_filtered(self):
+        """Query filtered ports and port models page by page"""
+
+        vlan = database.query_vlan(self.session, 2)
+        page = database.query_ports(self.session, None, limit = 1, vlans = [ vlan ])
+        self.assertEqual([ p.name for p in page ], [ 'p1' ])
+        page = database.query_ports(
+            self.session, 'switch2', limit = 1, after = 'p1', vlans = [ vlan ])
+        self.assertEqual([ p.name for p in page ], [ 'p4' ])
+
+        connector = database.query_connector(self.session, 'rj45')
+        page = database.query_port_models(
+            self.session, None, limit = 2, after = ('big_switch', 'p1'), connector = connector)
+        self.assertEqual([ p.name for p in page ], [ 'p2', 'p3' ])
+        page = database.query_port_models(
+            self.session, 'small_switch', limit = 1, connector = connector)
+        self.assertEqual(page, [])
+
+    def test_query_port(self):
+        """Query single port of switch"""
+
+        pt = database.query_port(self.session, 'switch2', 'p3')
+        self.assertEqual(pt.target, 'Jupiter')
+
+        pt = database.query_port(self.session, 'switch2', 'p1', profile = 'port')
+        self.assertEqual([ str(v) for v in pt.vlans ], [ '1', '2' ])
+
+        self.assertIsNone(database.query_port(self.session, 'switch1', 'p3'))
+        self.assertIsNone(database.query_port(self.session, 'switch1', 1))
+        with self.assertRaises(ValueError):
+            database.query_port(self.session, 'non-existing', 'p1')
+
+    def test_query_port_model(self):
+        """Query single port model of switch model"""
+
+        pm = database.query_port_model(self.session, 'big_switch', 'p4')
+        self.assertEqual(str(pm), 'p4')
+
+        self.assertIsNone(database.query_port_model(self.session, 'small_switch', 'p4'))
+        with self.assertRaises(ValueError):
+            database.query_port_model(self.session, 'non-existing', 'p1')
+
+    def test_query_lookup_cached(self):
+        """Query single resources of different types repeatedly"""
+
+        for _ in range(2):
+            self.assertEqual(str(database.query_switch(self.session, 'switch1')), 'switch1')
+            self.assertEqual(
+                str(database.query_switch(self.session, 'switch2', profile = 'switch')),
+                'switch2')
+            self.assertEqual(str(database.query_vlan(self.session, 2)), '2')
+            self.assertEqual(str(database.query_connector(self.session, 'rj11')), 'rj11')
+            self.assertIsNone(database.query_connector(self.session, 'switch1'))
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
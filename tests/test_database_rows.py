@@ -0,0 +1,120 @@
+import unittest
+
+from switchmng.schema import *
+from switchmng import database
+
+from test_rest import Test_REST
+
+class Test_Database_Rows(Test_REST):
+    """Test class that reads resources as rows without creating objects"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _normalized(self, switches):
+        """Order vlans of ports of given switches"""
+
+        for sw in switches:
+            if 'ports' in sw:
+                for pt in sw['ports']:
+                    if 'vlans' in pt:
+                        pt['vlans'].sort()
+        return switches
+
+    def test_read_switches(self):
+        """Read switches like they are returned by jsonify()"""
+
+        expected = [ sw.jsonify() for sw in database.query_switches(self.session) ]
+        with self.record_statements() as statements:
+            switches = database.read_switches(self.session)
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(self._normalized(switches), self._normalized(expected))
+
+    def test_read_switches_ports_order(self):
+        """Read ports of switches in the same order as jsonify()"""
+
+        names = [ str(i) for i in range(1, 13) ]
+        database.add_switch_model(
+            self.session,
+            name = 'numbered',
+            ports = [ { 'name': name } for name in names ])
+        database.add_switch(self.session, name = 'numbered', model = 'numbered')
+        self.session.expire_all()
+
+        expected = [ sw.jsonify() for sw in database.query_switches(self.session) ]
+        switches = database.read_switches(self.session)
+        self.assertEqual(self._normalized(switches), self._normalized(expected))
+        numbered = next(sw for sw in switches if sw['name'] == 'numbered')
+        self.assertEqual([ pt['name'] for pt in numbered['ports'] ], names)
+
+    def test_read_switches_fields(self):
+        """Read selection of attributes of switches"""
+
+        fields = Switch.parse_fields([ 'name', 'ports.name' ])
+        expected = [ sw.jsonify(fields) for sw in database.query_switches(self.session) ]
+        with self.record_statements() as statements:
+            switches = database.read_switches(self.session, fields = fields)
+        self.assertEqual(self._normalized(switches), self._normalized(expected))
+        self.assertEqual(len(statements), 2)
+
+        # Ports are not read if they are not selected
+        expected = [ { 'ip': sw.ip } for sw in database.query_switches(self.session) ]
+        with self.record_statements() as statements:
+            switches = database.read_switches(self.session, fields = { 'ip': None })
+        self.assertEqual(switches, expected)
+        self.assertEqual(len(statements), 1)
+
+    def test_read_switches_paginated(self):
+        """Read switches page by page in batches"""
+
+        names = [ sw.name for sw in database.query_switches(self.session) ]
+
+        with self.record_statements() as statements:
+            switches = database.read_switches(self.session, batch_size = 1)
+            self.assertEqual(len(statements), 0)
+            self.assertEqual([ sw['name'] for sw in switches ], names)
+        self.assertEqual(len(statements), 3 * len(names) + 1)
+
+        switches = database.read_switches(self.session, limit = 1, after = names[0])
+        self.assertEqual([ sw['name'] for sw in switches ], names[1:2])
+
+        with self.assertRaises(TypeError):
+            database.read_switches(self.session, after = 1)
+        with self.assertRaises(ValueError):
+            database.read_switches(self.session, batch_size = 0)
+
+    def test_read_ports(self):
+        """Read ports of switch like they are returned by jsonify()"""
+
+        for sw in database.query_switches(self.session):
+            expected = [ pt.jsonify() for pt in sorted(sw.ports, key = lambda p: p._port_id) ]
+            with self.record_statements() as statements:
+                ports = database.read_ports(self.session, sw.name)
+            self.assertEqual(len(statements), 3)
+            for pt in ports:
+                pt['vlans'].sort()
+            for pt in expected:
+                pt['vlans'].sort()
+            self.assertEqual(ports, expected)
+
+        with self.assertRaises(ValueError):
+            database.read_ports(self.session, 'non_existent')
+
+    def test_read_vlans(self):
+        """Read vlans like they are returned by jsonify()"""
+
+        expected = [ vl.jsonify() for vl in database.query_vlans(self.session) ]
+        with self.record_statements() as statements:
+            vlans = database.read_vlans(self.session)
+        self.assertEqual(vlans, expected)
+        self.assertEqual(len(statements), 1)
+
+        tags = [ vl['tag'] for vl in expected ]
+        vlans = database.read_vlans(self.session, limit = 2, after = tags[0], batch_size = 1)
+        self.assertEqual(list(vlans), expected[1:3])
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -1,4 +1,6 @@
 import os
+import json
+import tempfile
 import unittest
 
 from switchmng.schema import Base
@@ -108,5 +110,23 @@ class Test_Importer(unittest.TestCase):
         connectors = database.query_connectors(self.db.Session())
         self.assertTrue(len(connectors) > 0)
 
+    def test_import_invalid_dir(self):
+        """Import directory containing an invalid resource"""
+
+        with tempfile.TemporaryDirectory() as top_dir:
+            res_dir = os.path.join(top_dir, 'vlans')
+            os.mkdir(res_dir)
+            for name, vlan in (('a.json', { 'tag': 1 }),
+                               ('b.json', { 'tag': 'two' }),
+                               ('c.json', { 'tag': 3 })):
+                with open(os.path.join(res_dir, name), 'w') as f:
+                    json.dump(vlan, f)
+
+            # No resource is imported if any of them is invalid
+            with self.assertRaises(TypeError) as cm:
+                import_from_path(self.db, res_dir, None)
+            self.assertIn('b.json', str(cm.exception))
+            self.assertEqual(database.query_vlans(self.db.Session()), [])
+
 if __name__ == '__main__':
     unittest.main(buffer = True)
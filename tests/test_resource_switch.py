@@ -0,0 +1,190 @@
+import unittest
+
+from switchmng.schema import *
+
+class Test_Resource_Switch(unittest.TestCase):
+    """Test class that access switch class directly"""
+
+    def setUp(self):
+        self.model = SwitchModel(
+            name = 'model',
+            ports = [ PortModel(name = 'p{}'.format(i)) for i in range(1, 5) ])
+
+    def _names(self, resource):
+        return [ p.name for p in resource.ports ]
+
+    def test_sync_ports(self):
+        """Create switch with ports synchronized from switch model"""
+
+        sw = Switch(name = 'switch', model = self.model)
+        self.assertEqual(self._names(sw), [ 'p1', 'p2', 'p3', 'p4' ])
+
+        # Ports not in switch model get removed, missing ports get added
+        sw.ports = [ Port(name = 'p2'), Port(name = 'p5') ]
+        self.assertEqual(self._names(sw), [ 'p2', 'p1', 'p3', 'p4' ])
+
+    def test_sync_ports_keep(self):
+        """Synchronize ports without replacing existing ports"""
+
+        sw = Switch(name = 'switch', model = self.model)
+        ports = list(sw.ports)
+        sw.sync_ports_from_model()
+        for old, new in zip(ports, sw.ports):
+            self.assertIs(old, new)
+
+    def test_port(self):
+        """Look up ports of switch by name"""
+
+        sw = Switch(name = 'switch', model = self.model)
+        for name in ('p1', 'p2', 'p3', 'p4'):
+            self.assertEqual(sw.port(name).name, name)
+            self.assertEqual(self.model.port(name).name, name)
+        self.assertIsNone(sw.port('p5'))
+        self.assertIsNone(sw.port(1))
+
+    def test_port_changed(self):
+        """Look up ports of switch after changing ports"""
+
+        sw = Switch(name = 'switch', model = self.model)
+        self.assertIsNone(self.model.port('p5'))
+        self.assertIsNone(sw.port('p5'))
+
+        # Add port
+        self.model.ports = self.model.ports + [ PortModel(name = 'p5') ]
+        self.assertEqual(self.model.port('p5').name, 'p5')
+        sw.ports = sw.ports + [ Port(name = 'p5') ]
+        self.assertEqual(sw.port('p5').name, 'p5')
+
+        # Remove port
+        self.model.ports = [ p for p in self.model.ports if p.name != 'p1' ]
+        self.assertIsNone(self.model.port('p1'))
+        sw.sync_ports_from_model()
+        self.assertIsNone(sw.port('p1'))
+
+        # Append to collection directly
+        self.model._ports.append(PortModel(name = 'p6'))
+        self.assertEqual(self.model.port('p6').name, 'p6')
+
+    def test_port_renamed(self):
+        """Look up port of switch after renaming it"""
+
+        self.assertIsNotNone(self.model.port('p1'))
+        self.model.port('p1').name = 'p9'
+        self.assertIsNone(self.model.port('p1'))
+        self.assertEqual(self.model.port('p9').name, 'p9')
+
+    def test_attributes(self):
+        """Access resource attributes of switch through descriptors"""
+
+        sw = Switch(name = 'switch', model = self.model, location = 3)
+        self.assertIsInstance(Switch.__dict__['location'], property)
+        self.assertEqual(sw.location, 3)
+        self.assertEqual(sw._location, 3)
+
+        # Setting resource attribute checks value
+        with self.assertRaises(ValueError):
+            sw.location = -1
+        with self.assertRaises(TypeError):
+            sw.location = 'rack'
+        self.assertEqual(sw.location, 3)
+
+        # Setting resource attribute runs post hooks
+        sw.ports = []
+        self.assertEqual(self._names(sw), [ 'p1', 'p2', 'p3', 'p4' ])
+
+    def test_check_params(self):
+        """Check attributes of switch with compiled validators"""
+
+        Switch.check_params(name = 'switch', location = None, ip = '10.0.0.1')
+        Port.check_params(name = 'p1', vlans = [ Vlan(tag = 1), Vlan(tag = 2) ])
+
+        with self.assertRaises(TypeError):
+            Switch.check_params(size = 3)
+        with self.assertRaises(TypeError):
+            Switch.check_params(name = None)
+        with self.assertRaises(ValueError):
+            Switch.check_params(ip = '10.0.0.256')
+        with self.assertRaises(TypeError):
+            Port.check_params(vlans = [ Vlan(tag = 1), 2 ])
+        with self.assertRaises(TypeError):
+            Port.check_params(vlans = ( Vlan(tag = 1), ))
+
+    def test_validate_many(self):
+        """Check attributes of multiple switches at once"""
+
+        Switch.validate_many([])
+        Switch.validate_many([
+            { 'name': 'sw{}'.format(i), 'model': self.model, 'location': i }
+            for i in range(100) ])
+
+        with self.assertRaises(TypeError) as cm:
+            Switch.validate_many([
+                { 'name': 'sw1', 'model': self.model },
+                { 'model': self.model } ])
+        self.assertIn('Resource 1', str(cm.exception))
+        self.assertIn('name', str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            Switch.validate_many([
+                { 'name': 'sw1', 'model': self.model },
+                { 'name': 'sw2', 'model': self.model, 'location': -1 } ])
+        self.assertIn('Resource 1', str(cm.exception))
+
+        # Referenced resources can be given by their identifiers
+        Switch.validate_many([
+            { 'name': 'sw1', 'model': 'model1', 'ports': [ { 'name': 'p1', 'vlans': [ 1 ] } ] } ])
+
+        with self.assertRaises(ValueError) as cm:
+            Switch.validate_many(
+                [ { 'name': 'sw1', 'model': 'model1', 'ip': '10.0.0.256' } ],
+                names = [ 'sw1.json' ])
+        self.assertIn('sw1.json', str(cm.exception))
+
+        with self.assertRaises(TypeError):
+            Switch.validate_many([ 'sw1' ])
+        with self.assertRaises(TypeError):
+            Switch.validate_many({ 'name': 'sw1' })
+
+    def test_jsonify(self):
+        """Represent switch as json-ready dict"""
+
+        sw = Switch(name = 'switch', model = self.model, location = 3)
+        sw.port('p2').vlans = [ Vlan(tag = 10), Vlan(tag = 2) ]
+        sw.port('p3').target = 'host'
+
+        ports = [
+            { 'name': 'p1', 'vlans': [],        'target': None },
+            { 'name': 'p2', 'vlans': [ 10, 2 ], 'target': None },
+            { 'name': 'p3', 'vlans': [],        'target': 'host' },
+            { 'name': 'p4', 'vlans': [],        'target': None },
+        ]
+        self.assertEqual(sw.jsonify(), {
+            'name': 'switch', 'model': 'model', 'ports': ports,
+            'location': 3, 'ip': None })
+        self.assertEqual(
+            sw.jsonify(Switch.parse_fields([ 'name', 'ports.vlans' ])),
+            { 'name': 'switch', 'ports': [ { 'vlans': p['vlans'] } for p in ports ] })
+
+        pm = PortModel(
+            name = 'p1',
+            network_protocols = [ NetworkProtocol(name = 'proto1') ],
+            connector = Connector(name = 'rj45'))
+        self.assertEqual(pm.jsonify(), {
+            'name': 'p1', 'network_protocols': [ 'proto1' ], 'connector': 'rj45' })
+
+    def test_jsonify_row(self):
+        """Represent switch given as row tuple as json-ready dict"""
+
+        row = ('switch', 'model', [ ('p1', [ 10, 2 ], None), ('p2', [], 'host') ], 3, None)
+        sw = Switch(name = 'switch', model = self.model, location = 3)
+        sw.ports = [ Port(name = 'p1', vlans = [ Vlan(tag = 10), Vlan(tag = 2) ]),
+                     Port(name = 'p2', target = 'host') ]
+        self.model.ports = [ PortModel(name = 'p1'), PortModel(name = 'p2') ]
+        sw.sync_ports_from_model()
+
+        self.assertEqual(Switch.jsonify_row(row), sw.jsonify())
+        fields = Switch.parse_fields([ 'ip', 'ports.name' ])
+        self.assertEqual(Switch.jsonify_row(row, fields), sw.jsonify(fields))
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
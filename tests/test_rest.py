@@ -2,6 +2,10 @@ import json
 
 import unittest
 
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
 from switchmng.schema import *
 
 from switchmng import config
@@ -43,6 +47,47 @@ class Test_REST(unittest.TestCase):
         self.app = routes.create_app(db)
         self.client = self.app.test_client()
 
+    @contextmanager
+    def record_statements(self, predicate = None):
+        """
+        Record SQL statements sent to the database inside the context.
+
+        Yields the list recorded statements are appended to.
+
+        :param predicate: Function returning if given statement is recorded.
+            If not given all statements are recorded.
+        """
+
+        statements = []
+        def record(conn, cursor, statement, *args):    #pylint: disable = unused-argument
+            if predicate is None or predicate(statement):
+                statements.append(statement)
+
+        engine = self.app.config['SWITCHMNG_DB_CONNECTION'].engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+    @contextmanager
+    def record_commits(self):
+        """
+        Record commits of database sessions inside the context.
+
+        Yields the list committed sessions are appended to.
+        """
+
+        commits = []
+        record = commits.append
+
+        sessionm = self.app.config['SWITCHMNG_DB_CONNECTION'].sessionm
+        event.listen(sessionm, 'after_commit', record)
+        try:
+            yield commits
+        finally:
+            event.remove(sessionm, 'after_commit', record)
+
     def _req(self, func, url, expected_code, data, headers, unpack):
         rv = func(
             url,
@@ -92,6 +137,15 @@ class Test_REST(unittest.TestCase):
             headers = default_headers
         return self._req(self.client.post, url, expected_code, data, headers, unpack)
 
+    def setUp_all(self):
+        """Helper function for extending setUp() adding all default values"""
+
+        self.setUp_vlans()
+        self.setUp_connectors()
+        self.setUp_network_protocols()
+        self.setUp_switch_models()
+        self.setUp_switches()
+
     def setUp_vlans(self):
         """Helper function for extending setUp()"""
 
@@ -0,0 +1,173 @@
+import json
+
+import unittest
+
+from switchmng import database
+
+from test_rest import Test_REST
+
+class Test_REST_Batch(Test_REST):
+    """Test class that runs multiple operations with POST /batch"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def test_batch(self):
+        """Run operations in a single transaction"""
+
+        operations = [
+            { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 3 } },
+            { 'method': 'PUT', 'path': '/switches/switch3', 'body': {
+                'model': 'small_switch',
+                'ports': [ { 'name': 'p1', 'vlans': [ 3 ] } ] } },
+            { 'method': 'PATCH', 'path': '/switches/switch1', 'body': { 'location': 3 } },
+            { 'method': 'DELETE', 'path': '/switches/switch2' },
+        ]
+        with self.record_commits() as commits:
+            rv = self._post('/batch', 200, json.dumps(operations))
+        self.assertEqual(len(commits), 1)
+
+        self.assertEqual([ result['status'] for result in rv['data'] ], [ 201, 200, 200, 200 ])
+        self.assertEqual(rv['data'][0]['data'], { 'tag': 3, 'description': None })
+        self.assertEqual(rv['data'][1]['data']['ports'][0]['vlans'], [ 3 ])
+
+        self.assertEqual(self._get('/switches/switch3', 200)['data']['model'], 'small_switch')
+        self.assertEqual(self._get('/switches/switch1', 200)['data']['location'], 3)
+        self._get('/switches/switch2', 404)
+
+    def test_rollback(self):
+        """Roll back all operations when one of them fails"""
+
+        operations = [
+            { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 3 } },
+            { 'method': 'PATCH', 'path': '/switches/switch1', 'body': { 'location': 3 } },
+            { 'method': 'PATCH', 'path': '/switches/switch1', 'body': { 'unknown': 3 } },
+            { 'method': 'DELETE', 'path': '/switches/switch2' },
+        ]
+        with self.record_commits() as commits:
+            rv = self._post('/batch', 400, json.dumps(operations))
+        self.assertEqual(len(commits), 0)
+        self.assertEqual([ result['status'] for result in rv['data'] ], [ 201, 200, 400 ])
+        self.assertIn('Operation 2', rv['message'])
+
+        self._get('/vlans/3', 404)
+        self.assertEqual(self._get('/switches/switch1', 200)['data']['location'], 12)
+        self._get('/switches/switch2', 200)
+
+        # Status of failed operation is returned
+        operations = [
+            { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 3 } },
+            { 'method': 'DELETE', 'path': '/switches/switch3' },
+        ]
+        rv = self._post('/batch', 404, json.dumps(operations))
+        self._get('/vlans/3', 404)
+
+        operations = [
+            { 'method': 'PATCH', 'path': '/switches/switch1', 'body': { 'location': 3 },
+              'headers': { 'If-Match': '"0"' } },
+        ]
+        self._post('/batch', 412, json.dumps(operations))
+
+    def test_invalid(self):
+        """Send invalid batches"""
+
+        invalid = [
+            { 'tag': 3 },
+            [ { 'method': 'GET', 'path': '/vlans' } ],
+            [ { 'method': 'POST', 'path': 'vlans', 'body': {} } ],
+            [ { 'method': 'POST', 'path': '/vlans' } ],
+            [ { 'method': 'POST', 'path': '/vlans', 'body': {}, 'other': 1 } ],
+            [ { 'method': 'DELETE', 'path': '/vlans/1', 'headers': [] } ],
+        ]
+        for operations in invalid:
+            self._post('/batch', 400, json.dumps(operations))
+
+        # Operations are checked before any of them is run
+        with self.record_commits() as commits:
+            rv = self._post('/batch', 404, json.dumps([
+                { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 3 } },
+                { 'method': 'POST', 'path': '/batch', 'body': {} } ]))
+            self.assertIn("Operation 1: No resource at path '/batch'", rv['message'])
+            rv = self._post('/batch', 405, json.dumps([ { 'method': 'DELETE', 'path': '/vlans' } ]))
+            self.assertIn('Operation 0', rv['message'])
+            self._post('/batch', 405, json.dumps([ { 'method': 'DELETE', 'path': '/switches/switch2/ports/p1' } ]))
+        self.assertEqual(len(commits), 0)
+        self._get('/vlans/3', 404)
+
+    def test_invalid_added(self):
+        """Check all added resources before running any operation"""
+
+        operations = [
+            { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 3 } },
+            { 'method': 'POST', 'path': '/switches', 'body': { 'name': 'switch3', 'model': 'big_switch' } },
+            { 'method': 'PATCH', 'path': '/vlans/3', 'body': { 'description': 'Three' } },
+            { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 'four' } },
+        ]
+        with self.record_statements(lambda statement: not statement.startswith('SELECT')) as writes:
+            rv = self._post('/batch', 400, json.dumps(operations))
+        self.assertIn("Operation 3: Attribute 'tag'", rv['message'])
+        self.assertEqual(writes, [])
+
+        rv = self._post('/batch', 400, json.dumps([
+            { 'method': 'POST', 'path': '/switches', 'body': { 'name': 'switch3', 'model': 'big_switch' } },
+            { 'method': 'POST', 'path': '/switches', 'body': { 'name': 'switch4' } } ]))
+        self.assertIn("Operation 1: Missing attribute 'model'", rv['message'])
+        self._get('/switches/switch3', 404)
+
+    def test_errors(self):
+        """Return errors of failed operations like single requests"""
+
+        operations = [ { 'method': 'PATCH', 'path': '/switches/switch1', 'body': { 'unknown': 3 } } ]
+        rv = self._post('/batch', 400, json.dumps(operations))
+        single = self._patch('/switches/switch1', 400, json.dumps({ 'unknown': 3 }))
+        self.assertEqual(rv['data'][0], single)
+        self.assertIn(single['message'], rv['message'])
+
+        operations = [ { 'method': 'PATCH', 'path': '/vlans/42', 'body': {} } ]
+        rv = self._post('/batch', 404, json.dumps(operations))
+        self.assertEqual(rv['data'][0], self._patch('/vlans/42', 404, json.dumps({})))
+
+        # Resources contained in non existing resources do not exist
+        operations = [ { 'method': 'DELETE', 'path': '/switch_models/nope/ports/p1' } ]
+        rv = self._post('/batch', 404, json.dumps(operations))
+        self.assertEqual(rv['data'][0], self._delete('/switch_models/nope/ports/p1', 404))
+        operations = [ { 'method': 'PATCH', 'path': '/switches/nope/ports/p1', 'body': {} } ]
+        rv = self._post('/batch', 404, json.dumps(operations))
+        self.assertEqual(rv['data'][0], self._patch('/switches/nope/ports/p1', 404, json.dumps({})))
+
+        # Preconditions are read from headers of operations
+        etag = self.client.get('/vlans/1', headers = self.default_headers).headers['ETag']
+        operations = [
+            { 'method': 'PATCH', 'path': '/vlans/1', 'body': { 'description': 'One' },
+              'headers': { 'if-match': etag } },
+            { 'method': 'PUT', 'path': '/vlans/2', 'body': { 'tag': 2 },
+              'headers': { 'If-Match': '"0"' } },
+        ]
+        rv = self._post('/batch', 412, json.dumps(operations))
+        self.assertEqual([ result['status'] for result in rv['data'] ], [ 200, 412 ])
+        self.assertNotEqual(self._get('/vlans/1', 200)['data']['description'], 'One')
+
+    def test_transaction(self):
+        """Run database functions in a single transaction"""
+
+        with self.record_commits() as commits:
+            with database.transaction(self.session):
+                database.add_vlan(self.session, tag = 3)
+                with database.transaction(self.session):
+                    database.modify_vlan(self.session, 3, description = 'Three')
+                self.assertEqual(len(commits), 0)
+            self.assertEqual(len(commits), 1)
+            self.assertEqual(database.query_vlan(self.session, 3).description, 'Three')
+
+            with self.assertRaises(ValueError):
+                with database.transaction(self.session):
+                    database.add_vlan(self.session, tag = 4)
+                    database.delete_vlan(self.session, 5)
+        self.assertEqual(len(commits), 1)
+        self.assertIsNone(database.query_vlan(self.session, 4))
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
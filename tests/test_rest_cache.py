@@ -0,0 +1,183 @@
+import json
+
+import unittest
+
+from switchmng import database
+from switchmng.database import DocumentCache
+
+from test_rest import Test_REST
+
+class Test_REST_Cache(Test_REST):
+    """Test class that serves single resources from the document cache"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _cached(self, url):
+        """Return if GET request on url is answered without statements"""
+
+        with self.record_statements() as statements:
+            self._get(url, 200)
+        return len(statements) == 0
+
+    def _warm(self, *urls):
+        for url in urls:
+            self._get(url, 200)
+            self.assertTrue(self._cached(url))
+
+    def test_cached(self):
+        """GET resources twice"""
+
+        urls = [
+            '/switches/switch1',
+            '/switches/switch2/ports/p1',
+            '/switch_models/big_switch',
+            '/switch_models/big_switch/ports/p1',
+            '/vlans/1',
+            '/connectors/rj45',
+            '/network_protocols/proto1',
+        ]
+        for url in urls:
+            first = self._get(url, 200)
+            with self.record_statements() as statements:
+                self.assertEqual(self._get(url, 200), first)
+            self.assertEqual(statements, [])
+
+        # Selections of attributes are never cached
+        self._get('/switches/switch1?fields=name', 200)
+        self.assertFalse(self._cached('/switches/switch1?fields=name'))
+
+    def test_invalidate_port(self):
+        """GET switch after changing one of its ports"""
+
+        self._warm('/switches/switch1', '/switches/switch2', '/switches/switch2/ports/p3')
+
+        self._patch('/switches/switch2/ports/p3', 200, json.dumps({ 'target': 'Venus' }))
+
+        self.assertTrue(self._cached('/switches/switch1'))
+        self.assertFalse(self._cached('/switches/switch2/ports/p3'))
+        rv = self._get('/switches/switch2', 200)
+        ports = { pt['name']: pt for pt in rv['data']['ports'] }
+        self.assertEqual(ports['p3']['target'], 'Venus')
+
+    def test_invalidate_vlan(self):
+        """GET switches after changing vlan carried by one of them"""
+
+        self._warm('/switches/switch1', '/switches/switch2', '/vlans/2')
+
+        self._patch('/vlans/2', 200, json.dumps({ 'tag': 42 }))
+
+        self.assertTrue(self._cached('/switches/switch1'))
+        self._get('/vlans/2', 404)
+        rv = self._get('/switches/switch2', 200)
+        self.assertEqual(rv['data']['ports'][0]['vlans'], [ 1, 42 ])
+
+    def test_unchanged_vlan_tag(self):
+        """GET switches after changing attribute of vlan not part of switches"""
+
+        self._warm('/switches/switch2', '/vlans/2')
+        etag = self.client.get('/switches/switch2', headers = self.default_headers).headers['ETag']
+        revision = int(self.client.get('/vlans', headers = self.default_headers).headers['ETag'].strip('"'))
+
+        self._patch('/vlans/2', 200, json.dumps({ 'description': 'Other' }))
+
+        # Only the vlan itself is changed
+        self.assertTrue(self._cached('/switches/switch2'))
+        self.assertFalse(self._cached('/vlans/2'))
+        rv = self.client.get('/switches/switch2', headers = self.default_headers)
+        self.assertEqual(rv.headers['ETag'], etag)
+        rv = self._get('/changes?since={}'.format(revision), 200)
+        self.assertEqual([ (ch['resource'], ch['resource_id']) for ch in rv['data'] ], [ ('vlans', 2) ])
+
+    def test_invalidate_switch_model(self):
+        """GET switches after renaming model of one of them"""
+
+        self._warm('/switches/switch1', '/switches/switch2')
+
+        self._patch('/switch_models/small_switch', 200, json.dumps({ 'name': 'tiny_switch' }))
+
+        self.assertTrue(self._cached('/switches/switch2'))
+        rv = self._get('/switches/switch1', 200)
+        self.assertEqual(rv['data']['model'], 'tiny_switch')
+
+    def test_invalidate_switch(self):
+        """GET switch and its ports after renaming and deleting it"""
+
+        self._warm('/switches/switch1', '/switches/switch1/ports/p1')
+
+        self._patch('/switches/switch1', 200, json.dumps({ 'name': 'switch3' }))
+        self._get('/switches/switch1', 404)
+        self._get('/switches/switch1/ports/p1', 404)
+
+        self._warm('/switches/switch3')
+        self._delete('/switches/switch3', 200)
+        self._get('/switches/switch3', 404)
+
+    def test_rollback(self):
+        """Change switch without committing changes"""
+
+        self._warm('/switches/switch1')
+
+        sw = database.query_switch(self.session, 'switch1')
+        sw.location = 3
+        self.session.flush()
+        self.assertTrue(database.tracking.pending(self.session))
+
+        # Rolled back changes do not invalidate anything
+        self.session.rollback()
+        self.assertFalse(database.tracking.pending(self.session))
+        self.assertTrue(self._cached('/switches/switch1'))
+
+        # Committed changes do
+        sw = database.query_switch(self.session, 'switch1')
+        sw.location = 3
+        self.session.commit()
+        self.assertFalse(database.tracking.pending(self.session))
+        self.assertEqual(self._get('/switches/switch1', 200)['data']['location'], 3)
+
+class Test_Document_Cache(unittest.TestCase):
+    """Test class that accesses the document cache directly"""
+
+    def test_evict(self):
+        """Evict least recently used documents"""
+
+        cache = DocumentCache(10)
+        cache.put('a', b'1234', 1, [], cache.generation)
+        cache.put('b', b'1234', 1, [], cache.generation)
+        self.assertEqual(cache.get('a').document, b'1234')
+        cache.put('c', b'1234', 1, [], cache.generation)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a').document, b'1234')
+        self.assertEqual(cache.size, 8)
+
+        # Documents larger than the cache are not stored
+        cache.put('d', b'12345678901', 1, [], cache.generation)
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(len(cache), 2)
+
+    def test_invalidate(self):
+        """Invalidate documents depending on tags"""
+
+        cache = DocumentCache()
+        cache.put('a', b'a', 1, [ ('switches', (1, )), ('vlans', (1, )) ], cache.generation)
+        cache.put('b', b'b', 1, [ ('switches', (2, )), ('vlans', (2, )) ], cache.generation)
+
+        cache.invalidate([ ('vlans', (1, )) ])
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), (b'b', 1))
+
+    def test_stale(self):
+        """Do not store documents read before an invalidation"""
+
+        cache = DocumentCache()
+        generation = cache.generation
+        cache.invalidate([ ('switches', (1, )) ])
+        cache.put('a', b'a', 1, [ ('switches', (2, )) ], generation)
+        self.assertIsNone(cache.get('a'))
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
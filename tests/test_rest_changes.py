@@ -0,0 +1,154 @@
+import json
+
+import unittest
+
+from test_rest import Test_REST
+
+class Test_REST_Changes(Test_REST):
+    """Test class that syncs resources incrementally with GET /changes"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _revision(self):
+        """Return current revision from entity tag of a collection"""
+
+        rv = self.client.get('/vlans', headers = self.default_headers)
+        return int(rv.headers['ETag'].strip('"'))
+
+    def _changes(self, since):
+        """Return dict mapping changed resources to their change"""
+
+        rv = self._get('/changes?since={}'.format(since), 200)
+        self.assertIsNone(rv['next'])
+        changes = {}
+        for ch in rv['data']:
+            key = (ch['resource'], ch['parent_resource_id'], ch['resource_id'])
+            self.assertNotIn(key, changes)
+            changes[key] = ch
+        return changes
+
+    def test_nothing_changed(self):
+        """GET changes since current revision"""
+
+        revision = self._revision()
+        self.assertEqual(self._changes(revision), {})
+
+        headers = dict(self.default_headers)
+        headers['If-None-Match'] = '"{}"'.format(revision)
+        rv = self.client.get('/changes?since={}'.format(revision), headers = headers)
+        self.assertEqual(rv.status_code, 304)
+
+    def test_all_changes(self):
+        """GET changes since the beginning"""
+
+        changes = self._changes(0)
+        self.assertEqual(len(changes), 2 + 2 + 2 + 2 + 5 + 2 + 5)
+        for ch in changes.values():
+            self.assertFalse(ch['deleted'])
+
+        switch = changes[('switches', None, 'switch1')]
+        self.assertEqual(switch['data'], self._get('/switches/switch1', 200)['data'])
+        vlan = changes[('vlans', None, 1)]
+        self.assertEqual(vlan['data'], self._get('/vlans/1', 200)['data'])
+        port_model = changes[('port_models', 'small_switch', 'p1')]
+        self.assertEqual(port_model['data'], self._get('/switch_models/small_switch/ports/p1', 200)['data'])
+
+    def test_changed(self):
+        """GET changes after changing resources"""
+
+        revision = self._revision()
+        self._patch('/vlans/2', 200, json.dumps({ 'tag': 42 }))
+        self._patch('/switches/switch2/ports/p3', 200, json.dumps({ 'target': 'Venus' }))
+
+        # Ports carrying vlan and switches containing them changed as well
+        changes = self._changes(revision)
+        self.assertEqual(set(changes), {
+            ('vlans', None, 2),
+            ('vlans', None, 42),
+            ('ports', 'switch2', 'p1'),
+            ('ports', 'switch2', 'p3'),
+            ('ports', 'switch2', 'p4'),
+            ('switches', None, 'switch2'),
+        })
+        self.assertTrue(changes[('vlans', None, 2)]['deleted'])
+        self.assertIsNone(changes[('vlans', None, 2)]['data'])
+        self.assertEqual(changes[('vlans', None, 42)]['data']['tag'], 42)
+        self.assertEqual(changes[('ports', 'switch2', 'p3')]['data']['target'], 'Venus')
+        self.assertEqual(
+            changes[('switches', None, 'switch2')]['data'],
+            self._get('/switches/switch2', 200)['data'])
+        self.assertEqual(
+            changes[('switches', None, 'switch2')]['revision'],
+            self._revision())
+
+        # Only the last change is returned
+        self.assertEqual(set(self._changes(revision + 1)), {
+            ('ports', 'switch2', 'p3'),
+            ('switches', None, 'switch2'),
+        })
+
+    def test_renamed(self):
+        """GET changes after renaming a switch"""
+
+        revision = self._revision()
+        self._patch('/switches/switch1', 200, json.dumps({ 'name': 'switch3' }))
+
+        changes = self._changes(revision)
+        self.assertEqual(set(changes), {
+            ('switches', None, 'switch1'),
+            ('switches', None, 'switch3'),
+            ('ports', 'switch1', 'p1'),
+            ('ports', 'switch3', 'p1'),
+        })
+        self.assertTrue(changes[('switches', None, 'switch1')]['deleted'])
+        self.assertTrue(changes[('ports', 'switch1', 'p1')]['deleted'])
+        self.assertFalse(changes[('ports', 'switch3', 'p1')]['deleted'])
+
+    def test_deleted(self):
+        """GET changes after deleting resources"""
+
+        revision = self._revision()
+        self._delete('/switches/switch1', 200)
+        self._delete('/switch_models/big_switch/ports/p4', 200)
+
+        changes = self._changes(revision)
+        self.assertEqual(set(changes), {
+            ('switches', None, 'switch1'),
+            ('ports', 'switch1', 'p1'),
+            ('port_models', 'big_switch', 'p4'),
+            ('switch_models', None, 'big_switch'),
+            ('ports', 'switch2', 'p4'),
+            ('switches', None, 'switch2'),
+        })
+        for key in (('switches', None, 'switch1'), ('ports', 'switch2', 'p4')):
+            self.assertTrue(changes[key]['deleted'])
+        self.assertFalse(changes[('switches', None, 'switch2')]['deleted'])
+
+    def test_paginated(self):
+        """GET changes page by page"""
+
+        expected = list(self._changes(0))
+
+        keys = []
+        url = '/changes?since=0&limit=3'
+        while url is not None:
+            rv = self._get(url, 200)
+            self.assertLessEqual(len(rv['data']), 3)
+            for ch in rv['data']:
+                keys.append((ch['resource'], ch['parent_resource_id'], ch['resource_id']))
+            url = rv['next']
+        self.assertEqual(keys, expected)
+
+    def test_invalid(self):
+        """GET changes with invalid query parameters"""
+
+        self._get('/changes', 400)
+        self._get('/changes?since=abc', 400)
+        self._get('/changes?since=0&cursor=abc', 400)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -0,0 +1,209 @@
+import json
+
+import unittest
+
+from test_rest import Test_REST
+
+class Test_REST_ETag(Test_REST):
+    """Test class that sends conditional requests using entity tags"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _etag(self, url):
+        """Return entity tag of resource at url"""
+
+        rv = self.client.get(url, headers = self.default_headers)
+        self.assertEqual(rv.status_code, 200)
+        self.assertIsNotNone(rv.headers.get('ETag'))
+        return rv.headers['ETag']
+
+    def _conditional(self, url, etag):
+        """Return status code of GET request on url with If-None-Match"""
+
+        headers = dict(self.default_headers)
+        headers['If-None-Match'] = etag
+        rv = self.client.get(url, headers = headers)
+        if rv.status_code == 304:
+            if etag != '*':
+                self.assertIn(rv.headers['ETag'], etag)
+            self.assertEqual(rv.data, b'')
+        return rv.status_code
+
+    def _uncached(self):
+        self.app.config['SWITCHMNG_DB_CONNECTION'].cache.clear()
+
+    def test_not_modified(self):
+        """GET resources again with their entity tag"""
+
+        urls = [
+            '/switches/switch1',
+            '/switches/switch2/ports/p1',
+            '/switch_models/big_switch',
+            '/switch_models/big_switch/ports/p1',
+            '/vlans/1',
+            '/connectors/rj45',
+            '/network_protocols/proto1',
+            '/switches/switch1?fields=name',
+        ]
+        for url in urls:
+            etag = self._etag(url)
+            self.assertEqual(self._conditional(url, etag), 304)
+            self.assertEqual(self._conditional(url, '"0", ' + etag), 304)
+            self.assertEqual(self._conditional(url, '"0"'), 200)
+            self.assertEqual(self._conditional(url, '*'), 304)
+
+        self.assertEqual(self._conditional('/switches/switch3', '*'), 404)
+
+    def test_not_modified_statements(self):
+        """Answer conditional requests without loading resources"""
+
+        etag = self._etag('/switches/switch1')
+
+        # Answered from cache
+        with self.record_statements() as statements:
+            self.assertEqual(self._conditional('/switches/switch1', etag), 304)
+        self.assertEqual(len(statements), 0)
+
+        # Answered by reading only the revision
+        self._uncached()
+        with self.record_statements() as statements:
+            self.assertEqual(self._conditional('/switches/switch1', etag), 304)
+        self.assertEqual(len(statements), 1)
+
+        with self.record_statements() as statements:
+            self.assertEqual(self._conditional('/switches/switch1?fields=ports.vlans', etag), 304)
+        self.assertEqual(len(statements), 1)
+
+    def test_modified(self):
+        """GET resources after changing resources they depend on"""
+
+        switch1 = self._etag('/switches/switch1')
+        switch2 = self._etag('/switches/switch2')
+        port3 = self._etag('/switches/switch2/ports/p3')
+        port4 = self._etag('/switches/switch2/ports/p4')
+        vlan = self._etag('/vlans/2')
+
+        # Vlan descriptions are not part of switches
+        self._patch('/vlans/2', 200, json.dumps({ 'description': 'Other' }))
+        self.assertEqual(self._conditional('/vlans/2', vlan), 200)
+        self.assertEqual(self._conditional('/switches/switch2', switch2), 304)
+
+        # Vlan tags are
+        self._patch('/vlans/2', 200, json.dumps({ 'tag': 42 }))
+        for uncached in (False, True):
+            if uncached:
+                self._uncached()
+            self.assertEqual(self._conditional('/switches/switch1', switch1), 304)
+            self.assertEqual(self._conditional('/switches/switch2', switch2), 200)
+            self.assertEqual(self._conditional('/switches/switch2/ports/p3', port3), 304)
+            self.assertEqual(self._conditional('/switches/switch2/ports/p4', port4), 200)
+
+        # Changing a port changes its switch
+        switch2 = self._etag('/switches/switch2')
+        self._patch('/switches/switch2/ports/p3', 200, json.dumps({ 'target': 'Venus' }))
+        self.assertEqual(self._conditional('/switches/switch2', switch2), 200)
+
+        # Renaming a network protocol changes switch models but not switches
+        switch1 = self._etag('/switches/switch1')
+        model = self._etag('/switch_models/small_switch')
+        self._patch('/network_protocols/proto2', 200, json.dumps({ 'name': 'proto9' }))
+        self.assertEqual(self._conditional('/switch_models/small_switch', model), 200)
+        self.assertEqual(self._conditional('/switches/switch1', switch1), 304)
+
+    def test_collection(self):
+        """GET collections again with their entity tag"""
+
+        urls = [
+            '/switches',
+            '/switches/switch1/ports',
+            '/switch_models',
+            '/switch_models/big_switch/ports',
+            '/vlans',
+            '/connectors',
+            '/network_protocols',
+        ]
+        etags = { url: self._etag(url) for url in urls }
+        for url in urls:
+            with self.record_statements() as statements:
+                self.assertEqual(self._conditional(url, etags[url]), 304)
+            self.assertEqual(len(statements), 1)
+
+        # Any change changes all collections
+        self._patch('/vlans/1', 200, json.dumps({ 'description': 'Other' }))
+        for url in urls:
+            self.assertEqual(self._conditional(url, etags[url]), 200)
+
+        self._get('/switches/switch3/ports', 404)
+        self._get('/switch_models/tiny_switch/ports', 404)
+
+    def test_if_match(self):
+        """Change resources only if they were not changed in between"""
+
+        etag = self._etag('/switches/switch1')
+        stale = dict(self.patch_headers)
+        stale['If-Match'] = '"0"'
+        current = dict(self.patch_headers)
+        current['If-Match'] = etag
+
+        self._patch('/switches/switch1', 412, json.dumps({ 'location': 3 }), stale)
+        self.assertNotEqual(self._get('/switches/switch1', 200)['data']['location'], 3)
+        self._patch('/switches/switch1', 200, json.dumps({ 'location': 3 }), current)
+        self._patch('/switches/switch1', 412, json.dumps({ 'location': 4 }), current)
+
+        # Put and delete
+        etag = self._etag('/vlans/1')
+        headers = dict(self.default_headers)
+        headers['If-Match'] = '"0"'
+        vlan = { 'tag': 1, 'description': 'Other' }
+        self._put('/vlans/1', 412, json.dumps(vlan), headers)
+        self._delete('/vlans/2', 412, headers = headers)
+        headers['If-Match'] = etag
+        self._put('/vlans/1', 200, json.dumps(vlan), headers)
+        self._put('/vlans/1', 412, json.dumps(vlan), headers)
+
+        # Resources that do not exist never match
+        headers['If-Match'] = '*'
+        self._put('/vlans/9', 412, json.dumps({ 'tag': 9 }), headers)
+        self._put('/switches/switch2/ports/p3', 200, json.dumps({ 'name': 'p3' }), headers)
+
+    def test_write_etag(self):
+        """Chain conditional writes using entity tags of responses"""
+
+        switch = self._get('/switches/switch2', 200)['data']
+        headers = dict(self.default_headers)
+        headers['If-Match'] = self._etag('/switches/switch2')
+        switch['location'] = 5
+        rv = self.client.put('/switches/switch2', data = json.dumps(switch), headers = headers)
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.headers['ETag'], self._etag('/switches/switch2'))
+
+        headers = dict(self.patch_headers)
+        headers['If-Match'] = rv.headers['ETag']
+        rv = self.client.patch('/switches/switch2', data = json.dumps({ 'location': 6 }), headers = headers)
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers['ETag'], headers['If-Match'])
+        self.assertEqual(rv.headers['ETag'], self._etag('/switches/switch2'))
+        self._patch('/switches/switch2', 412, json.dumps({ 'location': 7 }), headers)
+
+        # Entity tag of port includes changes written to its switch only
+        headers['If-Match'] = rv.headers['ETag']
+        rv = self.client.patch('/switches/switch2/ports/p1',
+                               data = json.dumps({ 'target': 'Venus' }), headers = self.patch_headers)
+        self.assertEqual(rv.headers['ETag'], self._etag('/switches/switch2/ports/p1'))
+        self._patch('/switches/switch2', 412, json.dumps({ 'location': 7 }), headers)
+        headers['If-Match'] = self._etag('/switches/switch2')
+        self._patch('/switches/switch2', 200, json.dumps({ 'location': 7 }), headers)
+
+        # Entity tag of switch includes changes written to its ports only
+        switch = self._get('/switches/switch2', 200)['data']
+        switch['ports'][0]['vlans'] = [ 1 ]
+        rv = self.client.put('/switches/switch2', data = json.dumps(switch), headers = self.default_headers)
+        self.assertEqual(rv.headers['ETag'], self._etag('/switches/switch2'))
+        self.assertNotEqual(rv.headers['ETag'], headers['If-Match'])
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
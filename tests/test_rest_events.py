@@ -0,0 +1,171 @@
+import json
+
+import unittest
+
+from switchmng.database import ChangeFeed
+from switchmng.routes import get
+
+from test_rest import Test_REST
+
+class Test_REST_Events(Test_REST):
+    """Test class that receives change notifications with GET /events"""
+
+    event_headers = { 'Accept': 'text/event-stream' }
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+        self.db = self.app.config['SWITCHMNG_DB_CONNECTION']
+        self.keepalive = get.EVENTS_KEEPALIVE
+        get.EVENTS_KEEPALIVE = 0.01
+
+    def tearDown(self):
+        get.EVENTS_KEEPALIVE = self.keepalive
+
+    def _open(self, headers = None):
+        """Open event stream and return response and iterator of events"""
+
+        if headers is None:
+            headers = self.event_headers
+        rv = self.client.get('/events', headers = headers, buffered = False)
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.mimetype, 'text/event-stream')
+
+        def events():
+            for chunk in rv.response:
+                chunk = chunk.decode()
+                if chunk.startswith(':'):
+                    yield None
+                    continue
+                lines = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+                yield lines['event'], int(lines['id']), json.loads(lines['data'])
+
+        return rv, events()
+
+    def _next(self, events):
+        """Return next event that is not a keepalive comment"""
+
+        for event in events:
+            if event is not None:
+                return event
+        return None
+
+    def test_changes(self):
+        """Receive notifications about committed changes"""
+
+        rv, events = self._open()
+        event, revision, data = self._next(events)
+        self.assertEqual(event, 'open')
+        self.assertEqual(data, { 'revision': revision })
+
+        # No database session is held while waiting for changes
+        self.assertIsNone(next(events))
+        self.assertFalse(self.db.Session.registry.has())
+
+        self._patch('/switches/switch2/ports/p3', 200, json.dumps({ 'target': 'Venus' }))
+        received = [ self._next(events), self._next(events) ]
+        self.assertEqual(
+            sorted((data['resource'], data['resource_id']) for _, _, data in received),
+            [ ('ports', 'p3'), ('switches', 'switch2') ])
+        for event, event_id, data in received:
+            self.assertEqual(event, 'change')
+            self.assertEqual(event_id, revision + 1)
+            self.assertEqual(data['revision'], revision + 1)
+            self.assertFalse(data['deleted'])
+
+        self._delete('/switches/switch1', 200)
+        received = [ self._next(events), self._next(events) ]
+        self.assertEqual(
+            sorted((data['resource'], data['resource_id'], data['deleted']) for _, _, data in received),
+            [ ('ports', 'p1', True), ('switches', 'switch1', True) ])
+
+        rv.close()
+        self.assertEqual(len(self.db.feed), 0)
+
+    def test_reconnect(self):
+        """Reconnect with the id of the last received event"""
+
+        rv, events = self._open()
+        _, revision, _ = self._next(events)
+        rv.close()
+
+        self._patch('/vlans/1', 200, json.dumps({ 'description': 'Other' }))
+
+        headers = dict(self.event_headers)
+        headers['Last-Event-ID'] = str(revision)
+        rv, events = self._open(headers)
+        self.assertEqual(self._next(events)[0], 'open')
+        self.assertEqual(self._next(events), ('resync', revision + 1, { 'since': revision }))
+        rv.close()
+
+        headers['Last-Event-ID'] = str(revision + 1)
+        rv, events = self._open(headers)
+        self.assertEqual(self._next(events)[0], 'open')
+        self.assertIsNone(next(events))
+        rv.close()
+
+    def test_invalid(self):
+        """Open event stream with invalid headers"""
+
+        self._get('/events', 406)
+        headers = dict(self.event_headers)
+        headers['Last-Event-ID'] = 'abc'
+        self.assertEqual(self.client.get('/events', headers = headers).status_code, 400)
+
+class Test_Change_Feed(unittest.TestCase):
+    """Test class that accesses the change feed directly"""
+
+    def _notification(self, revision):
+        return {
+            'revision':           revision,
+            'resource':           'vlans',
+            'resource_id':        revision,
+            'parent_resource_id': None,
+            'deleted':            False,
+        }
+
+    def test_publish(self):
+        """Publish notifications to all subscribers"""
+
+        feed = ChangeFeed()
+        first = feed.subscribe(0)
+        second = feed.subscribe(0)
+        self.assertEqual(len(feed), 2)
+
+        feed.publish([ self._notification(1) ])
+        for subscription in (first, second):
+            self.assertEqual(subscription.get(0), ('change', self._notification(1)))
+            self.assertIsNone(subscription.get(0))
+            self.assertEqual(subscription.revision, 1)
+
+        first.close()
+        feed.publish([ self._notification(2) ])
+        self.assertIsNone(first.get(0))
+        self.assertEqual(second.get(0), ('change', self._notification(2)))
+
+    def test_overflow(self):
+        """Drop notifications of subscribers that fall behind"""
+
+        feed = ChangeFeed()
+        with feed.subscribe(0, 2) as subscription:
+            feed.publish([ self._notification(1) ])
+            self.assertEqual(subscription.get(0)[0], 'change')
+
+            feed.publish([ self._notification(2), self._notification(3) ])
+            feed.publish([ self._notification(4) ])
+            feed.publish([ self._notification(5) ])
+
+            # Resync from the last revision taken from the queue
+            self.assertEqual(subscription.get(0), ('resync', { 'since': 1 }))
+            self.assertIsNone(subscription.get(0))
+
+            feed.publish([ self._notification(6) ])
+            self.assertEqual(subscription.get(0), ('change', self._notification(6)))
+
+        self.assertEqual(len(feed), 0)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
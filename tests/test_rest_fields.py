@@ -0,0 +1,104 @@
+import unittest
+
+from sqlalchemy import inspect
+
+from switchmng import database
+
+from test_rest import Test_REST
+
+class Test_REST_Fields(Test_REST):
+    """Test class that requests selected attributes of resources as a rest client"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def test_get_switches(self):
+        """GET selected attributes of switches"""
+
+        with self.record_statements() as statements:
+            rv = self._get('/switches?fields=name,ip', 200)
+        self.assertEqual(rv['data'], [
+            { 'name': 'switch1', 'ip': '192.168.0.50' },
+            { 'name': 'switch2', 'ip': '192.168.0.100' },
+        ])
+
+        # Ports were not loaded (only revision and switches were read)
+        self.assertEqual(len(statements), 2)
+
+    def test_get_switch_nested(self):
+        """GET selected attributes of ports of switch"""
+
+        complete = self._get('/switches/switch2', 200)['data']
+
+        rv = self._get('/switches/switch2?fields=name&fields=ports.name', 200)
+        self.assertEqual(rv['data'], {
+            'name':  'switch2',
+            'ports': [ { 'name': p['name'] } for p in complete['ports'] ],
+        })
+
+        rv = self._get('/switches/switch2?fields=ports.target,ports.vlans', 200)
+        self.assertEqual(rv['data']['ports'][0], { 'vlans': [ 1, 2 ], 'target': 'Mars' })
+
+        # Whole attribute overrides nested selection
+        rv = self._get('/switches/switch1?fields=ports.name,ports', 200)
+        self.assertEqual(rv['data'], self._get('/switches/switch1?fields=ports', 200)['data'])
+        self.assertIn('vlans', rv['data']['ports'][0])
+
+    def test_get_switch_models(self):
+        """GET selected attributes of switch models"""
+
+        rv = self._get('/switch_models?fields=name,ports.connector', 200)
+        self.assertEqual(rv['data'][1], {
+            'name':  'small_switch',
+            'ports': [ { 'connector': 'rj11' } ],
+        })
+
+    def test_get_paged(self):
+        """GET selected attributes of collection page by page"""
+
+        rv = self._get('/switches?fields=ip&limit=1', 200)
+        self.assertEqual(rv['data'], [ { 'ip': '192.168.0.50' } ])
+        rv = self._get(rv['next'], 200)
+        self.assertEqual(rv['data'], [ { 'ip': '192.168.0.100' } ])
+        self.assertIsNone(rv['next'])
+
+    def test_get_other(self):
+        """GET selected attributes of resources without relationships"""
+
+        rv = self._get('/vlans?fields=tag', 200)
+        self.assertEqual(rv['data'], [ { 'tag': 1 }, { 'tag': 2 } ])
+
+        rv = self._get('/switches/switch2/ports/p1?fields=target', 200)
+        self.assertEqual(rv['data'], { 'target': 'Mars' })
+
+    def test_get_fail(self):
+        """GET invalid selections of attributes"""
+
+        self._get('/switches?fields=non_existing', 400)
+        self._get('/switches?fields=', 400)
+        self._get('/switches/switch1?fields=ports.non_existing', 400)
+        self._get('/switches/switch1?fields=model.name', 400)
+        self._get('/vlans/1?fields=tag.value', 400)
+
+    def test_query_unloaded(self):
+        """Query switches without loading unselected relationships"""
+
+        fields = { 'name': None }
+        switches = database.query_switches(self.session, fields = fields)
+        for sw in switches:
+            unloaded = inspect(sw).unloaded
+            self.assertIn('_ports', unloaded)
+            self.assertIn('_model', unloaded)
+            self.assertIn('_ip', unloaded)
+
+        fields = { 'ports': { 'name': None } }
+        for sw in database.query_switches(self.session, fields = fields):
+            self.assertNotIn('_ports', inspect(sw).unloaded)
+            for pt in sw._ports:
+                self.assertIn('_vlans', inspect(pt).unloaded)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -0,0 +1,132 @@
+import json
+
+import unittest
+
+from test_rest import Test_REST
+
+class Test_REST_Pagination(Test_REST):
+    """Test class that requests collections page by page as a rest client"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+        # Add some more vlans
+        for tag in range(3, 8):
+            self._post('/vlans', 201, json.dumps({ 'tag': tag }))
+
+    def _walk(self, url, limit):
+        """Follow next links of collection and return all pages"""
+
+        pages = []
+        separator = '&' if '?' in url else '?'
+        rv = self._get('{}{}limit={}'.format(url, separator, limit), 200)
+        pages.append(rv['data'])
+        while rv['next'] is not None:
+            rv = self._get(rv['next'], 200)
+            pages.append(rv['data'])
+        return pages
+
+    def _check(self, url, limit):
+        """Check that pages of collection together contain whole collection"""
+
+        rv = self._get(url, 200)
+        self.assertIsNone(rv['next'])
+        complete = rv['data']
+
+        pages = self._walk(url, limit)
+        for page in pages:
+            self.assertLessEqual(len(page), limit)
+        self.assertEqual(sum(pages, []), complete)
+        self.assertEqual(len(pages), max(1, (len(complete) + limit - 1) // limit))
+
+    def test_vlans(self):
+        """GET vlans page by page"""
+
+        for limit in (1, 2, 3, 7, 8):
+            self._check('/vlans', limit)
+
+    def test_switches(self):
+        """GET switches page by page"""
+
+        for limit in (1, 2, 3):
+            self._check('/switches', limit)
+
+    def test_ports(self):
+        """GET ports of switch page by page"""
+
+        for limit in (1, 2, 5):
+            self._check('/switches/switch2/ports', limit)
+
+    def test_switch_models(self):
+        """GET switch models page by page"""
+
+        for limit in (1, 3):
+            self._check('/switch_models', limit)
+        self._check('/switch_models?network_protocol=proto1', 1)
+
+    def test_port_models(self):
+        """GET port models of switch model page by page"""
+
+        for limit in (1, 3):
+            self._check('/switch_models/big_switch/ports', limit)
+
+    def test_ports_order(self):
+        """GET ports page by page in the order they were added"""
+
+        names = [ str(i) for i in range(1, 13) ]
+        self._post('/switch_models', 201, json.dumps({
+            'name': 'numbered', 'ports': [ { 'name': name } for name in names ] }))
+        pages = self._walk('/switch_models/numbered/ports', 5)
+        self.assertEqual([ port['name'] for port in sum(pages, []) ], names)
+
+        # Port p2 of switch2 was added from the switch model after the given ports
+        pages = self._walk('/switches/switch2/ports', 2)
+        self.assertEqual([ port['name'] for port in sum(pages, []) ], [ 'p1', 'p3', 'p4', 'p2' ])
+
+        # Pages cannot be continued after a removed port
+        rv = self._get('/switch_models/numbered/ports?limit=5', 200)
+        self._delete('/switch_models/numbered/ports/5', 200)
+        self._get(rv['next'], 400)
+
+    def test_network_protocols(self):
+        """GET network protocols page by page"""
+
+        self._check('/network_protocols', 1)
+
+    def test_connectors(self):
+        """GET connectors page by page"""
+
+        self._check('/connectors', 1)
+
+    def test_streamed(self):
+        """GET collections as streamed responses"""
+
+        for url in ('/vlans', '/switches', '/switches/switch2/ports', '/switch_models'):
+            rv = self.client.get(url, headers = self.default_headers, buffered = False)
+            self.assertTrue(rv.is_streamed)
+
+            rv = json.loads(b''.join(rv.response).decode())
+            self.assertEqual(rv['status'], 200)
+            self.assertIsNone(rv['next'])
+
+    def test_fail_limit(self):
+        """GET collection with invalid limit"""
+
+        self._get('/vlans?limit=many', 400)
+        self._get('/vlans?limit=0', 400)
+        self._get('/vlans?limit=-1', 400)
+
+    def test_fail_cursor(self):
+        """GET collection with invalid cursor"""
+
+        self._get('/vlans?limit=1&cursor=invalid', 400)
+
+        # Cursor of different collection
+        rv = self._get('/switches?limit=1', 200)
+        self._get(rv['next'].replace('/switches', '/vlans'), 400)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
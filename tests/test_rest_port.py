@@ -155,6 +155,12 @@ class Test_REST_Port(Test_REST):
         patch = {}
         self._patch('/switches/switch1/ports/non-existing', 404, json.dumps(patch))
 
+    def test_patch_fail_nonexisting_switch(self):
+        """PATCH port of non existing switch"""
+
+        patch = { 'target': 'Venus' }
+        self._patch('/switches/non-existing/ports/p1', 404, json.dumps(patch))
+
     def test_patch_fail_header1(self):
         """PATCH port with missing 'Accept' header"""
 
@@ -0,0 +1,226 @@
+import json
+
+import unittest
+
+from switchmng.schema import *
+
+from test_rest import Test_REST
+
+class Test_REST_Set(Test_REST):
+    """
+    Test class that sets existing resources to a new state with PUT.
+
+    Existing resources are changed in place, so that only the
+    differences to the current state are written to the database.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _record_writes(self):
+        """Record all statements changing the database inside the context"""
+
+        return self.record_statements(
+            lambda statement: statement.split(None, 1)[0] in ('INSERT', 'UPDATE', 'DELETE'))
+
+    def _writes(self, writes, table):
+        """
+        Return number of given statements changing given table.
+
+        Statements only updating revisions (See :mod:`tracking`) are
+        not counted.
+        """
+
+        prefixes = tuple(prefix.format(table) for prefix in (
+            'INSERT INTO {} ', 'UPDATE {} ', 'DELETE FROM {} '))
+        revision = 'UPDATE {} SET revision=? WHERE'.format(table)
+        return sum(1 for statement in writes
+                   if statement.startswith(prefixes) and not statement.startswith(revision))
+
+    def _ids(self, cls):
+        """Return dict mapping name and parent id of all rows to their id"""
+
+        table = cls.__table__
+        parent = table.c.switch_model_id if cls is PortModel else table.c.switch_id
+        engine = self.app.config['SWITCHMNG_DB_CONNECTION'].engine
+        rows = engine.execute(table.select())
+        return { (row[table.c.name], row[parent]): row[table.c.id] for row in rows }
+
+    def _big_switch(self, ports):
+        return {
+            'name':  'big_switch',
+            'size':  4,
+            'ports': [
+                { 'name': 'p1', 'network_protocols': [ 'proto1', 'proto2' ], 'connector': 'rj45' },
+                { 'name': 'p2', 'network_protocols': [ 'proto1' ], 'connector': 'rj45' },
+                { 'name': 'p3', 'network_protocols': [ 'proto2' ], 'connector': 'rj45' },
+                { 'name': 'p4', 'network_protocols': [ ], 'connector': 'rj45' },
+            ][:ports],
+        }
+
+    def test_put_switch_model_unchanged(self):
+        """PUT switch model with its current state"""
+
+        port_models = self._ids(PortModel)
+        ports = self._ids(Port)
+
+        with self._record_writes() as writes:
+            self._put('/switch_models/big_switch', 200, json.dumps(self._big_switch(4)))
+        self.assertEqual(writes, [])
+
+        self.assertEqual(self._ids(PortModel), port_models)
+        self.assertEqual(self._ids(Port), ports)
+
+    def test_put_switch_model(self):
+        """PUT switch model changing, adding and removing port models"""
+
+        port_models = self._ids(PortModel)
+        ports = self._ids(Port)
+        switch = { port['name']: port
+                   for port in self._get('/switches/switch2', 200)['data']['ports'] }
+
+        model = self._big_switch(3)
+        model['size'] = 2
+        model['ports'][0]['connector'] = 'rj11'
+        model['ports'].append({ 'name': 'p5', 'network_protocols': [ 'proto2' ] })
+        with self._record_writes() as writes:
+            rv = self._put('/switch_models/big_switch', 200, json.dumps(model))
+        self.assertEqual(rv['data'], self._get('/switch_models/big_switch', 200)['data'])
+        self.assertEqual(rv['data']['size'], 2)
+        self.assertEqual(rv['data']['ports'][0]['connector'], 'rj11')
+
+        # Only differing port models were added and removed
+        self.assertEqual(self._writes(writes, 'port_models'), 3)
+        current = self._ids(PortModel)
+        for key in (('p1', 1), ('p2', 1), ('p3', 1), ('p1', 2)):
+            self.assertEqual(current[key], port_models[key])
+        self.assertNotIn(('p4', 1), current)
+        self.assertIn(('p5', 1), current)
+
+        # Switches using the switch model were kept with their ports
+        ports_now = self._ids(Port)
+        for key in (('p1', 1), ('p1', 2), ('p3', 2)):
+            self.assertEqual(ports_now[key], ports[key])
+        self.assertNotIn(('p4', 2), ports_now)
+
+        switch_now = self._get('/switches/switch2', 200)['data']
+        by_name = { port['name']: port for port in switch_now['ports'] }
+        self.assertEqual(sorted(by_name), [ 'p1', 'p2', 'p3', 'p5' ])
+        for name in ('p1', 'p2', 'p3'):
+            self.assertEqual(by_name[name], switch[name])
+        self.assertEqual(by_name['p5'], { 'name': 'p5', 'target': None, 'vlans': [] })
+
+    def test_put_switch_model_rename(self):
+        """PUT switch model with different resource identifier"""
+
+        port_models = self._ids(PortModel)
+        model = self._big_switch(4)
+        model['name'] = 'renamed_switch'
+        self._put('/switch_models/big_switch', 200, json.dumps(model))
+
+        self.assertEqual(self._ids(PortModel), port_models)
+        self.assertEqual(self._get('/switches/switch2', 200)['data']['model'], 'renamed_switch')
+        self._get('/switch_models/big_switch', 404)
+
+    def test_put_switch_model_statements(self):
+        """Writes of PUT switch model do not depend on the number of switches"""
+
+        def writes():
+            model = self._big_switch(4)
+            model['ports'][1]['connector'] = 'rj11'
+            with self._record_writes() as statements:
+                self._put('/switch_models/big_switch', 200, json.dumps(model))
+                self._put('/switch_models/big_switch', 200, json.dumps(self._big_switch(4)))
+            return len(statements)
+
+        before = writes()
+        for i in range(10):
+            self._post('/switches', 201, json.dumps({
+                'name': 'additional_switch{}'.format(i), 'model': 'big_switch' }))
+        self.assertEqual(writes(), before)
+
+    def test_put_switch_unchanged(self):
+        """PUT switch and port with their current state"""
+
+        switch = self._get('/switches/switch2', 200)['data']
+        port = self._get('/switches/switch2/ports/p1', 200)['data']
+        revision = self.client.get('/switches/switch2', headers = self.default_headers).headers['ETag']
+
+        with self._record_writes() as writes:
+            self._put('/switches/switch2', 200, json.dumps(switch))
+            self._put('/switches/switch2/ports/p1', 200, json.dumps(port))
+        self.assertEqual(writes, [])
+
+        rv = self.client.get('/switches/switch2', headers = self.default_headers)
+        self.assertEqual(rv.headers['ETag'], revision)
+
+    def test_put_switch(self):
+        """PUT switch changing vlans and target of ports"""
+
+        ports = self._ids(Port)
+        switch = self._get('/switches/switch2', 200)['data']
+        by_name = { port['name']: port for port in switch['ports'] }
+        by_name['p1']['vlans'] = [ 1 ]
+        by_name['p3']['vlans'] = [ 1, 2 ]
+        by_name['p4']['target'] = 'Venus'
+        switch['location'] = 6
+
+        with self._record_writes() as writes:
+            rv = self._put('/switches/switch2', 200, json.dumps(switch))
+        self.assertEqual(rv['data'], self._get('/switches/switch2', 200)['data'])
+        self.assertEqual(rv['data']['location'], 6)
+
+        # Only differing vlans of ports were inserted and deleted
+        self.assertEqual(self._writes(writes, 'vlan_ports'), 2)
+        self.assertEqual(self._writes(writes, 'ports'), 1)
+        self.assertEqual(self._ids(Port), ports)
+
+        current = { port['name']: port for port in rv['data']['ports'] }
+        self.assertEqual(current, by_name)
+
+    def test_put_switch_one_vlan(self):
+        """Writes of PUT switch changing one vlan of one port"""
+
+        switch = self._get('/switches/switch2', 200)['data']
+        switch['ports'][0]['vlans'] = [ 2 ]
+
+        with self._record_writes() as writes:
+            self._put('/switches/switch2', 200, json.dumps(switch))
+
+        # Besides the change itself only the revision counter, the
+        # revisions of port and switch and the change journal are written
+        self.assertEqual(self._writes(writes, 'vlan_ports'), 1)
+        self.assertEqual(len(writes), 5)
+        journal = [ statement for statement in writes
+                    if statement.startswith('INSERT INTO changes ') ]
+        self.assertEqual(len(journal), 1)
+
+    def test_put_switch_rename(self):
+        """PUT switch with different resource identifier"""
+
+        ports = self._ids(Port)
+        switch = self._get('/switches/switch1', 200)['data']
+        switch['name'] = 'switch3'
+        self._put('/switches/switch1', 200, json.dumps(switch))
+
+        self.assertEqual(self._ids(Port), ports)
+        self._get('/switches/switch1', 404)
+        self.assertEqual(self._get('/switches/switch3', 200)['data']['ports'], switch['ports'])
+
+    def test_put_port(self):
+        """PUT port changing its vlans"""
+
+        port = self._get('/switches/switch2/ports/p1', 200)['data']
+        port['vlans'] = [ 2 ]
+
+        with self._record_writes() as writes:
+            rv = self._put('/switches/switch2/ports/p1', 200, json.dumps(port))
+        self.assertEqual(rv['data'], port)
+        self.assertEqual(self._writes(writes, 'vlan_ports'), 1)
+        self.assertEqual(self._writes(writes, 'ports'), 0)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -0,0 +1,114 @@
+import json
+
+import unittest
+
+from test_rest import Test_REST
+
+class Test_REST_Statements(Test_REST):
+    """
+    Test class that counts SQL statements executed per request.
+
+    The number of statements needed to answer a request must not
+    depend on the number of returned resources.
+    """
+
+    # Upper bound of SQL statements per request
+    max_statements = 4
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _add_switches(self, count):
+        for i in range(count):
+            switch = {
+                'name':  'additional_switch{}'.format(i),
+                'model': 'big_switch',
+                'ports': [
+                    { 'name': 'p1', 'vlans': [ 1, 2 ] },
+                    { 'name': 'p2', 'vlans': [ 2 ] },
+                ],
+            }
+            self._post('/switches', 201, json.dumps(switch))
+
+    def _add_switch_models(self, count):
+        for i in range(count):
+            model = {
+                'name':  'additional_model{}'.format(i),
+                'ports': [
+                    { 'name': 'p1', 'network_protocols': [ 'proto1' ], 'connector': 'rj45' },
+                    { 'name': 'p2', 'network_protocols': [ 'proto2' ], 'connector': 'rj11' },
+                ],
+            }
+            self._post('/switch_models', 201, json.dumps(model))
+
+    def _statements(self, url):
+        """Return number of statements executed for GET request on url"""
+
+        # Measure statements of requests not answered from cache
+        self.app.config['SWITCHMNG_DB_CONNECTION'].cache.clear()
+
+        with self.record_statements() as statements:
+            self._get(url, 200)
+        return len(statements)
+
+    def _check(self, url, add_resources):
+        """
+        Check that statements for url stay below upper bound and do not
+        change when adding more resources
+        """
+
+        before = self._statements(url)
+        add_resources(5)
+        after = self._statements(url)
+
+        self.assertLessEqual(before, self.max_statements)
+        self.assertEqual(before, after)
+
+    def test_get_switches(self):
+        """GET switches with constant number of statements"""
+
+        self._check('/switches', self._add_switches)
+
+    def test_get_switch(self):
+        """GET switch with constant number of statements"""
+
+        self._check('/switches/switch2', self._add_switches)
+
+    def test_get_ports(self):
+        """GET ports of switch with constant number of statements"""
+
+        self._check('/switches/switch2/ports', self._add_switches)
+
+    def test_get_switch_models(self):
+        """GET switch models with constant number of statements"""
+
+        self._check('/switch_models', self._add_switch_models)
+
+    def test_get_switch_model(self):
+        """GET switch model with constant number of statements"""
+
+        self._check('/switch_models/big_switch', self._add_switch_models)
+
+    def test_get_port_models(self):
+        """GET port models of switch model with constant number of statements"""
+
+        self._check('/switch_models/big_switch/ports', self._add_switch_models)
+
+    def test_get_point_lookups(self):
+        """GET single resources with one statement per lookup"""
+
+        self.assertEqual(self._statements('/vlans/1'), 1)
+        self.assertEqual(self._statements('/connectors/rj45'), 1)
+        self.assertEqual(self._statements('/network_protocols/proto1'), 1)
+
+        # Port and its vlans
+        self.assertEqual(self._statements('/switches/switch2/ports/p1'), 2)
+
+        # Port model and its network protocols
+        self.assertEqual(self._statements('/switch_models/big_switch/ports/p1'), 2)
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -122,6 +122,50 @@ class Test_REST_SwitchModel(Test_REST):
 
         self.assertEqual(ret, self.example_model)
 
+    def test_get_filter(self):
+        """GET switch models filtered by network protocol and speed"""
+
+        slow_model = {
+            'name':  'slow_model',
+            'size':  1,
+            'ports': [ { 'name': 'p1', 'network_protocols': [ 'proto1' ] } ],
+        }
+        self._post('/switch_models', 201, json.dumps(slow_model))
+
+        def names(url):
+            rv = self._get(url, 200)
+            return sorted([ sm['name'] for sm in rv['data'] ])
+
+        self.assertEqual(
+            names('/switch_models?network_protocol=proto1'),
+            [ 'example_model', 'slow_model' ])
+        self.assertEqual(
+            names('/switch_models?network_protocol=proto2'),
+            [ 'example_model' ])
+        self.assertEqual(
+            names('/switch_models?network_protocol=proto1&network_protocol=proto2'),
+            [ 'example_model', 'slow_model' ])
+        self.assertEqual(
+            names('/switch_models?network_protocol=proto1&network_protocol=proto2'
+                  + '&network_protocols_match=all'),
+            [ 'example_model' ])
+        self.assertEqual(
+            names('/switch_models?min_speed=100'),
+            [ 'example_model', 'slow_model' ])
+        self.assertEqual(
+            names('/switch_models?min_speed=150'),
+            [ 'example_model' ])
+        self.assertEqual(
+            names('/switch_models?min_speed=150&size=1'),
+            [])
+
+    def test_get_filter_fail(self):
+        """GET switch models with invalid filters"""
+
+        self._get('/switch_models?network_protocol=non-existing', 400)
+        self._get('/switch_models?min_speed=fast', 400)
+        self._get('/switch_models?network_protocol=proto1&network_protocols_match=some', 400)
+
     def test_delete_fail_inuse(self):
         """DELETE switch model still in use by switch"""
 
@@ -152,6 +196,11 @@ class Test_REST_SwitchModel(Test_REST):
 
         self._delete('/switch_models/non-existing', 404)
 
+    def test_delete_port_fail_nonexisting(self):
+        """DELETE port model of non existing switch model"""
+
+        self._delete('/switch_models/non-existing/ports/p1', 404)
+
     def test_delete_fail_header(self):
         """DELETE switch model with missing 'Accept' header"""
 
@@ -0,0 +1,154 @@
+import json
+
+import unittest
+
+from switchmng import database
+
+from test_rest import Test_REST
+
+class Test_REST_Targets(Test_REST):
+    """Test class that looks up ports by the host connected to them"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+    def _targets(self, url):
+        """Return list of switch, port and target of all ports on all pages"""
+
+        ports = []
+        while url is not None:
+            rv = self._get(url, 200)
+            ports.extend((pt['switch'], pt['port'], pt['target']) for pt in rv['data'])
+            url = rv['next']
+        return ports
+
+    def test_get_exact(self):
+        """GET ports connected to target"""
+
+        rv = self._get('/targets/Mars', 200)
+        self.assertEqual(rv['data'], [ { 'switch': 'switch2', 'port': 'p1', 'target': 'Mars' } ])
+        self.assertIsNone(rv['next'])
+
+        self.assertEqual(self._targets('/targets/mars'), [])
+        self.assertEqual(self._targets('/targets/Mar'), [])
+        self.assertEqual(self._targets('/targets/Venus'), [])
+
+        self.assertEqual(self._targets('/targets/mARS?ignore_case=true'),
+                         [ ('switch2', 'p1', 'Mars') ])
+
+    def test_get_prefix(self):
+        """GET ports connected to targets starting with prefix"""
+
+        self.assertEqual(self._targets('/targets/M?match=prefix'), [
+            ('switch2', 'p1', 'Mars'),
+            ('switch2', 'p4', 'Mercury'),
+        ])
+        self.assertEqual(self._targets('/targets/Mer?match=prefix'),
+                         [ ('switch2', 'p4', 'Mercury') ])
+        self.assertEqual(self._targets('/targets/m?match=prefix'), [])
+        self.assertEqual(self._targets('/targets/mE?match=prefix&ignore_case=true'),
+                         [ ('switch2', 'p4', 'Mercury') ])
+        self.assertEqual(self._targets('/targets/Mercury?match=prefix'),
+                         [ ('switch2', 'p4', 'Mercury') ])
+
+    def test_get_prefix_boundaries(self):
+        """GET ports by prefixes ending with characters next to letters"""
+
+        self._patch('/switches/switch2/ports/p2', 200, json.dumps({ 'target': 'zeta' }))
+        self._patch('/switches/switch2/ports/p3', 200, json.dumps({ 'target': '[x' }))
+        self._patch('/switches/switch2/ports/p4', 200, json.dumps({ 'target': '@home' }))
+
+        self.assertEqual(self._targets('/targets/Z?match=prefix&ignore_case=true'),
+                         [ ('switch2', 'p2', 'zeta') ])
+        self.assertEqual(self._targets('/targets/@?match=prefix&ignore_case=true'),
+                         [ ('switch2', 'p4', '@home') ])
+        self.assertEqual(self._targets('/targets/[?match=prefix'),
+                         [ ('switch2', 'p3', '[x') ])
+
+    def test_get_paginated(self):
+        """GET ports connected to target page by page"""
+
+        self._post('/switches', 201, json.dumps({ 'name': 'switch3', 'model': 'big_switch' }))
+        expected = []
+        for switch in ('switch2', 'switch3'):
+            for port in ('p1', 'p2', 'p3', 'p4'):
+                self._patch('/switches/{}/ports/{}'.format(switch, port), 200,
+                            json.dumps({ 'target': 'host-{}-{}'.format(switch, port) }))
+                expected.append((switch, port, 'host-{}-{}'.format(switch, port)))
+
+        rv = self._get('/targets/host?match=prefix&limit=3', 200)
+        self.assertEqual(len(rv['data']), 3)
+        self.assertIn('match=prefix', rv['next'])
+        self.assertEqual(self._targets('/targets/host?match=prefix&limit=3'), expected)
+        self.assertEqual(self._targets('/targets/HOST-SWITCH3?match=prefix&ignore_case=true&limit=1'),
+                         expected[4:])
+
+    def test_get_conditional(self):
+        """GET ports connected to target only when changed"""
+
+        rv = self.client.get('/targets/Mars', headers = self.default_headers)
+        headers = dict(self.default_headers)
+        headers['If-None-Match'] = rv.headers['ETag']
+        self.assertEqual(self.client.get('/targets/Mars', headers = headers).status_code, 304)
+
+        self._patch('/switches/switch1/ports/p1', 200, json.dumps({ 'target': 'Mars' }))
+        self.assertEqual(self.client.get('/targets/Mars', headers = headers).status_code, 200)
+        self.assertEqual(len(self._targets('/targets/Mars')), 2)
+
+    def test_get_fail(self):
+        """GET ports connected to target with invalid parameters"""
+
+        self._get('/targets/Mars?match=suffix', 400)
+        self._get('/targets/Mars?ignore_case=yes', 400)
+        self._get('/targets/Mars?limit=0', 400)
+        self._get('/targets/Mars?cursor=abc', 400)
+
+    def test_query_ports(self):
+        """Query ports by target"""
+
+        pts = database.query_ports(self.session, None, target = 'Mars')
+        self.assertEqual([ (pt.name, pt.target) for pt in pts ], [ ('p1', 'Mars') ])
+
+        pts = database.query_ports(self.session, None, target = 'm',
+                                   target_match = 'prefix', target_ignore_case = True)
+        self.assertEqual([ pt.target for pt in pts ], [ 'Mars', 'Mercury' ])
+
+        pts = database.query_ports(self.session, 'switch2', target = 'jupiter',
+                                   target_ignore_case = True)
+        self.assertEqual([ pt.name for pt in pts ], [ 'p3' ])
+        self.assertEqual(database.query_ports(self.session, 'switch1', target = 'Mars'), [])
+
+        with self.assertRaises(ValueError):
+            database.query_ports(self.session, None, target = 'Mars', target_match = 'suffix')
+        with self.assertRaises(TypeError):
+            database.query_ports(self.session, None, target = 'Mars', target_ignore_case = 'yes')
+
+    def test_query_ports_paginated(self):
+        """Query ports by target page by page"""
+
+        self._post('/switches', 201, json.dumps({ 'name': 'switch3', 'model': 'big_switch' }))
+        for port in ('p1', 'p2', 'p3', 'p4'):
+            self._patch('/switches/switch3/ports/{}'.format(port), 200,
+                        json.dumps({ 'target': 'Moon-{}'.format(port) }))
+
+        # Ports are filtered by target before they are paginated
+        pts = database.query_ports(self.session, None, target = 'M',
+                                   target_match = 'prefix', limit = 3)
+        self.assertEqual([ pt.target for pt in pts ], [ 'Mars', 'Mercury', 'Moon-p1' ])
+        pts = database.query_ports(self.session, None, target = 'm',
+                                   target_match = 'prefix', target_ignore_case = True,
+                                   limit = 2, after = ('switch2', 'p4'))
+        self.assertEqual([ pt.target for pt in pts ], [ 'Moon-p1', 'Moon-p2' ])
+
+        pts = database.query_ports(self.session, 'switch3', target = 'Moon',
+                                   target_match = 'prefix', limit = 1, after = 'p2')
+        self.assertEqual([ pt.name for pt in pts ], [ 'p3' ])
+        pts = database.query_ports(self.session, 'switch2', target = 'Mars',
+                                   limit = 1, after = 'p1')
+        self.assertEqual(pts, [])
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)
@@ -0,0 +1,214 @@
+import json
+
+import unittest
+
+from test_rest import Test_REST
+
+class Test_REST_Vlan_Ports(Test_REST):
+    """Test class that looks up ports carrying vlans and assigns vlans to them"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Add some default values
+        self.setUp_all()
+
+        self._post('/vlans', 201, json.dumps({ 'tag': 3 }))
+        self._post('/switches', 201, json.dumps({ 'name': 'switch3', 'model': 'big_switch' }))
+
+    def _record_writes(self):
+        """Record all statements changing vlans of ports inside the context"""
+
+        return self.record_statements(
+            lambda statement: statement.startswith(('INSERT INTO vlan_ports', 'DELETE FROM vlan_ports')))
+
+    def _vlans(self, switch):
+        """Return dict mapping port names of switch to their vlans"""
+
+        ports = self._get('/switches/{}'.format(switch), 200)['data']['ports']
+        return { port['name']: port['vlans'] for port in ports }
+
+    def test_get_ports(self):
+        """GET ports carrying vlan"""
+
+        rv = self._get('/vlans/2/ports', 200)
+        self.assertEqual(rv['data'], [
+            { 'switch': 'switch2', 'port': 'p1', 'target': 'Mars' },
+            { 'switch': 'switch2', 'port': 'p4', 'target': 'Mercury' },
+        ])
+        self.assertIsNone(rv['next'])
+
+        self.assertEqual(self._get('/vlans/3/ports', 200)['data'], [])
+        self._get('/vlans/42/ports', 404)
+        self._get('/vlans/1/ports?cursor=abc', 400)
+
+    def test_get_ports_paginated(self):
+        """GET ports carrying vlan page by page"""
+
+        self._post('/vlans/1/assign', 200, json.dumps({ 'switch_model': 'big_switch' }))
+        expected = [ ('switch1', 'p1') ] + [
+            (switch, port)
+            for switch in ('switch2', 'switch3')
+            for port in ('p1', 'p2', 'p3', 'p4') ]
+
+        ports = []
+        url = '/vlans/1/ports?limit=3'
+        while url is not None:
+            rv = self._get(url, 200)
+            self.assertLessEqual(len(rv['data']), 3)
+            ports.extend((pt['switch'], pt['port']) for pt in rv['data'])
+            url = rv['next']
+        self.assertEqual(ports, expected)
+
+    def test_get_usage(self):
+        """GET number of ports carrying vlan"""
+
+        self.assertEqual(self._get('/vlans/1/usage', 200)['data'],
+                         { 'tag': 1, 'ports': 2, 'switches': 2 })
+        self.assertEqual(self._get('/vlans/3/usage', 200)['data'],
+                         { 'tag': 3, 'ports': 0, 'switches': 0 })
+        self._get('/vlans/42/usage', 404)
+
+        # Usage is counted without loading any resources
+        self._post('/vlans/2/assign', 200, json.dumps({ 'switch': 'switch3' }))
+        with self.record_statements() as statements:
+            self.assertEqual(self._get('/vlans/2/usage', 200)['data'],
+                             { 'tag': 2, 'ports': 6, 'switches': 2 })
+        self.assertEqual(len(statements), 3)
+
+        # Usage changes with revision
+        rv = self.client.get('/vlans/2/usage', headers = self.default_headers)
+        headers = dict(self.default_headers)
+        headers['If-None-Match'] = rv.headers['ETag']
+        self.assertEqual(self.client.get('/vlans/2/usage', headers = headers).status_code, 304)
+        self._post('/vlans/2/unassign', 200, json.dumps({ 'switch': 'switch3' }))
+        self.assertEqual(self.client.get('/vlans/2/usage', headers = headers).status_code, 200)
+
+    def test_assign_ports(self):
+        """Assign vlan to list of ports"""
+
+        selector = { 'ports': [
+            { 'switch': 'switch1', 'port': 'p1' },
+            { 'switch': 'switch2', 'port': 'p1' },
+            { 'switch': 'switch2', 'port': 'p2' },
+        ] }
+        with self._record_writes() as writes:
+            rv = self._post('/vlans/2/assign', 200, json.dumps(selector))
+        self.assertEqual(rv['data'], { 'affected_ports': 2 })
+        self.assertEqual(len(writes), 1)
+
+        self.assertEqual(self._vlans('switch1'), { 'p1': [ 1, 2 ] })
+        self.assertEqual(self._vlans('switch2')['p1'], [ 1, 2 ])
+        self.assertEqual(self._vlans('switch2')['p2'], [ 2 ])
+
+        # Ports carrying vlan already are not affected
+        rv = self._post('/vlans/2/assign', 200, json.dumps(selector))
+        self.assertEqual(rv['data'], { 'affected_ports': 0 })
+
+        rv = self._post('/vlans/2/unassign', 200, json.dumps(selector))
+        self.assertEqual(rv['data'], { 'affected_ports': 3 })
+        self.assertEqual(self._vlans('switch1'), { 'p1': [ 1 ] })
+        self.assertEqual(self._vlans('switch2')['p1'], [ 1 ])
+
+    def test_assign_switch(self):
+        """Assign vlan to range of ports of a switch"""
+
+        selector = { 'switch': 'switch2', 'port_range': [ 'p2', 'p3' ] }
+        rv = self._post('/vlans/3/assign', 200, json.dumps(selector))
+        self.assertEqual(rv['data'], { 'affected_ports': 2 })
+        self.assertEqual(self._vlans('switch2'), {
+            'p1': [ 1, 2 ], 'p2': [ 3 ], 'p3': [ 3 ], 'p4': [ 2 ] })
+
+        rv = self._post('/vlans/2/unassign', 200, json.dumps({ 'switch': 'switch2' }))
+        self.assertEqual(rv['data'], { 'affected_ports': 2 })
+        self.assertEqual(self._vlans('switch2'), {
+            'p1': [ 1 ], 'p2': [ 3 ], 'p3': [ 3 ], 'p4': [ ] })
+
+    def test_assign_switch_model(self):
+        """Assign vlan to all ports of all switches of a switch model"""
+
+        with self._record_writes() as writes:
+            rv = self._post('/vlans/3/assign', 200, json.dumps({ 'switch_model': 'big_switch' }))
+        self.assertEqual(rv['data'], { 'affected_ports': 8 })
+        self.assertEqual(len(writes), 1)
+        for switch in ('switch2', 'switch3'):
+            for vlans in self._vlans(switch).values():
+                self.assertIn(3, vlans)
+        self.assertEqual(self._vlans('switch1'), { 'p1': [ 1 ] })
+
+        selector = { 'switch_model': 'big_switch', 'port_range': [ 'p4', 'p4' ] }
+        rv = self._post('/vlans/3/unassign', 200, json.dumps(selector))
+        self.assertEqual(rv['data'], { 'affected_ports': 2 })
+        self.assertEqual(self._vlans('switch3')['p4'], [])
+
+    def test_assign_tracked(self):
+        """Assigning vlan changes revisions and is recorded as change"""
+
+        rv = self.client.get('/vlans', headers = self.default_headers)
+        revision = int(rv.headers['ETag'].strip('"'))
+        rv = self.client.get('/switches/switch2', headers = self.default_headers)
+        etag = rv.headers['ETag']
+        self.client.get('/switches/switch1', headers = self.default_headers)
+
+        self._post('/vlans/3/assign', 200, json.dumps({ 'switch': 'switch2', 'port_range': [ 'p1', 'p1' ] }))
+
+        # Cached documents were invalidated
+        self.assertEqual(self._vlans('switch2')['p1'], [ 1, 2, 3 ])
+        self.assertEqual(self._get('/switches/switch2/ports/p1', 200)['data']['vlans'], [ 1, 2, 3 ])
+        rv = self.client.get('/switches/switch2', headers = self.default_headers)
+        self.assertNotEqual(rv.headers['ETag'], etag)
+
+        changes = self._get('/changes?since={}'.format(revision), 200)['data']
+        self.assertEqual(
+            sorted((ch['resource'], ch['resource_id']) for ch in changes),
+            [ ('ports', 'p1'), ('switches', 'switch2') ])
+        for ch in changes:
+            self.assertEqual(ch['revision'], revision + 1)
+
+    def test_assign_batch(self):
+        """Assign vlan in a batch with other operations"""
+
+        operations = [
+            { 'method': 'POST', 'path': '/vlans', 'body': { 'tag': 4 } },
+            { 'method': 'POST', 'path': '/vlans/4/assign', 'body': { 'switch': 'switch1' } },
+            { 'method': 'PATCH', 'path': '/switches/switch1/ports/p1', 'body': { 'target': 'Venus' } },
+        ]
+        rv = self._post('/batch', 200, json.dumps(operations))
+        self.assertEqual(rv['data'][1]['data'], { 'affected_ports': 1 })
+        self.assertEqual(rv['data'][2]['data']['vlans'], [ 1, 4 ])
+
+    def test_assign_fail(self):
+        """Assign vlan with invalid selectors"""
+
+        self._post('/vlans/42/assign', 404, json.dumps({ 'switch': 'switch1' }))
+
+        invalid = [
+            { },
+            { 'switch': 'switch1', 'switch_model': 'big_switch' },
+            { 'switch': 'switch1', 'other': 1 },
+            { 'switch': 'non-existing' },
+            { 'switch_model': 'non-existing' },
+            { 'switch': 1 },
+            { 'switch': 'switch2', 'port_range': [ 'p1' ] },
+            { 'switch': 'switch2', 'port_range': [ 'p1', 'q4' ] },
+            { 'switch': 'switch2', 'port_range': [ 'p4', 'p1' ] },
+            { 'switch': 'switch2', 'port_range': [ 'p1', 'p100000' ] },
+            { 'ports': [ { 'switch': 'switch1', 'port': 'p1' } ], 'port_range': [ 'p1', 'p2' ] },
+            { 'ports': [ { 'switch': 'switch1' } ] },
+            { 'ports': 'switch1' },
+        ]
+        with self._record_writes() as writes:
+            for selector in invalid:
+                self._post('/vlans/3/assign', 400, json.dumps(selector))
+
+            selector = { 'ports': [
+                { 'switch': 'switch1', 'port': 'p1' },
+                { 'switch': 'switch1', 'port': 'p2' },
+                { 'switch': 'switch4', 'port': 'p1' },
+            ] }
+            rv = self._post('/vlans/3/assign', 400, json.dumps(selector))
+        self.assertIn('switch1/p2, switch4/p1', rv['message'])
+        self.assertEqual(writes, [])
+
+if __name__ == '__main__':
+    unittest.main(buffer = True)